@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -5,11 +7,18 @@ class DBSettings(BaseSettings):
   # MongoDB settings
   MONGODB_URI: str
   DB_NAME: str
+  # Owner given to the tasks created before tasks stored their owner. Only needed
+  # when there is more than one user.
+  LEGACY_TASKS_OWNER_EMAIL: Optional[str] = None
 
   # Redis settings
   REDIS_HOST: str
   REDIS_PORT: int
   REDIS_PASSWORD: str
+  REDIS_MAX_CONNECTIONS: int = 50
+  REDIS_POOL_TIMEOUT: int = 5  # Seconds to wait for a free pooled connection
+  REDIS_SOCKET_TIMEOUT: float = 5
+  REDIS_HEALTH_CHECK_INTERVAL: int = 30  # Seconds between idle connection checks
 
   class Config:
     env_file = ".env"
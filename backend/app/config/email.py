@@ -14,6 +14,14 @@ class EmailSettings(BaseSettings):
   VALIDATE_CERTS: bool
   VERIFICATION_LINK_EXPIRE_DAYS: int
 
+  # Background mail dispatcher
+  MAIL_POOL_SIZE: int = 2  # Persistent SMTP connections
+  MAIL_BATCH_SIZE: int = 20  # Emails sent per connection before yielding
+  MAIL_QUEUE_MAXSIZE: int = 1000
+  MAIL_MAX_RETRIES: int = 3
+  MAIL_RETRY_BASE_DELAY: float = 1  # Seconds, doubled after every failed attempt
+  MAIL_TIMEOUT: float = 30
+
   class Config:
     env_file = ".env"
     extra = "ignore"
@@ -0,0 +1,19 @@
+from pydantic_settings import BaseSettings
+
+
+class HTTPSettings(BaseSettings):
+  # Shared client for outbound HTTP calls (e.g. Google OAuth)
+  HTTP_TIMEOUT_SECONDS: float = 10
+  HTTP_CONNECT_TIMEOUT_SECONDS: float = 5
+  HTTP_MAX_CONNECTIONS: int = 100
+  HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+  # Retries of idempotent requests failing on timeouts, connection errors or 5xx
+  HTTP_MAX_RETRIES: int = 2
+  HTTP_RETRY_BACKOFF_SECONDS: float = 0.2  # Doubled after every attempt
+
+  class Config:
+    env_file = ".env"
+    extra = "ignore"
+
+
+http_settings = HTTPSettings()
@@ -0,0 +1,29 @@
+from typing import List, Optional
+
+from pydantic_settings import BaseSettings
+
+
+class MonitoringSettings(BaseSettings):
+  # Mongo/Redis command hooks, request timings and the /metrics endpoint
+  INSTRUMENTATION_ENABLED: bool = True
+  # Bearer token scrapers send to /metrics, which is refused to anyone while unset
+  METRICS_TOKEN: Optional[str] = None
+  # Measure the size of every Mongo command and reply, which re-encodes them
+  METRICS_COUNT_BYTES: bool = False
+  # Per-request database and span timings sent in the Server-Timing header
+  SERVER_TIMING_ENABLED: bool = True
+
+  # Opt-in diagnostics of aggregation pipelines by shape
+  SLOW_QUERY_LOG_ENABLED: bool = False
+  SLOW_QUERY_THRESHOLD_MS: float = 100
+  SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1  # Share of slow queries explained
+  SLOW_QUERY_MAX_SHAPES: int = 500  # Least recently seen shapes are dropped
+  # Users allowed on the admin endpoints
+  ADMIN_EMAILS: List[str] = []
+
+  class Config:
+    env_file = ".env"
+    extra = "ignore"
+
+
+monitoring_settings = MonitoringSettings()
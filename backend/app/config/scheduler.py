@@ -0,0 +1,27 @@
+from pydantic_settings import BaseSettings
+
+
+class SchedulerSettings(BaseSettings):
+  # Number of days of scheduled blocks fetched per query by the auto-scheduler
+  SCHEDULING_HORIZON_BATCH_DAYS: int = 14
+  # Number of days after the start date the auto-scheduler searches before giving up
+  SCHEDULING_MAX_HORIZON_DAYS: int = 365
+  # Maximum number of scheduled-block queries issued while scheduling one task
+  SCHEDULING_MAX_DB_CALLS: int = 32
+  # Seconds a queued reschedule job waits for more edits of the same user
+  RESCHEDULE_COALESCE_SECONDS: float = 0.5
+  # How long and how many finished reschedule jobs are kept for status lookups
+  RESCHEDULE_JOB_TTL_SECONDS: int = 3600
+  RESCHEDULE_JOB_MAX_RETAINED: int = 10000
+  # How long and how many compiled SchedulingHour weekly schedules are cached
+  SCHEDULING_HOUR_CACHE_TTL_SECONDS: int = 300
+  SCHEDULING_HOUR_CACHE_MAXSIZE: int = 1000
+  # Seconds a per-day availability summary is kept in Redis
+  AVAILABILITY_CACHE_TTL_SECONDS: int = 3600
+
+  class Config:
+    env_file = ".env"
+    extra = "ignore"
+
+
+scheduler_settings = SchedulerSettings()
@@ -13,6 +13,14 @@ class SecuritySettings(BaseSettings):
   SECRET_KEY: str
   FASTAPI_SECRET_KEY: str
 
+  # Password hashing
+  BCRYPT_ROUNDS: int = 12
+  PASSWORD_HASH_WORKERS: int = 4  # Threads hashing/verifying passwords
+
+  # In-process cache of verified access tokens and their users
+  TOKEN_CACHE_TTL_SECONDS: int = 30
+  TOKEN_CACHE_MAXSIZE: int = 10000
+
   class Config:
     env_file = ".env"
     extra = "ignore"
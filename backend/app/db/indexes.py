@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import logging
+from typing import Dict, List, Type
+
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from pymongo.server_api import ServerApi
+
+from app.config.database import db_settings
+from app.models.schedulingHourModel import SchedulingHour
+from app.models.taskModel import Task
+from app.models.userModel import User
+
+DOCUMENT_MODELS: List[Type[Document]] = [SchedulingHour, Task, User]
+
+
+def get_declared_indexes(document_model: Type[Document]) -> Dict[str, IndexModel]:
+  """
+  Return the indexes declared in the Settings of a document model by name
+  """
+  indexes = getattr(document_model.Settings, "indexes", [])
+  return {index.document["name"]: index for index in indexes}
+
+
+async def ensure_indexes(database: AsyncIOMotorDatabase):
+  """
+  Create the declared indexes missing from the database.
+
+  Indexes are built one by one, and one that cannot be built (e.g. a unique index
+  over duplicated values) is logged instead of stopping the app from starting.
+  """
+  for document_model in DOCUMENT_MODELS:
+    collection = database[document_model.Settings.name]
+    existing_indexes = await collection.index_information()
+    for name, index in get_declared_indexes(document_model).items():
+      if name in existing_indexes:
+        continue
+      try:
+        await collection.create_indexes([index])
+        logging.info(f"Created the {name} index of {collection.name}.")
+      except OperationFailure as error:
+        logging.error(
+          f"Could not create the {name} index of {collection.name}: {error}"
+        )
+
+
+async def get_index_report(database: AsyncIOMotorDatabase) -> List[Dict]:
+  """
+  Compare the declared indexes with those of the database, with the number of
+  times each existing index was used since the server started
+  """
+  report = []
+  for document_model in DOCUMENT_MODELS:
+    collection = database[document_model.Settings.name]
+    declared_indexes = get_declared_indexes(document_model)
+    existing_indexes = await collection.index_information()
+    usages = {
+      stats["name"]: stats["accesses"]
+      async for stats in collection.aggregate([{"$indexStats": {}}])
+    }
+
+    for name in sorted(declared_indexes.keys() | existing_indexes.keys()):
+      if name not in existing_indexes:
+        status = "missing"
+      elif name in declared_indexes or name == "_id_":
+        status = "ok"
+      else:
+        status = "undeclared"
+      usage = usages.get(name)
+      report.append(
+        {
+          "collection": collection.name,
+          "index": name,
+          "status": status,
+          "ops": usage["ops"] if usage else None,
+          "since": usage["since"] if usage else None,
+        }
+      )
+  return report
+
+
+def print_index_report(report: List[Dict]):
+  print(f"{'collection':<28} {'index':<48} {'status':<11} {'ops':>10}  since")
+  for row in report:
+    ops = "-" if row["ops"] is None else row["ops"]
+    since = row["since"].isoformat() if row["since"] else "-"
+    print(
+      f"{row['collection']:<28} {row['index']:<48} {row['status']:<11} {ops:>10}  "
+      f"{since}"
+    )
+
+  missing = sum(row["status"] == "missing" for row in report)
+  undeclared = sum(row["status"] == "undeclared" for row in report)
+  unused = sum(row["ops"] == 0 for row in report)
+  print(f"\n{missing} missing, {undeclared} undeclared, {unused} unused indexes.")
+
+
+async def main():
+  parser = argparse.ArgumentParser(
+    prog="python -m app.db.indexes",
+    description="Report missing, undeclared and unused MongoDB indexes.",
+  )
+  parser.add_argument(
+    "--create", action="store_true", help="Create the missing indexes first"
+  )
+  args = parser.parse_args()
+
+  client = AsyncIOMotorClient(db_settings.MONGODB_URI, server_api=ServerApi("1"))
+  try:
+    database = client[db_settings.DB_NAME]
+    if args.create:
+      await ensure_indexes(database)
+    print_index_report(await get_index_report(database))
+  finally:
+    client.close()
+
+
+if __name__ == "__main__":
+  logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+  asyncio.run(main())
@@ -0,0 +1,139 @@
+import logging
+from typing import Awaitable, Callable, List
+
+from app.config.database import db_settings
+from app.models.taskModel import Task
+from app.models.userModel import User
+from app.utils.datetime import get_utc_now
+
+MIGRATIONS_COLLECTION = "migrations"
+
+
+async def backfill_task_used_dates():
+  """
+  Materialize used_start_date/used_due_date on tasks created before they existed
+  """
+  result = await Task.get_motor_collection().update_many(
+    {"used_due_date": {"$exists": False}},
+    [
+      {
+        "$set": {
+          "used_start_date": {
+            "$cond": {
+              "if": "$smart_scheduling",
+              "then": "$start_date",
+              "else": {
+                "$getField": {
+                  "field": "start_at",
+                  "input": {"$arrayElemAt": ["$time_allocations", 0]},
+                }
+              },
+            }
+          },
+          "used_due_date": {
+            "$cond": {
+              "if": "$smart_scheduling",
+              "then": "$due_date",
+              "else": {
+                "$getField": {
+                  "field": "end_at",
+                  "input": {"$arrayElemAt": ["$time_allocations", 0]},
+                }
+              },
+            }
+          },
+        }
+      }
+    ],
+  )
+  if result.modified_count:
+    logging.info(f"Backfilled used dates of {result.modified_count} tasks.")
+
+
+async def backfill_task_is_overdue():
+  """
+  Materialize is_overdue on tasks created before it existed
+  """
+  result = await Task.get_motor_collection().update_many(
+    {"is_overdue": {"$exists": False}},
+    [
+      {
+        "$set": {
+          "is_overdue": {
+            "$in": [
+              False,
+              {"$ifNull": ["$time_allocations.is_scheduled_ontime", []]},
+            ]
+          }
+        }
+      }
+    ],
+  )
+  if result.modified_count:
+    logging.info(f"Backfilled the overdue flag of {result.modified_count} tasks.")
+
+
+async def backfill_task_user_ids():
+  """
+  Give an owner to the tasks created before tasks stored their owner, as tasks
+  without one are invisible to the calendar and the scheduler.
+
+  Tasks did not reference their creator before, so the owner is the only user or
+  the user of LEGACY_TASKS_OWNER_EMAIL. Otherwise the app refuses to start rather
+  than hiding the tasks, and the migration runs again once the setting is given.
+  """
+  collection = Task.get_motor_collection()
+  ownerless_count = await collection.count_documents({"user_id": None})
+  if not ownerless_count:
+    return
+
+  if db_settings.LEGACY_TASKS_OWNER_EMAIL:
+    owner = await User.find_one(User.email == db_settings.LEGACY_TASKS_OWNER_EMAIL)
+    if owner is None:
+      raise Exception(
+        f"No user matches LEGACY_TASKS_OWNER_EMAIL "
+        f"({db_settings.LEGACY_TASKS_OWNER_EMAIL})."
+      )
+  else:
+    owners = await User.find_all(limit=2).to_list()
+    if len(owners) != 1:
+      raise Exception(
+        f"{ownerless_count} tasks have no owner. Set LEGACY_TASKS_OWNER_EMAIL to "
+        f"the email of the user they belong to."
+      )
+    owner = owners[0]
+
+  result = await collection.update_many(
+    {"user_id": None}, {"$set": {"user_id": owner.id}}
+  )
+  logging.info(f"Gave {result.modified_count} ownerless tasks to {owner.email}.")
+
+
+# Applied in this order, a migration must stay idempotent and never be renamed
+MIGRATIONS: List[Callable[[], Awaitable[None]]] = [
+  backfill_task_used_dates,
+  backfill_task_is_overdue,
+  backfill_task_user_ids,
+]
+
+
+async def run_migrations():
+  """
+  Run, in order, the migrations not recorded as completed in the migrations
+  collection, so that each one scans the tasks only once
+  """
+  collection = Task.get_motor_collection().database[MIGRATIONS_COLLECTION]
+  completed = {
+    migration["_id"] async for migration in collection.find({}, {"_id": 1})
+  }
+  for migration in MIGRATIONS:
+    if migration.__name__ in completed:
+      continue
+    await migration()
+    # Upserted, as another process may have run the same migration concurrently
+    await collection.update_one(
+      {"_id": migration.__name__},
+      {"$set": {"completed_at": get_utc_now()}},
+      upsert=True,
+    )
+    logging.info(f"Completed the {migration.__name__} migration.")
@@ -5,6 +5,10 @@ from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pymongo.server_api import ServerApi
 
 from app.config.database import db_settings
+from app.config.monitoring import monitoring_settings
+from app.db.indexes import ensure_indexes
+from app.db.migrations import run_migrations
+from app.utils.instrumentation import MongoCommandListener
 
 
 class Database:
@@ -14,8 +18,13 @@ class Database:
   @staticmethod
   async def connect():
     logging.info("Starting the database...")
+    event_listeners = []
+    if monitoring_settings.INSTRUMENTATION_ENABLED:
+      event_listeners.append(MongoCommandListener())
     Database.mongodb_client = AsyncIOMotorClient(
-      db_settings.MONGODB_URI, server_api=ServerApi("1")
+      db_settings.MONGODB_URI,
+      server_api=ServerApi("1"),
+      event_listeners=event_listeners,
     )
     Database.database = Database.mongodb_client[db_settings.DB_NAME]
     ping_response = await Database.database.command("ping")
@@ -32,8 +41,12 @@ class Database:
         "app.models.taskModel.Task",
         "app.models.userModel.User",
       ],
+      skip_indexes=True,  # Built by ensure_indexes, after the migrations
     )
 
+    await run_migrations()
+    await ensure_indexes(Database.database)
+
   @staticmethod
   def close():
     logging.info("Closing the database...")
@@ -1,50 +1,286 @@
+import asyncio
+import logging
 import time
+from typing import Callable, Dict, Set
 
 import jwt
 from jwt.exceptions import InvalidTokenError
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.asyncio.connection import AbstractConnection
+from redis.exceptions import RedisError
 
 from app.config.database import db_settings
+from app.config.monitoring import monitoring_settings
 from app.config.security import security_settings
+from app.utils.instrumentation import record_redis_command
 
 
-redis_client = Redis(
-  host=db_settings.REDIS_HOST, 
-  port=db_settings.REDIS_PORT, 
-  decode_responses=True,
-  ssl=False
-)
+class InstrumentedPipeline(Pipeline):
+  async def execute(self, raise_on_error: bool = True):
+    start = time.perf_counter()
+    try:
+      return await super().execute(raise_on_error)
+    finally:
+      record_redis_command("PIPELINE", time.perf_counter() - start)
 
-async def blacklist_tokens(access_token: str, refresh_token: str):
-  # Blacklist access token
-  try:
-    access_payload = jwt.decode(
-      access_token,
-      key=security_settings.JWT_SECRET_KEY,
-      algorithms=[security_settings.JWT_ALGORITHM],
-    )
-    access_ttl = access_payload.get("exp") - int(time.time())
-    await redis_client.set(name=access_payload.get("jti"), value="", ex=access_ttl)
-  except InvalidTokenError:
-    pass
-
-  # Blacklist refresh token
-  try:
-    refresh_payload = jwt.decode(
-      refresh_token,
-      key=security_settings.JWT_SECRET_KEY,
-      algorithms=[security_settings.JWT_ALGORITHM],
+
+class InstrumentedRedis(Redis):
+  """
+  Redis client reporting every command, and every pipeline as a single round trip,
+  to the metrics
+  """
+
+  async def execute_command(self, *args, **options):
+    start = time.perf_counter()
+    try:
+      return await super().execute_command(*args, **options)
+    finally:
+      record_redis_command(str(args[0]).upper(), time.perf_counter() - start)
+
+  def pipeline(self, transaction: bool = True, shard_hint: str | None = None):
+    return InstrumentedPipeline(
+      self.connection_pool, self.response_callbacks, transaction, shard_hint
     )
-    refresh_ttl = refresh_payload.get("exp") - int(time.time())
-    await redis_client.set(
-      name=refresh_payload.get("jti"), value="", ex=refresh_ttl
+
+
+class CountingConnectionPool(BlockingConnectionPool):
+  """
+  Blocking pool keeping its own count of created and checked out connections, so
+  the pool stats do not depend on the private state of redis-py
+  """
+
+  def __init__(self, **kwargs):
+    super().__init__(**kwargs)
+    self.created_connections = 0
+    self.checked_out: Set[AbstractConnection] = set()
+
+  def reset(self):
+    super().reset()
+    self.created_connections = 0
+    self.checked_out = set()
+
+  def make_connection(self):
+    self.created_connections += 1
+    return super().make_connection()
+
+  async def get_connection(self, command_name, *keys, **options):
+    connection = await super().get_connection(command_name, *keys, **options)
+    self.checked_out.add(connection)
+    return connection
+
+  async def release(self, connection: AbstractConnection):
+    # Also called for connections that failed their check before being handed out
+    self.checked_out.discard(connection)
+    await super().release(connection)
+
+  @property
+  def in_use_connections(self) -> int:
+    return len(self.checked_out)
+
+
+class RedisClient:
+  pool: CountingConnectionPool | None = None
+  client: Redis | None = None
+
+  @staticmethod
+  async def connect():
+    logging.info("Starting the Redis connection pool...")
+    # Requests wait for a free connection instead of opening unbounded new ones
+    RedisClient.pool = CountingConnectionPool(
+      host=db_settings.REDIS_HOST,
+      port=db_settings.REDIS_PORT,
+      decode_responses=True,
+      max_connections=db_settings.REDIS_MAX_CONNECTIONS,
+      timeout=db_settings.REDIS_POOL_TIMEOUT,
+      socket_timeout=db_settings.REDIS_SOCKET_TIMEOUT,
+      socket_connect_timeout=db_settings.REDIS_SOCKET_TIMEOUT,
+      health_check_interval=db_settings.REDIS_HEALTH_CHECK_INTERVAL,
     )
-  except InvalidTokenError:
-    pass
+    redis_class = Redis
+    if monitoring_settings.INSTRUMENTATION_ENABLED:
+      redis_class = InstrumentedRedis
+    RedisClient.client = redis_class(connection_pool=RedisClient.pool)
+    await RedisClient.client.ping()
+    logging.info("Connected to Redis.")
+
+    await prefix_legacy_blacklist_keys()
+
+  @staticmethod
+  async def close():
+    logging.info("Closing the Redis connection pool...")
+    await RedisClient.client.aclose()
+    await RedisClient.pool.disconnect()
+    logging.info("Closed the Redis connection pool successfully!")
+
+  @staticmethod
+  def get_client() -> Redis:
+    return RedisClient.client
+
+  @staticmethod
+  def get_pool_stats() -> dict:
+    pool = RedisClient.pool
+    if pool is None:
+      return {}
+    return {
+      "max_connections": pool.max_connections,
+      "created_connections": pool.created_connections,
+      "in_use_connections": pool.in_use_connections,
+      "idle_connections": pool.created_connections - pool.in_use_connections,
+      "utilization": pool.in_use_connections / pool.max_connections,
+    }
+
+
+# Channel notifying every app process of newly blacklisted token ids
+BLACKLIST_CHANNEL = "token_blacklist"
+BLACKLIST_KEY_PREFIX = "blacklist:"
+# Set once the blacklist keys written before BLACKLIST_KEY_PREFIX were renamed
+BLACKLIST_KEYS_PREFIXED_KEY = "migrations:blacklist_key_prefix"
+# Channel notifying every app process of changed users, by id
+USER_CHANGED_CHANNEL = "user_changed"
+
+
+class LocalBlacklist:
+  """
+  In-process superset of the blacklisted token ids, kept in sync through pub/sub.
+
+  While synced, a token id missing from it is known not to be blacklisted and Redis
+  is skipped. Entries live as long as the longest token lifetime, so a hit is only
+  a possible hit and is confirmed against Redis.
+  """
+
+  expiries: Dict[str, float] = {}  # jti -> time after which it can be forgotten
+  synced: bool = False
+  additions: int = 0
+
+  @staticmethod
+  def add(jti: str):
+    LocalBlacklist.expiries[jti] = time.time() + LocalBlacklist.max_token_lifetime()
+    LocalBlacklist.additions += 1
+    if LocalBlacklist.additions % 1000 == 0:
+      LocalBlacklist.prune()
+
+  @staticmethod
+  def might_contain(jti: str) -> bool:
+    expiry = LocalBlacklist.expiries.get(jti)
+    return expiry is not None and expiry > time.time()
+
+  @staticmethod
+  def prune():
+    now = time.time()
+    LocalBlacklist.expiries = {
+      jti: expiry for jti, expiry in LocalBlacklist.expiries.items() if expiry > now
+    }
+
+  @staticmethod
+  def max_token_lifetime() -> int:
+    return security_settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+  @staticmethod
+  async def sync():
+    """
+    Load every token id currently blacklisted in Redis
+    """
+    LocalBlacklist.prune()
+    async for key in RedisClient.get_client().scan_iter(
+      match=f"{BLACKLIST_KEY_PREFIX}*", count=1000
+    ):
+      LocalBlacklist.add(key[len(BLACKLIST_KEY_PREFIX) :])
+    LocalBlacklist.synced = True
+
+
+async def prefix_legacy_blacklist_keys():
+  """
+  Rename, once, the blacklist keys written before keys were prefixed. They were
+  named after the bare jti with an empty value. RENAME keeps their expiry.
+  """
+  client = RedisClient.get_client()
+  if await client.exists(BLACKLIST_KEYS_PREFIXED_KEY):
+    return
+
+  unprefixed_keys = [
+    key async for key in client.scan_iter(count=1000) if ":" not in key
+  ]
+  async with client.pipeline(transaction=False) as pipe:
+    for key in unprefixed_keys:
+      pipe.get(key)
+    values = await pipe.execute(raise_on_error=False)  # Errors on non-string keys
+  legacy_keys = [key for key, value in zip(unprefixed_keys, values) if value == ""]
+
+  async with client.pipeline(transaction=False) as pipe:
+    for key in legacy_keys:
+      pipe.renamenx(key, BLACKLIST_KEY_PREFIX + key)
+    pipe.set(BLACKLIST_KEYS_PREFIXED_KEY, "")
+    await pipe.execute()
+  if legacy_keys:
+    logging.info(f"Prefixed {len(legacy_keys)} blacklisted token keys.")
+
+
+async def blacklist_tokens(access_token: str, refresh_token: str):
+  # Both tokens are blacklisted and announced in a single round trip
+  async with RedisClient.get_client().pipeline(transaction=False) as pipe:
+    for token in (access_token, refresh_token):
+      try:
+        payload = jwt.decode(
+          token,
+          key=security_settings.JWT_SECRET_KEY,
+          algorithms=[security_settings.JWT_ALGORITHM],
+        )
+      except InvalidTokenError:
+        continue
+
+      ttl = payload.get("exp") - int(time.time())
+      pipe.set(name=BLACKLIST_KEY_PREFIX + payload.get("jti"), value="", ex=ttl)
+      pipe.publish(BLACKLIST_CHANNEL, payload.get("jti"))
+      LocalBlacklist.add(payload.get("jti"))
+
+    if len(pipe):
+      await pipe.execute()
+
+
+async def publish_user_changed(user_id: str):
+  await RedisClient.get_client().publish(USER_CHANGED_CHANNEL, user_id)
+
+
+async def listen_token_invalidations(
+  on_blacklisted: Callable[[str], None],
+  on_user_changed: Callable[[str], None],
+  on_reconnect: Callable[[], None],
+):
+  """
+  Keep LocalBlacklist in sync and call on_blacklisted with the jti of every token
+  blacklisted by any process, and on_user_changed with the id of every user changed
+  by any process. on_reconnect is called after the subscription was lost, as
+  messages may be missed.
+  """
+  while True:
+    try:
+      async with RedisClient.get_client().pubsub() as pubsub:
+        # Subscribe before loading the keys so that no blacklisting is missed
+        await pubsub.subscribe(BLACKLIST_CHANNEL, USER_CHANGED_CHANNEL)
+        await LocalBlacklist.sync()
+        on_reconnect()
+        async for message in pubsub.listen():
+          if message["type"] != "message":
+            continue
+          if message["channel"] == USER_CHANGED_CHANNEL:
+            on_user_changed(message["data"])
+          else:
+            LocalBlacklist.add(message["data"])
+            on_blacklisted(message["data"])
+    except RedisError:
+      logging.warning("Lost the token invalidation subscription, retrying...")
+      await asyncio.sleep(1)
+    finally:
+      LocalBlacklist.synced = False
 
 
 async def token_in_blacklist(jti: str):
-  value = await redis_client.get(jti)
-  if value is not None:
+  # Valid sessions are answered locally
+  if LocalBlacklist.synced and not LocalBlacklist.might_contain(jti):
+    return False
+
+  count = await RedisClient.get_client().exists(BLACKLIST_KEY_PREFIX + jti)
+  if count:
     return True
   return False
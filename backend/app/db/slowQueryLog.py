@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+import random
+import time
+import zlib
+from typing import Dict, List, Set, Type
+
+from beanie import Document
+from cachetools import LRUCache
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.config.monitoring import monitoring_settings
+from app.utils.datetime import get_utc_now
+from app.utils.instrumentation import request_metrics
+
+
+def get_query_shape(value):
+  """
+  Replace the literals of a query by "?", keeping operators, field names and field
+  paths. Clauses of an array sharing the same shape collapse into one, so that an
+  $or built from a variable number of filters keeps a single shape.
+  """
+  if isinstance(value, dict):
+    return {key: get_query_shape(item) for key, item in value.items()}
+  if isinstance(value, (list, tuple)):
+    shapes = []
+    for item in value:
+      shape = get_query_shape(item)
+      if shape not in shapes:
+        shapes.append(shape)
+    return shapes
+  if isinstance(value, str) and value.startswith("$"):
+    return value  # Field path or variable
+  return "?"
+
+
+def get_pipeline_shape(pipeline: List[Dict]) -> List[Dict]:
+  return [get_query_shape(stage) for stage in pipeline]
+
+
+def collect_plan_stages(plan: Dict, stages: List[str], indexes: List[str]):
+  plan = plan.get("queryPlan", plan)  # Plans of the slot-based engine are nested
+  if "stage" in plan:
+    stages.append(plan["stage"])
+  if "indexName" in plan:
+    indexes.append(plan["indexName"])
+  for child in [plan.get("inputStage"), *plan.get("inputStages", [])]:
+    if child:
+      collect_plan_stages(child, stages, indexes)
+
+
+def summarize_explain(explain: Dict) -> Dict:
+  """
+  Keep the winning plan stages and the execution stats of an aggregate explain
+  """
+  cursor = explain
+  if "stages" in explain:  # Only the first stage ran in the query layer
+    cursor = explain["stages"][0].get("$cursor", {})
+  winning_plan = cursor.get("queryPlanner", {}).get("winningPlan", {})
+  stages, indexes = [], []
+  collect_plan_stages(winning_plan, stages, indexes)
+  execution_stats = cursor.get("executionStats", {})
+  return {
+    "plan_stages": stages,
+    "indexes": indexes,
+    "collscan": "COLLSCAN" in stages,
+    "docs_examined": execution_stats.get("totalDocsExamined"),
+    "keys_examined": execution_stats.get("totalKeysExamined"),
+    "returned": execution_stats.get("nReturned"),
+    "execution_ms": execution_stats.get("executionTimeMillis"),
+    "explained_at": get_utc_now(),
+  }
+
+
+class SlowQueryLog:
+  """
+  Latency stats of aggregation pipelines grouped by shape.
+
+  Pipelines slower than SLOW_QUERY_THRESHOLD_MS are logged, and a sample of them
+  is explained in the background to show the plan chosen for their shape.
+  """
+
+  shapes: LRUCache = LRUCache(maxsize=monitoring_settings.SLOW_QUERY_MAX_SHAPES)
+  explain_tasks: Set[asyncio.Task] = set()
+
+  @staticmethod
+  def record(
+    name: str,
+    collection: AsyncIOMotorCollection,
+    pipeline: List[Dict],
+    elapsed_ms: float,
+  ):
+    shape = get_pipeline_shape(pipeline)
+    serialized_shape = json.dumps(shape)
+    shape_id = f"{zlib.crc32(f'{name}:{serialized_shape}'.encode()):08x}"
+
+    entry = SlowQueryLog.shapes.get(shape_id)
+    if entry is None:
+      entry = SlowQueryLog.shapes[shape_id] = {
+        "shape_id": shape_id,
+        "name": name,
+        "collection": collection.name,
+        "shape": shape,
+        "count": 0,
+        "slow_count": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0,
+        "last_slow_at": None,
+        "explain": None,
+      }
+    entry["count"] += 1
+    entry["total_ms"] += elapsed_ms
+    entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+    if elapsed_ms < monitoring_settings.SLOW_QUERY_THRESHOLD_MS:
+      return
+    entry["slow_count"] += 1
+    entry["last_slow_at"] = get_utc_now()
+    logging.warning(
+      f"Slow {name} aggregation ({elapsed_ms:.0f} ms), shape {shape_id}: "
+      f"{serialized_shape}"
+    )
+
+    if random.random() < monitoring_settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+      task = asyncio.create_task(SlowQueryLog.explain(collection, pipeline, entry))
+      SlowQueryLog.explain_tasks.add(task)
+      task.add_done_callback(SlowQueryLog.explain_tasks.discard)
+
+  @staticmethod
+  async def explain(
+    collection: AsyncIOMotorCollection, pipeline: List[Dict], entry: Dict
+  ):
+    request_metrics.set(None)  # Not part of the request that ran the pipeline
+    try:
+      explain = await collection.database.command(
+        {
+          "explain": {"aggregate": collection.name, "pipeline": pipeline, "cursor": {}},
+          "verbosity": "executionStats",
+        }
+      )
+    except Exception:
+      logging.exception(f"Could not explain the {entry['name']} aggregation.")
+      return
+
+    entry["explain"] = summarize_explain(explain)
+    logging.warning(
+      f"Plan of slow {entry['name']} aggregation, shape {entry['shape_id']}: "
+      f"{entry['explain']}"
+    )
+
+  @staticmethod
+  def get_stats() -> List[Dict]:
+    """
+    Return the recorded shapes, those taking the most time in total first
+    """
+    stats = [
+      {**entry, "mean_ms": entry["total_ms"] / entry["count"]}
+      for entry in list(SlowQueryLog.shapes.values())
+    ]
+    return sorted(stats, key=lambda entry: entry["total_ms"], reverse=True)
+
+  @staticmethod
+  def clear():
+    SlowQueryLog.shapes.clear()
+
+
+async def run_aggregation(
+  document_model: Type[Document], pipeline: List[Dict], name: str
+) -> List[Dict]:
+  """
+  Run an aggregation pipeline, recording it in the slow query log when enabled
+  """
+  if not monitoring_settings.SLOW_QUERY_LOG_ENABLED:
+    return await document_model.aggregate(pipeline).to_list()
+
+  start = time.perf_counter()
+  results = await document_model.aggregate(pipeline).to_list()
+  elapsed_ms = (time.perf_counter() - start) * 1000
+  SlowQueryLog.record(name, document_model.get_motor_collection(), pipeline, elapsed_ms)
+  return results
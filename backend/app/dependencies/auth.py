@@ -1,9 +1,20 @@
-from fastapi import Request
+import secrets
+from typing import Annotated
+
+from fastapi import Depends, Request
 from fastapi.security.utils import get_authorization_scheme_param
 
-from app.exceptions.authExceptions import AccessTokenExpiredError
+from app.config.monitoring import monitoring_settings
+from app.exceptions.authExceptions import (
+  AccessTokenExpiredError,
+  AdminAccessRequiredError,
+  UnauthorizedError,
+)
+from app.db.redis import LocalBlacklist, token_in_blacklist
+from app.models.userModel import User
 from app.services.userService.crud import get_user_by_id
-from app.utils.auth import verify_token
+from app.utils.auth import decode_token
+from app.utils.tokenCache import TokenCache
 
 
 def get_token_from_request(request: Request):
@@ -22,12 +33,41 @@ def get_token_from_request(request: Request):
 
 
 async def get_current_user(request: Request):
+  """
+  Return the id, email and verification state of the authenticated user
+  """
   token = get_token_from_request(request)
   if token:
-    payload = await verify_token(token)
+    payload = decode_token(token)
     if payload:
-      user_id = payload.get("sub")
-      user = await get_user_by_id(user_id)
-      if user:
+      # Recently verified tokens skip the user lookup, and the blacklist lookup
+      # unless this process has heard of the token being blacklisted since
+      jti = payload.get("jti")
+      user = TokenCache.get(jti)
+      if user and not LocalBlacklist.might_contain(jti):
         return user
+
+      if not await token_in_blacklist(jti):
+        user_id = payload.get("sub")
+        user = await get_user_by_id(user_id)
+        if user:
+          TokenCache.set(jti, user)
+          return TokenCache.project(user)
   raise AccessTokenExpiredError()
+
+
+async def get_admin_user(current_user: Annotated[User, Depends(get_current_user)]):
+  if current_user.email not in monitoring_settings.ADMIN_EMAILS:
+    raise AdminAccessRequiredError()
+  return current_user
+
+
+def verify_metrics_token(request: Request):
+  metrics_token = monitoring_settings.METRICS_TOKEN
+  scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+  if (
+    not metrics_token
+    or scheme.lower() != "bearer"
+    or not secrets.compare_digest(token.encode(), metrics_token.encode())
+  ):
+    raise UnauthorizedError()
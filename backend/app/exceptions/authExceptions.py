@@ -7,6 +7,12 @@ class UnauthorizedError(BaseError):
   pass
 
 
+class AdminAccessRequiredError(BaseError):
+  """An error for non-admin users accessing admin endpoints"""
+
+  pass
+
+
 class EmailVerificationError(BaseError):
   """An error for email verification"""
 
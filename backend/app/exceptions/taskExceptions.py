@@ -1,9 +1,21 @@
 from .baseExceptions import BaseError
 
+TASK_AUTO_SCHEDULE_DETAIL = (
+    "Cannot find an appropriate free time slot to schedule the task."
+)
+
 class TaskNotFoundError(BaseError):
     '''An error for not finding a task'''
     pass
 
 class TaskAutoScheduleError(BaseError):
     '''An error for unable to automatically schedule a task'''
+    pass
+
+class InvalidCursorError(BaseError):
+    '''An error for a malformed pagination cursor'''
+    pass
+
+class RescheduleJobNotFoundError(BaseError):
+    '''An error for not finding a reschedule job'''
     pass
\ No newline at end of file
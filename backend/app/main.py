@@ -8,13 +8,22 @@ from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 from app.db.mongodb import Database
+from app.db.redis import RedisClient
+from app.config.monitoring import monitoring_settings
 from app.config.security import security_settings
 from app.exceptions.baseExceptions import creat_exception_handler
 from app.exceptions.passwordExceptions import PasswordAndConfirmPasswordMismatchError
 from app.exceptions.schedulingHourExceptions import SchedulingHourNotFoundError
-from app.exceptions.taskExceptions import TaskAutoScheduleError, TaskNotFoundError
+from app.exceptions.taskExceptions import (
+  TASK_AUTO_SCHEDULE_DETAIL,
+  InvalidCursorError,
+  RescheduleJobNotFoundError,
+  TaskAutoScheduleError,
+  TaskNotFoundError
+)
 from app.exceptions.authExceptions import (
   AccountNotVerifiedError,
+  AdminAccessRequiredError,
   InvalidTokenError,
   UnauthorizedError,
   EmailVerificationError,
@@ -23,10 +32,17 @@ from app.exceptions.authExceptions import (
   UserAlreadyExistsError,
   UserNotFoundError
 )
+from app.routes.adminRoutes import admin_router
+from app.routes.metricsRoutes import metrics_router
 from app.routes.userRoutes import user_router
 from app.routes.authRoutes import auth_router
 from app.routes.schedulingHourRoutes import scheduling_hour_router
 from app.routes.taskRoutes import task_router
+from app.services.mailService.mailDispatcher import MailDispatcher
+from app.services.taskService.rescheduleWorker import RescheduleWorker
+from app.utils.httpClient import HTTPClient
+from app.utils.instrumentation import InstrumentationMiddleware
+from app.utils.tokenCache import TokenCache
 
 # Setup logging
 logging.basicConfig(
@@ -37,7 +53,17 @@ logging.basicConfig(
 @asynccontextmanager
 async def db_lifespan(app: FastAPI):
   await Database.connect()
+  await RedisClient.connect()
+  HTTPClient.connect()
+  MailDispatcher.start()
+  RescheduleWorker.start()
+  TokenCache.start()
   yield
+  await TokenCache.stop()
+  await RescheduleWorker.stop()
+  await MailDispatcher.stop()
+  await HTTPClient.close()
+  await RedisClient.close()
   Database.close()
 
 
@@ -63,6 +89,7 @@ app.add_middleware(
   allow_credentials=True,
   allow_methods=["*"],
   allow_headers=["*"],
+  expose_headers=["X-Next-Cursor"],
 )
 
 app.add_middleware(
@@ -75,6 +102,10 @@ app.add_middleware(
   ]
 )
 
+# Outermost, so that the timings cover every other middleware
+if monitoring_settings.INSTRUMENTATION_ENABLED:
+  app.add_middleware(InstrumentationMiddleware)
+
 @app.get("/")
 async def ping():
   return JSONResponse(content={"message": "pong"})
@@ -87,6 +118,13 @@ app.add_exception_handler(
   )
 )
 
+app.add_exception_handler(
+  AdminAccessRequiredError,
+  creat_exception_handler(
+    status_code=status.HTTP_403_FORBIDDEN, initial_detail="Admin access required."
+  )
+)
+
 app.add_exception_handler(
   InvalidTokenError,
   creat_exception_handler(
@@ -155,7 +193,21 @@ app.add_exception_handler(
   TaskAutoScheduleError,
   creat_exception_handler(
     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-    initial_detail="Cannot find an appropriate free time slot to schedule the task.",
+    initial_detail=TASK_AUTO_SCHEDULE_DETAIL,
+  )
+)
+
+app.add_exception_handler(
+  InvalidCursorError,
+  creat_exception_handler(
+    status_code=status.HTTP_400_BAD_REQUEST, initial_detail="Invalid cursor."
+  )
+)
+
+app.add_exception_handler(
+  RescheduleJobNotFoundError,
+  creat_exception_handler(
+    status_code=status.HTTP_404_NOT_FOUND, initial_detail="No reschedule job found."
   )
 )
 
@@ -170,3 +222,6 @@ app.include_router(user_router, prefix=version_prefix)
 app.include_router(auth_router, prefix=version_prefix)
 app.include_router(task_router, prefix=version_prefix)
 app.include_router(scheduling_hour_router, prefix=version_prefix)
+app.include_router(admin_router, prefix=version_prefix)
+if monitoring_settings.INSTRUMENTATION_ENABLED:
+  app.include_router(metrics_router)
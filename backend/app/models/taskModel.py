@@ -3,6 +3,7 @@ from typing import Any, List, Optional
 
 from beanie import Document, PydanticObjectId
 from pydantic import model_validator
+from pymongo import ASCENDING, TEXT, IndexModel
 
 from app.schemas.taskSchema import Duration, Split, Tag, TimeBlock
 from app.types.taskTypes import Priority, Status
@@ -10,6 +11,7 @@ from app.utils.datetime import add_utc_timezone
 
 
 class Task(Document):
+  user_id: Optional[PydanticObjectId] = None  # Owner of the task
   scheduling_hour_id: Optional[PydanticObjectId] = None
   smart_scheduling: bool
   name: str
@@ -25,6 +27,11 @@ class Task(Document):
   created_at: datetime
   updated_at: Optional[datetime] = None
 
+  # Materialized effective dates and overdue state, derived from the fields above
+  used_start_date: Optional[datetime] = None
+  used_due_date: Optional[datetime] = None
+  is_overdue: bool = False  # A time block ends after the due date
+
   @model_validator(mode="after")
   @classmethod
   def add_timezone(cls, data: Any):
@@ -38,5 +45,67 @@ class Task(Document):
       data.updated_at = add_utc_timezone(data.updated_at)
     return data
 
+  @model_validator(mode="after")
+  @classmethod
+  def set_derived_fields(cls, data: Any):
+    data.update_derived_fields()
+    return data
+
+  def update_derived_fields(self):
+    """
+    Recompute the effective dates and overdue state, call it after changing
+    time_allocations
+    """
+    self.is_overdue = any(
+      not time_block.is_scheduled_ontime for time_block in self.time_allocations
+    )
+
+    # Smart tasks are shown by their scheduling range, others by their first block
+    if self.smart_scheduling:
+      self.used_start_date = self.start_date
+      self.used_due_date = self.due_date
+    elif self.time_allocations:
+      self.used_start_date = self.time_allocations[0].start_at
+      self.used_due_date = self.time_allocations[0].end_at
+    else:
+      self.used_start_date = None
+      self.used_due_date = None
+
   class Settings:
     name = "task_collection"
+    indexes = [
+      # Scheduled blocks of a user overlapping a date range
+      IndexModel(
+        [
+          ("user_id", ASCENDING),
+          ("time_allocations.start_at", ASCENDING),
+          ("time_allocations.end_at", ASCENDING),
+        ],
+        name="user_time_allocations",
+      ),
+      # Keyset pagination of the task list, _id breaks ties between equal keys
+      IndexModel([("used_due_date", ASCENDING), ("_id", ASCENDING)]),
+      IndexModel([("used_start_date", ASCENDING), ("_id", ASCENDING)]),
+      IndexModel([("priority", ASCENDING), ("_id", ASCENDING)]),
+      IndexModel([("status", ASCENDING), ("_id", ASCENDING)]),
+      # Status/priority filters combined with a date range or date sort
+      IndexModel(
+        [("status", ASCENDING), ("used_due_date", ASCENDING), ("_id", ASCENDING)]
+      ),
+      IndexModel(
+        [("status", ASCENDING), ("used_start_date", ASCENDING), ("_id", ASCENDING)]
+      ),
+      IndexModel(
+        [("priority", ASCENDING), ("used_due_date", ASCENDING), ("_id", ASCENDING)]
+      ),
+      IndexModel(
+        [("priority", ASCENDING), ("used_start_date", ASCENDING), ("_id", ASCENDING)]
+      ),
+      # Search of the task list
+      IndexModel([("name", TEXT), ("description", TEXT)], name="task_text_search"),
+      # Overdue tasks of a user by due date, for rescheduling
+      IndexModel(
+        [("user_id", ASCENDING), ("is_overdue", ASCENDING), ("due_date", ASCENDING)],
+        name="user_overdue_due_date",
+      ),
+    ]
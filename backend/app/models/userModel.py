@@ -3,6 +3,7 @@ from typing import Optional, List
 
 from beanie import Document
 from pydantic import EmailStr, Field
+from pymongo import ASCENDING, IndexModel
 
 from app.utils.datetime import get_utc_now
 
@@ -23,3 +24,7 @@ class User(Document):
 
   class Settings:
     name = "user_collection"
+    indexes = [
+      # Lookups on login/signup/verification, one account per email
+      IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ]
@@ -0,0 +1,25 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from app.config.monitoring import monitoring_settings
+from app.db.slowQueryLog import SlowQueryLog
+from app.dependencies.auth import get_admin_user
+from app.models.userModel import User
+
+admin_router = APIRouter()
+
+
+@admin_router.get("/admin/slow-queries")
+async def get_slow_queries(admin: Annotated[User, Depends(get_admin_user)]):
+  return {
+    "enabled": monitoring_settings.SLOW_QUERY_LOG_ENABLED,
+    "threshold_ms": monitoring_settings.SLOW_QUERY_THRESHOLD_MS,
+    "shapes": SlowQueryLog.get_stats(),
+  }
+
+
+@admin_router.delete("/admin/slow-queries")
+async def clear_slow_queries(admin: Annotated[User, Depends(get_admin_user)]):
+  SlowQueryLog.clear()
+  return {"message": "Cleared the slow query log."}
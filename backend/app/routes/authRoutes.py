@@ -3,10 +3,8 @@ from typing import Annotated, Optional
 from datetime import timedelta
 
 import uuid
-import requests
 from fastapi import (
   APIRouter,
-  BackgroundTasks,
   Cookie,
   Depends,
   Request,
@@ -38,8 +36,13 @@ from app.services.authService.logout import logout_user_account
 from app.services.authService.resetPassword import send_confirm_reset_password
 from app.services.authService.signup import signup_user_account
 from app.services.mailService.sendEmail import send_email_verification_link
-from app.services.userService.crud import get_user_by_email, create_user_with_google
+from app.services.userService.crud import (
+  get_user_by_email,
+  create_user_with_google,
+  save_user,
+)
 from app.utils.auth import get_password_hash, create_url_safe_token, create_access_token
+from app.utils.httpClient import HTTPClient
 
 auth_router = APIRouter(prefix="/auth")
 
@@ -61,13 +64,11 @@ oauth.register(
 
 
 @auth_router.post("/signup")
-async def signup(
-  response: Response, background_tasks: BackgroundTasks, user: UserCreate
-):
+async def signup(response: Response, user: UserCreate):
   """
   Signup a new user account.
   """
-  new_user = await signup_user_account(background_tasks, user)
+  new_user = await signup_user_account(user)
   if new_user:
     response.status_code = status.HTTP_201_CREATED
     return new_user
@@ -121,17 +122,22 @@ async def login_google_callback(request: Request):
   except Exception as e:
     raise UnauthorizedError()
 
-  # Fetch user info from Google
-  try:
-    user_info_endpoint = "https://www.googleapis.com/oauth2/v2/userinfo"
-    headers = {"Authorization": f"Bearer {token['access_token']}"}
-    google_response = requests.get(user_info_endpoint, headers=headers)
-    user_info = google_response.json()
-  except Exception as e:
-    raise UnauthorizedError()
+  # The ID token claims already carry the profile for the "profile" scope
+  user = token.get("userinfo")
+  user_info = user
+
+  # Fetch user info from Google only if the claims are incomplete
+  if not user.get("name") or not user.get("picture"):
+    try:
+      user_info_endpoint = "https://www.googleapis.com/oauth2/v2/userinfo"
+      headers = {"Authorization": f"Bearer {token['access_token']}"}
+      google_response = await HTTPClient.get(user_info_endpoint, headers=headers)
+      google_response.raise_for_status()
+      user_info = google_response.json()
+    except Exception as e:
+      raise UnauthorizedError()
 
   # Extract user information
-  user = token.get("userinfo")
   google_id = user.get("sub")
   user_email = user.get("email")
   user_name = user_info.get("name")
@@ -150,7 +156,7 @@ async def login_google_callback(request: Request):
     existing_user.google_id = google_id
     existing_user.picture = user_pic
     existing_user.auth_providers.append("google")
-    await existing_user.save()
+    await save_user(existing_user)
 
   # Create JWT token
   user_id = existing_user.id if existing_user else new_user.id
@@ -241,7 +247,7 @@ async def verify_email(token: str):
       raise UnauthorizedError()
 
     user.is_verified = True
-    await user.save()
+    await save_user(user)
     return JSONResponse(
       content={
         "email": email,
@@ -255,9 +261,7 @@ async def verify_email(token: str):
 
 
 @auth_router.post("/send-verification-email")
-async def send_verification_link(
-  background_tasks: BackgroundTasks, data: EmailVerificationSchema
-):
+async def send_verification_link(data: EmailVerificationSchema):
   """
   Send a verification link to the specified email
   """
@@ -267,7 +271,7 @@ async def send_verification_link(
       {"email": data.email}, salt="email-verification"
     )
     verification_link = f"{frontend_settings.DOMAIN}/verify/{verification_token}"
-    await send_email_verification_link(background_tasks, data.email, verification_link)
+    await send_email_verification_link(data.email, verification_link)
     return JSONResponse(
       content={"message": "Email verification link sent successfully!"},
       status_code=status.HTTP_200_OK,
@@ -276,13 +280,11 @@ async def send_verification_link(
 
 
 @auth_router.post("/confirm-password-reset")
-async def password_reset_confirm(
-  background_tasks: BackgroundTasks, data: EmailVerificationSchema
-):
+async def password_reset_confirm(data: EmailVerificationSchema):
   """
   Send a password reset email to the user.
   """
-  success = await send_confirm_reset_password(background_tasks, data.email)
+  success = await send_confirm_reset_password(data.email)
   if not success:
     raise UserNotFoundError()
   return JSONResponse(
@@ -330,8 +332,8 @@ async def reset_password(password_reset_data: PasswordResetSchema):
     raise PasswordAndConfirmPasswordMismatchError()
 
   # Hash the new password and update the user
-  user.hashed_password = get_password_hash(password_reset_data.new_password)
-  await user.save()
+  user.hashed_password = await get_password_hash(password_reset_data.new_password)
+  await save_user(user)
 
   return JSONResponse(
     content={"message": "Password reset successfully!"}, status_code=status.HTTP_200_OK
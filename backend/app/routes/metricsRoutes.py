@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.db.redis import RedisClient
+from app.dependencies.auth import verify_metrics_token
+from app.services.mailService.mailDispatcher import MailDispatcher
+from app.services.taskService.rescheduleWorker import RescheduleWorker
+from app.utils.auth import get_password_hash_stats
+from app.utils.instrumentation import Metrics
+
+metrics_router = APIRouter(dependencies=[Depends(verify_metrics_token)])
+
+
+def get_queue_size(queue) -> int:
+  return queue.qsize() if queue else 0
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+  gauges = {}
+  for name, value in RedisClient.get_pool_stats().items():
+    gauges[f"redis_pool_{name}"] = (f"Redis connection pool {name}.", value)
+  for name, value in get_password_hash_stats().items():
+    gauges[f"password_hash_{name}"] = (f"Password hashing pool {name}.", value)
+  gauges["reschedule_queue_size"] = (
+    "Reschedule jobs waiting for the worker, coalescing ones included.",
+    get_queue_size(RescheduleWorker.queue) + len(RescheduleWorker.delayed_jobs),
+  )
+  gauges["mail_queue_size"] = (
+    "Emails waiting to be sent.",
+    get_queue_size(MailDispatcher.queue),
+  )
+  return PlainTextResponse(
+    Metrics.render(gauges), media_type="text/plain; version=0.0.4"
+  )
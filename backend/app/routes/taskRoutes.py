@@ -2,20 +2,37 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Response, status
 
 from app.dependencies.auth import get_current_user
-from app.exceptions.taskExceptions import TaskNotFoundError
+from app.exceptions.taskExceptions import RescheduleJobNotFoundError, TaskNotFoundError
 from app.models.userModel import User
-from app.schemas.taskSchema import TaskCreate, TaskUpdate, TaskFilter
+from app.schemas.taskSchema import (
+  CalendarFilter,
+  TaskBulkCreate,
+  TaskCreate,
+  TaskUpdate,
+  TaskFilter,
+)
 from app.services.taskService.crud import (
   create_task,
+  create_tasks,
   delete_task,
+  get_calendar_tasks,
   get_task_by_id,
   get_tasks,
   update_task,
 )
+from app.services.taskService.rescheduleWorker import RescheduleWorker
 
 task_router = APIRouter()
 
 
+@task_router.get("/tasks/calendar")
+async def get_week_calendar(
+  current_user: Annotated[User, Depends(get_current_user)],
+  filters: CalendarFilter = Depends(),
+):
+  return await get_calendar_tasks(filters, current_user.id)
+
+
 @task_router.get("/tasks/{id}")
 async def get_single_task(
   id: str, current_user: Annotated[User, Depends(get_current_user)]
@@ -26,13 +43,26 @@ async def get_single_task(
   raise TaskNotFoundError()
 
 
+@task_router.get("/tasks/reschedule-jobs/{job_id}")
+async def get_reschedule_job(
+  job_id: str, current_user: Annotated[User, Depends(get_current_user)]
+):
+  job = await RescheduleWorker.get_job(job_id)
+  if job and job["user_id"] == str(current_user.id):
+    return {key: value for key, value in job.items() if key != "user_id"}
+  raise RescheduleJobNotFoundError()
+
+
 @task_router.get("/tasks")
 async def get_all_tasks(
   current_user: Annotated[User, Depends(get_current_user)],
+  response: Response,
   filters: TaskFilter = Depends(),
 ):
-  tasks = await get_tasks(filters)
+  tasks, next_cursor = await get_tasks(filters)
   if tasks:
+    if next_cursor:
+      response.headers["X-Next-Cursor"] = next_cursor
     return tasks
   raise TaskNotFoundError()
 
@@ -43,24 +73,37 @@ async def create_single_task(
   task: TaskCreate,
   current_user: Annotated[User, Depends(get_current_user)],
 ):
-  new_task = await create_task(task)
+  new_task = await create_task(task, current_user.id)
   if new_task:
     response.status_code = status.HTTP_201_CREATED
     return new_task
 
 
+@task_router.post("/tasks/bulk")
+async def create_multiple_tasks(
+  response: Response,
+  bulk_data: TaskBulkCreate,
+  current_user: Annotated[User, Depends(get_current_user)],
+):
+  new_tasks, failed_tasks = await create_tasks(bulk_data.tasks, current_user.id)
+  # Multi-Status when only part of the batch could be scheduled
+  response.status_code = (
+    status.HTTP_207_MULTI_STATUS if failed_tasks else status.HTTP_201_CREATED
+  )
+  return {"created": new_tasks, "failed": failed_tasks}
+
+
 @task_router.put("/tasks/{id}")
 async def update_single_task(
   id: str,
   updated_data: TaskUpdate,
   current_user: Annotated[User, Depends(get_current_user)],
 ):
-  updated_task, updated_overdue_tasks = await update_task(id, updated_data)
+  updated_task, reschedule_job_id = await update_task(
+    id, updated_data, current_user.id
+  )
   if updated_task:
-    return {
-      "updated_task": updated_task,
-      "updated_overdue_tasks": updated_overdue_tasks,
-    }
+    return {"updated_task": updated_task, "reschedule_job_id": reschedule_job_id}
 
   raise TaskNotFoundError()
 
@@ -69,11 +112,8 @@ async def update_single_task(
 async def delete_single_task(
   id: str, current_user: Annotated[User, Depends(get_current_user)]
 ):
-  deleted_task, updated_overdue_tasks = await delete_task(id)
+  deleted_task, reschedule_job_id = await delete_task(id)
   if deleted_task:
-    return {
-      "deleted_task": deleted_task,
-      "updated_overdue_tasks": updated_overdue_tasks,
-    }
+    return {"deleted_task": deleted_task, "reschedule_job_id": reschedule_job_id}
 
   raise TaskNotFoundError()
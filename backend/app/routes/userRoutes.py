@@ -3,9 +3,14 @@ from fastapi import APIRouter, Depends
 
 from app.models.userModel import User
 from app.dependencies.auth import get_current_user
+from app.exceptions.authExceptions import UserNotFoundError
+from app.services.userService.crud import get_user_by_id
 
 user_router = APIRouter()
 
 @user_router.get("/users/me")
 async def get_user(current_user: Annotated[User, Depends(get_current_user)]):
-  return current_user
+  user = await get_user_by_id(current_user.id)  # The current user is a projection
+  if user:
+    return user
+  raise UserNotFoundError()
@@ -1,5 +1,6 @@
 from datetime import date, datetime
 from typing import Any, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from beanie import PydanticObjectId
 from pydantic import BaseModel, Field, field_validator, model_validator
@@ -7,6 +8,8 @@ from pydantic import BaseModel, Field, field_validator, model_validator
 from app.types.taskTypes import Priority, Status, RangeType, SortOrder, SortBy
 from app.utils.datetime import add_utc_timezone, get_utc_now
 
+MAX_CALENDAR_RANGE_DAYS = 42  # Six weeks, the most a month view shows
+
 
 class Tag(BaseModel):
   name: str
@@ -36,8 +39,6 @@ class Split(BaseModel):
 
 
 class TaskFilter(BaseModel):
-  start_of_week: Optional[str] = None
-  end_of_week: Optional[str] = None
   search: Optional[str] = None
   status: Optional[Status] = None
   priority: Optional[Priority] = None
@@ -49,6 +50,32 @@ class TaskFilter(BaseModel):
   sort_order: SortOrder = "asc"
   page: int = Field(default=1, ge=1)
   limit: int = Field(default=10, ge=1, le=100)
+  cursor: Optional[str] = None  # Takes precedence over page when given
+
+
+class CalendarFilter(BaseModel):
+  target_date: date = Field(default_factory=lambda: get_utc_now().date())
+  end_date: Optional[date] = None  # Extends the range for month views
+  timezone: Optional[str] = None  # IANA name, the server timezone if not given
+
+  @field_validator("timezone", mode="after")
+  @classmethod
+  def check_timezone(cls, value: Optional[str]):
+    if value is not None:
+      try:
+        ZoneInfo(value)
+      except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {value}")
+    return value
+
+  @model_validator(mode="after")
+  def check_end_date(self):
+    if self.end_date is not None:
+      if self.end_date < self.target_date:
+        raise ValueError("end_date must not be before target_date")
+      if (self.end_date - self.target_date).days > MAX_CALENDAR_RANGE_DAYS:
+        raise ValueError(f"The range must not exceed {MAX_CALENDAR_RANGE_DAYS} days")
+    return self
 
 
 class TaskCreate(BaseModel):
@@ -78,6 +105,10 @@ class TaskCreate(BaseModel):
     return data
 
 
+class TaskBulkCreate(BaseModel):
+  tasks: List[TaskCreate] = Field(min_length=1, max_length=1000)
+
+
 class TaskUpdate(BaseModel):
   scheduling_hour_id: Optional[PydanticObjectId] = None
   smart_scheduling: bool = False
@@ -1,6 +1,13 @@
 from app.db.redis import blacklist_tokens
+from app.utils.auth import decode_token
+from app.utils.tokenCache import TokenCache
 
 
 async def logout_user_account(access_token: str, refresh_token: str):
 	# Invalidate the tokens by adding them to the blacklist
 	await blacklist_tokens(access_token, refresh_token)
+
+	# Evict the access token from this process right away, others are notified
+	access_payload = decode_token(access_token) if access_token else None
+	if access_payload:
+		TokenCache.invalidate(access_payload.get("jti"))
@@ -1,4 +1,3 @@
-from fastapi import BackgroundTasks
 from pydantic import EmailStr
 
 from app.config.frontend import frontend_settings
@@ -7,9 +6,7 @@ from app.services.userService.crud import get_user_by_email
 from app.utils.auth import create_url_safe_token
 
 
-async def send_confirm_reset_password(
-  background_tasks: BackgroundTasks, email: EmailStr
-):
+async def send_confirm_reset_password(email: EmailStr):
   user = await get_user_by_email(email)
   if user:
     password_reset_token = create_url_safe_token(
@@ -19,6 +16,6 @@ async def send_confirm_reset_password(
     password_reset_link = (
       f"{frontend_settings.DOMAIN}/forgot-password/{password_reset_token}"
     )
-    await send_password_reset_link(background_tasks, user.email, password_reset_link)
+    await send_password_reset_link(user.email, password_reset_link)
     return True
   return False
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from email.message import EmailMessage
+from email.utils import formataddr
+from pathlib import Path
+from typing import Dict, List
+
+import aiosmtplib
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+from app.config.email import email_settings
+
+TEMPLATE_FOLDER = Path(__file__).resolve().parent.parent.parent / "templates"
+TEMPLATE_NAMES = ["emailVerification.html", "passwordReset.html"]
+
+
+class MailDispatcher:
+  """
+  Sends queued emails in the background over a pool of persistent SMTP connections.
+
+  Each worker owns one connection and sends every message waiting in the queue
+  (up to MAIL_BATCH_SIZE) before going back to sleep. Failed sends are retried with
+  exponential backoff on a fresh connection, and an email that cannot be sent is
+  logged and dropped without stopping its worker.
+  """
+
+  queue: asyncio.Queue | None = None
+  workers: List[asyncio.Task] = []
+  templates: Dict[str, Template] = {}
+
+  @staticmethod
+  def start():
+    logging.info("Starting the mail dispatcher...")
+    # Compile the templates once instead of on every email
+    environment = Environment(
+      loader=FileSystemLoader(TEMPLATE_FOLDER), autoescape=select_autoescape(["html"])
+    )
+    MailDispatcher.templates = {
+      name: environment.get_template(name) for name in TEMPLATE_NAMES
+    }
+
+    MailDispatcher.queue = asyncio.Queue(maxsize=email_settings.MAIL_QUEUE_MAXSIZE)
+    MailDispatcher.workers = [
+      asyncio.create_task(MailDispatcher.run())
+      for _ in range(email_settings.MAIL_POOL_SIZE)
+    ]
+
+  @staticmethod
+  async def stop():
+    logging.info("Stopping the mail dispatcher...")
+    # Give queued emails a chance to go out before shutting down
+    try:
+      await asyncio.wait_for(
+        MailDispatcher.queue.join(), timeout=email_settings.MAIL_TIMEOUT
+      )
+    except asyncio.TimeoutError:
+      logging.warning(f"Dropped {MailDispatcher.queue.qsize()} unsent emails.")
+
+    for worker in MailDispatcher.workers:
+      worker.cancel()
+    await asyncio.gather(*MailDispatcher.workers, return_exceptions=True)
+
+  @staticmethod
+  async def send_template(
+    recipient: str, subject: str, template_name: str, template_body: dict
+  ):
+    """
+    Render an HTML template and queue the email
+    """
+    message = EmailMessage()
+    message["From"] = formataddr(
+      (email_settings.MAIL_FROM_NAME, email_settings.MAIL_FROM)
+    )
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(
+      MailDispatcher.templates[template_name].render(**template_body), subtype="html"
+    )
+    await MailDispatcher.queue.put(message)
+
+  @staticmethod
+  def create_connection() -> aiosmtplib.SMTP:
+    return aiosmtplib.SMTP(
+      hostname=email_settings.MAIL_SERVER,
+      port=email_settings.MAIL_PORT,
+      use_tls=email_settings.MAIL_SSL_TLS,
+      start_tls=email_settings.MAIL_STARTTLS,
+      validate_certs=email_settings.VALIDATE_CERTS,
+      timeout=email_settings.MAIL_TIMEOUT,
+    )
+
+  @staticmethod
+  async def ensure_connected(smtp: aiosmtplib.SMTP):
+    if not smtp.is_connected:
+      await smtp.connect()
+      if email_settings.USE_CREDENTIALS:
+        await smtp.login(email_settings.MAIL_USERNAME, email_settings.MAIL_PASSWORD)
+
+  @staticmethod
+  async def send_with_retry(smtp: aiosmtplib.SMTP, message: EmailMessage):
+    for attempt in range(email_settings.MAIL_MAX_RETRIES + 1):
+      try:
+        await MailDispatcher.ensure_connected(smtp)
+        await smtp.send_message(message)
+        return
+      except (aiosmtplib.SMTPException, OSError):
+        # The server may have dropped the connection, start over with a new one
+        if smtp.is_connected:
+          smtp.close()
+        if attempt == email_settings.MAIL_MAX_RETRIES:
+          logging.exception(f"Failed to send an email to {message['To']}.")
+          return
+        await asyncio.sleep(email_settings.MAIL_RETRY_BASE_DELAY * 2**attempt)
+
+  @staticmethod
+  async def run():
+    smtp = MailDispatcher.create_connection()
+    try:
+      while True:
+        # Send everything already waiting over the same connection
+        batch = [await MailDispatcher.queue.get()]
+        while (
+          len(batch) < email_settings.MAIL_BATCH_SIZE
+          and not MailDispatcher.queue.empty()
+        ):
+          batch.append(MailDispatcher.queue.get_nowait())
+
+        for message in batch:
+          try:
+            await MailDispatcher.send_with_retry(smtp, message)
+          except Exception:
+            logging.exception(f"Dropped an email to {message['To']}.")
+            if smtp.is_connected:
+              smtp.close()
+          finally:
+            MailDispatcher.queue.task_done()
+    finally:
+      if smtp.is_connected:
+        smtp.close()
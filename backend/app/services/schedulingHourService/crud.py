@@ -1,5 +1,6 @@
 from app.models.schedulingHourModel import SchedulingHour
 from app.schemas.schedulingHourSchema import SchedulingHourCreate, SchedulingHourUpdate
+from app.services.schedulingHourService.weeklySchedule import SchedulingHourCache
 from app.utils.datetime import convert_day_of_week
 
 
@@ -48,6 +49,7 @@ async def update_scheduling_hour(id: str, updated_data: SchedulingHourUpdate):
 
 	updated_scheduling_hour = updated_scheduling_hour.model_copy(update=updated_data_dict)
 	await updated_scheduling_hour.save()
+	SchedulingHourCache.invalidate(id)
 
 	return updated_scheduling_hour
 
@@ -56,5 +58,6 @@ async def delete_scheduling_hour(id: str):
 	deleted_scheduling_hour = await SchedulingHour.get(id)
 	if deleted_scheduling_hour:
 		await deleted_scheduling_hour.delete()
+		SchedulingHourCache.invalidate(id)
 		return deleted_scheduling_hour
 	return None
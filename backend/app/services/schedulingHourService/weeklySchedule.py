@@ -0,0 +1,134 @@
+import zlib
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from cachetools import TTLCache
+
+from app.config.scheduler import scheduler_settings
+from app.models.schedulingHourModel import SchedulingHour
+from app.utils.datetime import (
+	date_to_epoch_minutes,
+	from_epoch_minutes,
+	to_epoch_minutes,
+)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+class WeeklySchedule:
+	"""
+	Preferred time frames of a SchedulingHour compiled to minute-of-week intervals.
+
+	A frame whose end time is before its start time (e.g. 22:00 - 02:00 UTC) wraps
+	into the next day, and a Sunday frame may wrap past the end of the week.
+	"""
+
+	def __init__(self, intervals: List[Tuple[int, int]], id: Optional[str] = None):
+		# Merge overlapping frames so that no minute is offered twice
+		merged = []
+		for start, end in sorted(intervals):
+			if merged and start <= merged[-1][1]:
+				merged[-1][1] = max(merged[-1][1], end)
+			else:
+				merged.append([start, end])
+		if len(merged) > 1:  # Wrapping past Sunday must stop at the first Monday frame
+			merged[-1][1] = min(merged[-1][1], merged[0][0] + MINUTES_PER_WEEK)
+
+		self.intervals = tuple((start, end) for start, end in merged)  # [start, end)
+		# Frames grouped by weekday as minutes relative to that day's midnight
+		self.day_frames = tuple(
+			tuple(
+				(start - day_index * MINUTES_PER_DAY, end - day_index * MINUTES_PER_DAY)
+				for start, end in self.intervals
+				if start // MINUTES_PER_DAY == day_index
+			)
+			for day_index in range(7)
+		)
+		self.max_frame_minutes = max(
+			(end - start for start, end in self.intervals), default=0
+		)
+		# Identifies this version of the time frames, e.g. in cached summaries
+		self.key = None
+		if id is not None:
+			self.key = f"{id}:{zlib.crc32(repr(self.intervals).encode()):08x}"
+
+	@staticmethod
+	def compile(scheduling_hour: SchedulingHour):
+		intervals = []
+		for day in scheduling_hour.days_of_week:
+			day_start = day.day_index * MINUTES_PER_DAY
+			for time_frame in day.time_frames:
+				start = time_frame.start_at.hour * 60 + time_frame.start_at.minute
+				end = time_frame.end_at.hour * 60 + time_frame.end_at.minute
+				if end == start:
+					continue
+				if end < start:  # Wraps into the next day
+					end += MINUTES_PER_DAY
+				intervals.append((day_start + start, day_start + end))
+		return WeeklySchedule(intervals, str(scheduling_hour.id))
+
+	def get_preferred_windows(self, day: date, start_minute: int):
+		"""
+		Get the preferred time frames starting on a specific day as epoch minutes,
+		clipped to start_minute
+		"""
+		frames = self.day_frames[day.weekday()]
+		if not frames:
+			return []
+
+		midnight = date_to_epoch_minutes(day)
+		return [
+			(max(midnight + start, start_minute), midnight + end)
+			for start, end in frames
+			if midnight + end > start_minute  # Skip frames over before start_minute
+		]
+
+	def get_preferred_datetimes(self, day: date, start_date: datetime):
+		"""
+		Get the preferred time frames starting on a specific day, clipped to start_date
+		"""
+		return [
+			{"start_at": from_epoch_minutes(start), "end_at": from_epoch_minutes(end)}
+			for start, end in self.get_preferred_windows(
+				day, to_epoch_minutes(start_date, round_up=True)
+			)
+		]
+
+
+class SchedulingHourCache:
+	"""
+	Compiled weekly schedules by SchedulingHour id.
+
+	Entries are dropped when the SchedulingHour is updated or deleted, the TTL bounds
+	how long other processes may keep using an outdated schedule.
+	"""
+
+	cache: TTLCache = TTLCache(
+		maxsize=scheduler_settings.SCHEDULING_HOUR_CACHE_MAXSIZE,
+		ttl=scheduler_settings.SCHEDULING_HOUR_CACHE_TTL_SECONDS,
+	)
+
+	@staticmethod
+	async def get(id: Optional[PydanticObjectId]) -> Optional[WeeklySchedule]:
+		if id is None:
+			return None
+
+		schedule = SchedulingHourCache.cache.get(str(id))
+		if schedule is None:
+			scheduling_hour = await SchedulingHour.get(id)
+			if scheduling_hour is None:
+				return None
+			schedule = WeeklySchedule.compile(scheduling_hour)
+			SchedulingHourCache.cache[str(id)] = schedule
+		return schedule
+
+	@staticmethod
+	def invalidate(id: PydanticObjectId | str):
+		SchedulingHourCache.cache.pop(str(id), None)
+
+	@staticmethod
+	def clear():
+		SchedulingHourCache.cache.clear()
+
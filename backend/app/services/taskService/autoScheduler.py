@@ -1,349 +1,422 @@
-import copy
-from datetime import date, datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from beanie import PydanticObjectId
 
-from app.models.schedulingHourModel import SchedulingHour, TimeFrame
-from app.models.taskModel import Split, Task
+from app.config.scheduler import scheduler_settings
+from app.db.slowQueryLog import run_aggregation
+from app.exceptions.taskExceptions import TaskAutoScheduleError
+from app.models.taskModel import Task
 from app.schemas.taskSchema import TaskCreate, TaskUpdate
-from app.utils.datetime import add_utc_timezone
-
-
-def get_preferred_datetimes(
-	day: date, start_date: datetime, mapping: Dict[int, List[TimeFrame]]
-):
-	"""
-	Get preferred time frames on a specific day to schedule a task
-	"""
-	datetimes = []
-
-	day_index = day.weekday()
-	if day_index in list(mapping.keys()):  # Check if day is a preferred day
-		for time_frame in mapping[day_index]:
-			# The start_date is between the time frame
-			if (
-				day == start_date.date()
-				and start_date.time() > time_frame.start_at.time()
-				and start_date.time() < time_frame.end_at.time()
-			):
-				datetimes.append(
-					{
-						"start_at": datetime.combine(day, start_date.time(), tzinfo=timezone.utc),
-						"end_at": datetime.combine(
-							day, time_frame.end_at.time(), tzinfo=timezone.utc
-						),
-					}
-				)
-
-			# The preferred time frame is before start_date
-			elif (
-				day == start_date.date() and start_date.time() >= time_frame.end_at.time()
-			) or (day < start_date.date()):
-				pass
-
-				# The examined day is greater than start_date OR
-			# The examined day is start_date and before the time frame
-			else:
-				datetimes.append(
-					{
-						"start_at": datetime.combine(
-							day, time_frame.start_at.time(), tzinfo=timezone.utc
-						),
-						"end_at": datetime.combine(
-							day, time_frame.end_at.time(), tzinfo=timezone.utc
-						),
-					}
-				)
-
-	return datetimes
+from app.services.schedulingHourService.weeklySchedule import (
+	SchedulingHourCache,
+	WeeklySchedule,
+)
+from app.services.taskService.availabilityCache import (
+	AvailabilityCache,
+	get_affected_days,
+	summarize_days,
+)
+from app.services.taskService.busyTimeIndex import BusyTimeIndex
+from app.services.taskService.freeSlotEngine import (
+	compute_free_slots,
+	find_fitting_slot,
+	find_split_slots,
+	weekly_windows,
+)
+from app.utils.datetime import (
+	add_utc_timezone,
+	from_epoch_minutes,
+	get_utc_now,
+	to_epoch_minutes,
+)
+from app.utils.instrumentation import span, traced
 
 
 async def fetch_scheduled_blocks(
-	datetimes: List[Dict[str, datetime]], id: Optional[PydanticObjectId] = None
+	user_id: Optional[PydanticObjectId],
+	range_start: datetime,
+	range_end: datetime,
+	id: Optional[PydanticObjectId] = None,
+	include_ongoing: bool = True,
 ):
 	"""
-	Fetch all scheduled blocks that overlap preferred time frames to retain free slots
+	Fetch all scheduled blocks of a user between range_start and range_end in a single
+	query
 	"""
-	condition_query = []  # A query to get all tasks overlapping preferred datetimes
-
-	# Loop through each preferred time frame
-	for dt in datetimes:
-		# Tasks not end before or start after a preferred datetime
-		condition_query.append(
-			{
-				"$and": [
-					{"$lt": ["$$time_block.start_at", dt["end_at"]]},
-					{"$gt": ["$$time_block.end_at", dt["start_at"]]},
-				]
-			}
-		)
+	# Blocks already running at range_start were returned by the previous batch
+	if include_ongoing:
+		range_query = {"start_at": {"$lt": range_end}, "end_at": {"$gt": range_start}}
+		block_condition = {
+			"$and": [
+				{"$lt": ["$$time_block.start_at", range_end]},
+				{"$gt": ["$$time_block.end_at", range_start]},
+			]
+		}
+	else:
+		range_query = {"start_at": {"$gte": range_start, "$lt": range_end}}
+		block_condition = {
+			"$and": [
+				{"$lt": ["$$time_block.start_at", range_end]},
+				{"$gte": ["$$time_block.start_at", range_start]},
+			]
+		}
 
-	pipeline = []
+	# Only the user's tasks having a block in the range (user_time_allocations index)
+	query = {"user_id": user_id, "time_allocations": {"$elemMatch": range_query}}
 	if id:  # Exclude the document whose _id is equal to the given id.
-		pipeline.append({"$match": {"_id": {"$ne": id}}})
+		query["_id"] = {"$ne": id}
+
+	pipeline = [{"$match": query}]
 
 	pipeline.append(
 		{
 			"$project": {
-				"_id": 0,
+				"_id": 1,
 				"scheduled_blocks": {
 					"$filter": {
 						"input": "$time_allocations",
 						"as": "time_block",
-						"cond": {"$or": condition_query},
+						"cond": block_condition,
 					}
 				},
 			}
 		}
 	)
 
-	results = await Task.aggregate(pipeline).to_list()
+	results = await run_aggregation(Task, pipeline, "fetch_scheduled_blocks")
 
 	# Datetime fetched from MongoDB is naive => Convert naive datetime to UTC timezone
 	scheduled_blocks = []
-	naive_scheduled_blocks = []
 	if results:
 		for item in results:
-			naive_scheduled_blocks.extend(item["scheduled_blocks"])
-		for scheduled_block in naive_scheduled_blocks:
-			scheduled_block["start_at"] = add_utc_timezone(scheduled_block["start_at"])
-			scheduled_block["end_at"] = add_utc_timezone(scheduled_block["end_at"])
-			scheduled_blocks.append(scheduled_block)
+			for scheduled_block in item["scheduled_blocks"]:
+				scheduled_block["start_at"] = add_utc_timezone(scheduled_block["start_at"])
+				scheduled_block["end_at"] = add_utc_timezone(scheduled_block["end_at"])
+				scheduled_block["task_id"] = item["_id"]  # Owner of the block
+				scheduled_blocks.append(scheduled_block)
 
 	return scheduled_blocks
 
 
-def find_free_slots(
-	scheduled_blocks: List[Dict[str, datetime]], datetimes: List[Dict[str, datetime]]
-):
-	"""
-	Find free slots given lists of overlapped scheduled blocks and preferred datetimes
+class ScheduleHorizon:
 	"""
-	sorted_blocks = sorted(scheduled_blocks, key=lambda x: x["start_at"])
-
-	# Combine overlapped scheduled blocks into one scheduled block
-	deleted_indices = []
-	for i in range(len(sorted_blocks) - 1):
-		if (
-			sorted_blocks[i]["end_at"] > sorted_blocks[i + 1]["start_at"]
-			and sorted_blocks[i]["end_at"] <= sorted_blocks[i + 1]["end_at"]
-		):
-			sorted_blocks[i]["end_at"] = sorted_blocks[i + 1]["end_at"]
-			deleted_indices.append(i + 1)
-
-		if sorted_blocks[i]["end_at"] > sorted_blocks[i + 1]["end_at"]:
-			deleted_indices.append(i + 1)
-
-	if deleted_indices:
-		sorted_blocks = [
-			block for i, block in enumerate(sorted_blocks) if i not in deleted_indices
-		]
-
-	# Find free time slots
-	free_slots = []
-	for dt in datetimes:
-		# Check if there are scheduled blocks overlap dt
-		blocks_overlap_dt = [
-			block
-			for block in sorted_blocks
-			if block["start_at"] < dt["end_at"] and block["end_at"] > dt["start_at"]
-		]
-		if not blocks_overlap_dt:
-			free_slots.append(dt)
-			continue
+	Scheduled blocks prefetched from start_date onwards in batches of days.
 
-		blocks_overlap_dt.insert(0, {"start_at": dt["start_at"], "end_at": dt["start_at"]})
+	Batches are fetched on demand, and the cached availability summaries let days
+	which cannot hold the task be skipped without fetching their blocks.
+	"""
 
-		blocks_overlap_dt.append({"start_at": dt["end_at"], "end_at": dt["end_at"]})
+	def __init__(
+		self,
+		start_date: date,
+		user_id: Optional[PydanticObjectId] = None,
+		task_id: Optional[PydanticObjectId] = None,
+		batch_days: int = scheduler_settings.SCHEDULING_HORIZON_BATCH_DAYS,
+		max_db_calls: int = scheduler_settings.SCHEDULING_MAX_DB_CALLS,
+	):
+		self.user_id = user_id
+		self.task_id = task_id
+		self.batch_days = batch_days
+		self.max_db_calls = max_db_calls
+		self.db_calls = 0
+		self.start = start_date
+		self.fetched_batches = set()  # Batch numbers counted from start_date
+		self.busy_time_index = BusyTimeIndex()
+		self.managed_task_ids = set()  # Tasks whose blocks are only kept in memory
+		# Days holding released blocks, where the cached summaries understate free time
+		self.released_days = set()
+
+	@traced("scheduler_fetch")
+	async def fetch(self, first_day: date, last_day: date, schedule: WeeklySchedule):
+		"""
+		Fetch the batches of scheduled blocks covering the days which were not fetched
+		yet, and cache the availability summaries of the fetched days
+		"""
+		first_batch = (first_day - self.start).days // self.batch_days
+		last_batch = (last_day - self.start).days // self.batch_days
+		for batch in range(first_batch, last_batch + 1):
+			if batch in self.fetched_batches:
+				continue
+			if self.db_calls >= self.max_db_calls:
+				raise TaskAutoScheduleError()
+			self.db_calls += 1
+			self.fetched_batches.add(batch)
+
+			# Blocks overlapping two batches are fetched twice, which the index tolerates
+			batch_start = self.start + timedelta(days=batch * self.batch_days)
+			range_start = datetime.combine(batch_start, time.min, tzinfo=timezone.utc)
+			range_end = range_start + timedelta(days=self.batch_days)
+			generation = await AvailabilityCache.get_generation(self.user_id)
+			scheduled_blocks = await fetch_scheduled_blocks(
+				self.user_id, range_start, range_end, self.task_id
+			)
 
-		for i in range(len(blocks_overlap_dt) - 1):
-			if blocks_overlap_dt[i]["end_at"] < blocks_overlap_dt[i + 1]["start_at"]:
-				free_slots.append(
-					{
-						"start_at": blocks_overlap_dt[i]["end_at"],
-						"end_at": blocks_overlap_dt[i + 1]["start_at"],
-					}
+			for scheduled_block in scheduled_blocks:
+				if scheduled_block["task_id"] in self.managed_task_ids:
+					continue
+				self.busy_time_index.insert_block(
+					scheduled_block, scheduled_block["task_id"]
 				)
 
-	return free_slots
+			# Summaries reflect the stored blocks, in-memory changes are left out
+			busy_starts = np.array(
+				[to_epoch_minutes(block["start_at"]) for block in scheduled_blocks],
+				dtype=np.int64,
+			)
+			busy_ends = np.array(
+				[
+					to_epoch_minutes(block["end_at"], round_up=True)
+					for block in scheduled_blocks
+				],
+				dtype=np.int64,
+			)
+			summaries = summarize_days(
+				schedule,
+				batch_start,
+				batch_start + timedelta(days=self.batch_days - 1),
+				to_epoch_minutes(range_end),
+				busy_starts,
+				busy_ends,
+			)
+			await AvailabilityCache.set(self.user_id, schedule, summaries, generation)
+
+	def release(
+		self,
+		task_id: PydanticObjectId,
+		time_allocations: Optional[List[Dict]] = None,
+	):
+		"""
+		Drop the stored blocks of a task which is about to be rescheduled
+		"""
+		self.busy_time_index.remove(task_id)
+		self.managed_task_ids.add(task_id)
+		self.released_days |= get_affected_days(time_allocations or [])
+
+	def reserve(self, time_allocations: List[Dict], task_id: PydanticObjectId):
+		"""
+		Mark the new blocks of a task as busy for the next tasks in the same scope
+		"""
+		self.busy_time_index.insert_blocks(time_allocations, task_id)
+		self.managed_task_ids.add(task_id)
+
+	async def find_full_days(
+		self,
+		first_day: date,
+		last_day: date,
+		schedule: WeeklySchedule,
+		min_length: int,
+	):
+		"""
+		Days whose cached summary shows no free gap of min_length minutes
+		"""
+		days = [
+			first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)
+		]
+		summaries = await AvailabilityCache.get(self.user_id, schedule, days)
+		return {
+			day
+			for day, (_, largest_gap) in summaries.items()
+			if largest_gap < min_length and day not in self.released_days
+		}
 
+	async def free_slots_between(
+		self,
+		first_day: date,
+		last_day: date,
+		start_minute: int,
+		schedule: WeeklySchedule,
+		min_length: int,
+	):
+		"""
+		Compute the free slots of the preferred windows starting between first_day and
+		last_day as arrays of epoch-minute starts and ends. Days known to have no free
+		gap of min_length minutes are left out.
+		"""
+		full_days = await self.find_full_days(first_day, last_day, schedule, min_length)
+		window_starts, window_ends = weekly_windows(
+			schedule.intervals, first_day, last_day, start_minute, full_days
+		)
+		if len(window_ends) == 0:  # No preferred day left in the range
+			return window_starts, window_ends
+
+		# Time frames wrapping past midnight need the blocks of the next day as well
+		await self.fetch(
+			from_epoch_minutes(int(window_starts.min())).date(),
+			from_epoch_minutes(int(window_ends.max()) - 1).date(),
+			schedule,
+		)
+		# Only the busy intervals overlapping the windows, not the whole horizon
+		busy_starts, busy_ends = self.busy_time_index.to_numpy(
+			int(window_starts.min()), int(window_ends.max())
+		)
+		return compute_free_slots(window_starts, window_ends, busy_starts, busy_ends)
 
-async def calculate_free_slots(
-	day: date,
-	start_date: datetime,
-	mapping: Dict[int, List[TimeFrame]],
-	task_id: Optional[PydanticObjectId] = None,
-):
+
+def iterate_day_batches(first_day: date, last_day: date, batch_days: int):
 	"""
-	Calculate free slots on a specific day to schedule a task
+	Split [first_day, last_day] into consecutive ranges of at most batch_days days
 	"""
-	free_slots = []
-	datetimes = get_preferred_datetimes(day, start_date, mapping)
-	if datetimes:  # The current day is one of the preferred days
-		scheduled_blocks = await fetch_scheduled_blocks(datetimes, task_id)
-		if scheduled_blocks:  # Find remaining free slots
-			free_slots = find_free_slots(scheduled_blocks, datetimes)
-		else:  # There are no tasks scheduled on that day
-			free_slots = datetimes
-
-	return free_slots
+	while first_day <= last_day:
+		batch_last_day = min(first_day + timedelta(days=batch_days - 1), last_day)
+		yield first_day, batch_last_day
+		first_day = batch_last_day + timedelta(days=1)
 
 
-def find_fitting_slot(
-	duration: timedelta,
-	free_slots: List[Dict[str, datetime]],
+def create_shared_horizon(
+	user_id: Optional[PydanticObjectId], start_dates: List[datetime]
 ):
 	"""
-	Find a free time slot to assign the task completely
+	Create a horizon shared by several tasks of a user starting on different dates
 	"""
-	deleted_idx = None
-	fitting_slot = dict()
-
-	for i in range(len(free_slots)):
-		slot_interval = free_slots[i]["end_at"] - free_slots[i]["start_at"]
-		if slot_interval >= duration:
-			fitting_slot["start_at"] = free_slots[i]["start_at"]
-			fitting_slot["end_at"] = fitting_slot["start_at"] + duration
-
-			if slot_interval == duration:
-				deleted_idx = i
-			if slot_interval > duration:
-				free_slots[i]["start_at"] = fitting_slot["end_at"]
-			break
-
-	if deleted_idx:
-		del free_slots[deleted_idx]
-
-	return fitting_slot
+	start_dates = [start_date for start_date in start_dates if start_date]
+	if not start_dates:  # None of the tasks has a start date to search from
+		start_dates = [get_utc_now()]
+	horizon_start = min(start_dates)
+	horizon_end = max(start_dates)
+	return ScheduleHorizon(
+		horizon_start.date(),
+		user_id,
+		max_db_calls=scheduler_settings.SCHEDULING_MAX_DB_CALLS
+		+ (horizon_end - horizon_start).days
+		// scheduler_settings.SCHEDULING_HORIZON_BATCH_DAYS,
+	)
 
 
-def find_split_slots(
-	split: Split,
-	duration: timedelta,
-	due_date: datetime,
-	free_slots: List[Dict[str, datetime]],
+def find_free_slots(
+	scheduled_blocks: List[Dict[str, datetime]], datetimes: List[Dict[str, datetime]]
 ):
 	"""
-	Assign the task to appropriate time slots
+	Find free slots given lists of overlapped scheduled blocks and preferred datetimes
 	"""
-	time_allocations = []
-
-	remaining_duration = duration
-
-	deleted_indices = []
-
-	for i in range(len(free_slots)):
-		slot_interval = free_slots[i]["end_at"] - free_slots[i]["start_at"]
-
-		if remaining_duration != timedelta(0) and slot_interval >= split.min_duration:
-			assigned_slot = {}
-			if slot_interval <= remaining_duration:
-				assigned_slot = {
-					"start_at": free_slots[i]["start_at"],
-					"end_at": free_slots[i]["end_at"],
-				}
-				deleted_indices.append(i)
-
-			if slot_interval > remaining_duration:
-				assigned_slot = {
-					"start_at": free_slots[i]["start_at"],
-					"end_at": free_slots[i]["start_at"] + remaining_duration,
-				}
-				free_slots[i]["start_at"] = assigned_slot["end_at"]
+	windows = [
+		(to_epoch_minutes(dt["start_at"], round_up=True), to_epoch_minutes(dt["end_at"]))
+		for dt in datetimes
+	]
+	free_slots = BusyTimeIndex(scheduled_blocks).free_slots(windows)
+	return [
+		{
+			"start_at": from_epoch_minutes(free_slots[i]),
+			"end_at": from_epoch_minutes(free_slots[i + 1]),
+		}
+		for i in range(0, len(free_slots), 2)
+	]
 
-			if assigned_slot["end_at"] > due_date:
-				assigned_slot["is_scheduled_ontime"] = False
 
-			if assigned_slot["end_at"] <= due_date:
-				assigned_slot["is_scheduled_ontime"] = True
+def to_time_allocations(time_allocations: List[Tuple[int, int, bool]]):
+	"""
+	Convert (start, end, is_scheduled_ontime) epoch-minute blocks to time blocks
+	"""
+	return [
+		{
+			"start_at": from_epoch_minutes(start_at),
+			"end_at": from_epoch_minutes(end_at),
+			"is_scheduled_ontime": is_scheduled_ontime,
+		}
+		for start_at, end_at, is_scheduled_ontime in time_allocations
+	]
 
-			time_allocations.append(assigned_slot)
-			remaining_duration -= assigned_slot["end_at"] - assigned_slot["start_at"]
-		if remaining_duration == timedelta(0):
-			break
 
-	free_slots = [
-		free_slot for i, free_slot in enumerate(free_slots) if i not in deleted_indices
-	]
+def check_scheduling_capacity(
+	schedule: WeeklySchedule,
+	duration: int,
+	min_duration: Optional[int] = None,
+):
+	"""
+	Fail fast when the preferred time frames can never hold the task
+	"""
+	if not schedule.intervals:  # No preferred time frame in the whole week
+		raise TaskAutoScheduleError()
 
-	return remaining_duration, time_allocations, free_slots
+	# Every assigned block has to fit inside a single preferred time frame
+	required_length = min_duration if min_duration is not None else duration
+	if schedule.max_frame_minutes < required_length:
+		raise TaskAutoScheduleError()
 
 
 async def find_optimal_time(
-	task: Task | TaskCreate | TaskUpdate, task_id: Optional[PydanticObjectId] = None
+	task: Task | TaskCreate | TaskUpdate,
+	task_id: Optional[PydanticObjectId] = None,
+	user_id: Optional[PydanticObjectId] = None,
+	horizon: Optional[ScheduleHorizon] = None,
 ):
 	"""
 	Find time slots that align with the user's preferred schedule.
-	"""
-	scheduling_hour = await SchedulingHour.get(task.scheduling_hour_id)
-	if scheduling_hour:
-		# Construct day index - time mapping
-		mapping = {}
-		for day in scheduling_hour.days_of_week:
-			mapping[day.day_index] = day.time_frames
 
+	A shared horizon lets several tasks be scheduled against the same in-memory
+	calendar. The caller then owns the task's blocks in its busy-time index.
+	"""
+	# Compiled weekly time frames, cached across scheduling calls
+	schedule = await SchedulingHourCache.get(task.scheduling_hour_id)
+	if schedule:
 		start_date = task.start_date
 		due_date = task.due_date
 
-		# Convert duration to timedelta
-		converted_duration = timedelta(
-			hours=task.duration.hours, minutes=task.duration.minutes
-		)
-
-		# Convert min duration to timedelta
-		converted_split = None
+		# The search runs on integer minutes since the Unix epoch
+		start_minute = to_epoch_minutes(start_date, round_up=True)
+		due_minute = to_epoch_minutes(due_date)
+		duration = task.duration.hours * 60 + task.duration.minutes
+		min_duration = None
 		if task.split:
-			converted_split = copy.deepcopy(task.split)
-			converted_split.min_duration = timedelta(
-				hours=converted_split.min_duration.hours,
-				minutes=converted_split.min_duration.minutes,
+			min_duration = (
+				task.split.min_duration.hours * 60 + task.split.min_duration.minutes
 			)
 
-		# Check if there is a slot to assign full task
-		total_time_allocations = []
-		free_slots = []
+		check_scheduling_capacity(schedule, duration, min_duration)
+
+		# Scheduled blocks are fetched once per batch of days and shared by both passes
+		if horizon is None:
+			horizon = ScheduleHorizon(start_date.date(), user_id, task_id)
+
+		# Stop searching after the scheduling horizon
+		start_day = start_date.date()
+		last_day = start_day + timedelta(
+			days=scheduler_settings.SCHEDULING_MAX_HORIZON_DAYS
+		)
+
+		# Check if there is a slot to assign full task. A task allowed to split is only
+		# searched for a full slot until its due date.
+		fitting_last_day = last_day
+		if task.split:
+			fitting_last_day = max(start_day, min(due_date.date(), last_day))
 
-		day = start_date.date()  # Find slots from the start date
-		while True:  # Loop through each day until finding an empty slot
-			free_slots = await calculate_free_slots(day, start_date, mapping, task_id)
-			if free_slots:
-				fitting_slot = find_fitting_slot(converted_duration, free_slots)
+		# Free slots are computed for a batch of days at once
+		with span("scheduler_fitting"):
+			for first_day, batch_last_day in iterate_day_batches(
+				start_day, fitting_last_day, horizon.batch_days
+			):
+				slot_starts, slot_ends = await horizon.free_slots_between(
+					first_day, batch_last_day, start_minute, schedule, duration
+				)
+				fitting_slot = find_fitting_slot(duration, slot_starts, slot_ends)
 				if fitting_slot:
+					is_scheduled_ontime = fitting_slot[1] <= due_minute
 					if (
-						not task.split and fitting_slot["end_at"] > due_date
-					):  # Cannot schedule full task on time when split is not allowed
-						fitting_slot["is_scheduled_ontime"] = False  # For showing overdue tasks
-					if fitting_slot["end_at"] <= due_date:
-						fitting_slot["is_scheduled_ontime"] = True
-					if (
-						task.split and fitting_slot["end_at"] > due_date
+						task.split and not is_scheduled_ontime
 					):  # Split task if assigning full task is not possible
 						break
-					total_time_allocations.append(fitting_slot)
-					return total_time_allocations
-
-					# Early break if the task is allowed to split and the due date is today
-				if not fitting_slot and task.split and day == due_date.date():
-					break
-
-			day += timedelta(days=1)
+					# Late full tasks are kept for showing overdue tasks
+					return to_time_allocations([(*fitting_slot, is_scheduled_ontime)])
 
 		# Split a long task into smaller tasks
 		if task.split:
-			day = start_date.date()
-			remaining_duration = converted_duration
-			while True:
-				free_slots = await calculate_free_slots(day, start_date, mapping, task_id)
-				if free_slots:
-					remaining_duration, time_allocations, _ = find_split_slots(
-						converted_split, remaining_duration, due_date, free_slots
+			with span("scheduler_split"):
+				total_time_allocations = []
+				remaining_duration = duration
+				for first_day, batch_last_day in iterate_day_batches(
+					start_day, last_day, horizon.batch_days
+				):
+					slot_starts, slot_ends = await horizon.free_slots_between(
+						first_day, batch_last_day, start_minute, schedule, min_duration
 					)
+					remaining_duration, time_allocations = find_split_slots(
+						min_duration, remaining_duration, due_minute, slot_starts, slot_ends
+					)
+					total_time_allocations.extend(time_allocations)
 
-					if time_allocations:
-						total_time_allocations.extend(time_allocations)
-
-					if remaining_duration == timedelta(0):
-						return total_time_allocations
+					if remaining_duration == 0:
+						return to_time_allocations(total_time_allocations)
 
-				day += timedelta(days=1)
+		# No time slot within the scheduling horizon
+		raise TaskAutoScheduleError()
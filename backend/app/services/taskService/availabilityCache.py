@@ -0,0 +1,180 @@
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from beanie import PydanticObjectId
+from redis.exceptions import RedisError, WatchError
+
+from app.config.scheduler import scheduler_settings
+from app.db.redis import RedisClient
+from app.services.schedulingHourService.weeklySchedule import (
+	MINUTES_PER_DAY,
+	WeeklySchedule,
+)
+from app.services.taskService.freeSlotEngine import summarize_windows, weekly_windows
+from app.utils.datetime import EPOCH, date_to_epoch_minutes
+
+AVAILABILITY_KEY_PREFIX = "availability:"
+AVAILABILITY_GENERATION_KEY_PREFIX = "availability_generation:"
+
+
+def get_availability_key(user_id: PydanticObjectId, day: date):
+	return f"{AVAILABILITY_KEY_PREFIX}{user_id}:{day.isoformat()}"
+
+
+def get_generation_key(user_id: PydanticObjectId):
+	return f"{AVAILABILITY_GENERATION_KEY_PREFIX}{user_id}"
+
+
+def get_affected_days(time_allocations: Iterable[Dict]):
+	"""
+	Days whose preferred time frames may contain the blocks, including the day before
+	each block for time frames wrapping past midnight
+	"""
+	days = set()
+	for block in time_allocations:
+		day = block["start_at"].date() - timedelta(days=1)
+		while day <= block["end_at"].date():
+			days.add(day)
+			day += timedelta(days=1)
+	return days
+
+
+def summarize_days(
+	schedule: WeeklySchedule,
+	first_day: date,
+	last_day: date,
+	range_end: int,
+	busy_starts: np.ndarray,
+	busy_ends: np.ndarray,
+) -> Dict[date, Tuple[int, int]]:
+	"""
+	Free minutes and largest free gap of every preferred day whose time frames all end
+	by range_end, the end of the fetched blocks
+	"""
+	window_starts, window_ends = weekly_windows(
+		schedule.intervals, first_day, last_day, date_to_epoch_minutes(first_day)
+	)
+	if len(window_starts) == 0:
+		return {}
+
+	free_minutes, largest_gaps = summarize_windows(
+		window_starts, window_ends, busy_starts, busy_ends
+	)
+	window_days = window_starts // MINUTES_PER_DAY
+	incomplete_days = set(window_days[window_ends > range_end].tolist())
+
+	summaries = {}
+	for epoch_day, free, gap in zip(
+		window_days.tolist(), free_minutes.tolist(), largest_gaps.tolist()
+	):
+		if epoch_day in incomplete_days:
+			continue
+		day = (EPOCH + timedelta(days=epoch_day)).date()
+		total_free, largest_gap = summaries.get(day, (0, 0))
+		summaries[day] = (total_free + free, max(largest_gap, gap))
+	return summaries
+
+
+class AvailabilityCache:
+	"""
+	Per user and day summaries of the free time in a SchedulingHour's time frames,
+	stored in Redis as one hash per day keyed by the schedule version.
+
+	Summaries are computed from the fetched scheduled blocks and dropped whenever the
+	allocations of a task on that day change. Every drop bumps a per-user generation,
+	and summaries are only stored if the generation read before fetching the blocks
+	is still current, so a summary of blocks changed meanwhile is never stored. They
+	are only an optimization, so Redis errors are logged and otherwise ignored.
+	"""
+
+	@staticmethod
+	async def get_generation(user_id: Optional[PydanticObjectId]) -> Optional[str]:
+		"""
+		Read the generation of a user's summaries, before fetching the blocks to
+		summarize
+		"""
+		if user_id is None:
+			return None
+		try:
+			return await RedisClient.get_client().get(get_generation_key(user_id)) or "0"
+		except RedisError:
+			logging.warning("Could not read the availability summaries generation.")
+			return None
+
+	@staticmethod
+	async def get(
+		user_id: Optional[PydanticObjectId], schedule: WeeklySchedule, days: List[date]
+	) -> Dict[date, Tuple[int, int]]:
+		if user_id is None or schedule.key is None or not days:
+			return {}
+		try:
+			async with RedisClient.get_client().pipeline(transaction=False) as pipe:
+				for day in days:
+					pipe.hget(get_availability_key(user_id, day), schedule.key)
+				values = await pipe.execute()
+		except RedisError:
+			logging.warning("Could not read the cached availability summaries.")
+			return {}
+
+		summaries = {}
+		for day, value in zip(days, values):
+			if value:
+				free_minutes, largest_gap = value.split(":")
+				summaries[day] = (int(free_minutes), int(largest_gap))
+		return summaries
+
+	@staticmethod
+	async def set(
+		user_id: Optional[PydanticObjectId],
+		schedule: WeeklySchedule,
+		summaries: Dict[date, Tuple[int, int]],
+		generation: Optional[str],
+	):
+		"""
+		Store the summaries unless they were invalidated since generation was read
+		"""
+		if user_id is None or generation is None or schedule.key is None or not summaries:
+			return
+		generation_key = get_generation_key(user_id)
+		try:
+			async with RedisClient.get_client().pipeline(transaction=True) as pipe:
+				# An invalidation after WATCH makes EXEC fail, one before it is seen here
+				await pipe.watch(generation_key)
+				if (await pipe.get(generation_key) or "0") != generation:
+					return
+				pipe.multi()
+				for day, (free_minutes, largest_gap) in summaries.items():
+					key = get_availability_key(user_id, day)
+					pipe.hset(key, schedule.key, f"{free_minutes}:{largest_gap}")
+					pipe.expire(key, scheduler_settings.AVAILABILITY_CACHE_TTL_SECONDS)
+				await pipe.execute()
+		except WatchError:
+			pass  # The blocks changed while they were summarized
+		except RedisError:
+			logging.warning("Could not store the availability summaries.")
+
+	@staticmethod
+	async def invalidate(
+		user_id: Optional[PydanticObjectId], time_allocations: Iterable[Dict]
+	):
+		"""
+		Drop the summaries of the days touched by changed allocations, and bump the
+		generation so that summaries computed before the change are not stored
+		"""
+		days = get_affected_days(time_allocations)
+		if user_id is None or not days:
+			return
+		generation_key = get_generation_key(user_id)
+		try:
+			async with RedisClient.get_client().pipeline(transaction=False) as pipe:
+				pipe.incr(generation_key)
+				# Outlives any fetch still summarizing blocks read before the change
+				pipe.expire(
+					generation_key, scheduler_settings.AVAILABILITY_CACHE_TTL_SECONDS
+				)
+				pipe.delete(*(get_availability_key(user_id, day) for day in days))
+				await pipe.execute()
+		except RedisError:
+			logging.exception("Could not drop outdated availability summaries.")
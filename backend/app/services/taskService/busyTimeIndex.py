@@ -0,0 +1,143 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from beanie import PydanticObjectId
+
+from app.utils.datetime import to_epoch_minutes
+
+
+class BusyTimeIndex:
+	"""
+	Scheduled blocks kept as sorted arrays of merged busy intervals.
+
+	Intervals are stored as integer minutes since the Unix epoch. Free gaps inside
+	[a, b) are found with bisect in O(log n + k), where k is the number of busy
+	intervals overlapping [a, b). Blocks are tracked per task so a task's blocks can
+	be removed again when it is rescheduled.
+	"""
+
+	def __init__(self, scheduled_blocks: Iterable[Dict[str, datetime]] = ()):
+		self._starts = array("q")  # Merged busy intervals
+		self._ends = array("q")
+		self._blocks: List[Tuple[int, int, int]] = []  # Raw blocks by start
+		self._task_blocks: Dict[Optional[PydanticObjectId], List[Tuple]] = {}
+		self._counter = count()
+
+		for block in scheduled_blocks:
+			self.insert_block(block, block.get("task_id"))
+
+	def __len__(self):
+		return len(self._starts)
+
+	def insert(
+		self,
+		start_at: int,
+		end_at: int,
+		task_id: Optional[PydanticObjectId] = None,
+	):
+		"""
+		Add a scheduled block and merge it with the busy intervals it touches
+		"""
+		if start_at >= end_at:
+			return
+
+		block = (start_at, end_at, next(self._counter))
+		self._blocks.insert(bisect_left(self._blocks, block), block)
+		self._task_blocks.setdefault(task_id, []).append(block)
+
+		lo = bisect_left(self._ends, start_at)
+		hi = bisect_right(self._starts, end_at)
+		if lo < hi:
+			start_at = min(start_at, self._starts[lo])
+			end_at = max(end_at, self._ends[hi - 1])
+		self._starts[lo:hi] = array("q", (start_at,))
+		self._ends[lo:hi] = array("q", (end_at,))
+
+	def insert_block(
+		self, block: Dict[str, datetime], task_id: Optional[PydanticObjectId] = None
+	):
+		"""
+		Add a scheduled block given as datetimes, partial minutes count as busy
+		"""
+		self.insert(
+			to_epoch_minutes(block["start_at"]),
+			to_epoch_minutes(block["end_at"], round_up=True),
+			task_id,
+		)
+
+	def insert_blocks(
+		self,
+		time_allocations: Iterable[Dict[str, datetime]],
+		task_id: Optional[PydanticObjectId] = None,
+	):
+		for block in time_allocations:
+			self.insert_block(block, task_id)
+
+	def remove(self, task_id: Optional[PydanticObjectId]):
+		"""
+		Remove every scheduled block of a task and re-merge the affected intervals
+		"""
+		for block in self._task_blocks.pop(task_id, []):
+			del self._blocks[bisect_left(self._blocks, block)]
+
+			# The merged interval which contained the removed block
+			i = bisect_right(self._starts, block[0]) - 1
+			region_start, region_end = self._starts[i], self._ends[i]
+
+			# Re-merge the remaining blocks inside that interval only
+			lo = bisect_left(self._blocks, (region_start,))
+			hi = bisect_left(self._blocks, (region_end,))
+			starts, ends = array("q"), array("q")
+			for start_at, end_at, _ in self._blocks[lo:hi]:
+				if ends and start_at <= ends[-1]:
+					ends[-1] = max(ends[-1], end_at)
+				else:
+					starts.append(start_at)
+					ends.append(end_at)
+			self._starts[i : i + 1] = starts
+			self._ends[i : i + 1] = ends
+
+	def to_numpy(self, start_at: Optional[int] = None, end_at: Optional[int] = None):
+		"""
+		Copy the merged busy intervals overlapping [start_at, end_at), all of them by
+		default, to int64 arrays of starts and ends
+		"""
+		lo = 0 if start_at is None else bisect_right(self._ends, start_at)
+		hi = len(self._starts) if end_at is None else bisect_left(self._starts, end_at)
+		# Slicing copies, so the index arrays are not locked by an exported buffer
+		return (
+			np.frombuffer(self._starts[lo:hi], dtype=np.int64),
+			np.frombuffer(self._ends[lo:hi], dtype=np.int64),
+		)
+
+	def free_gaps(self, start_at: int, end_at: int, gaps: Optional[array] = None):
+		"""
+		Append the free gaps inside [start_at, end_at) as flat (start, end) pairs
+		"""
+		if gaps is None:
+			gaps = array("q")
+		cursor = start_at
+		i = bisect_right(self._ends, start_at)  # First busy interval ending after start
+		while i < len(self._starts) and self._starts[i] < end_at:
+			if cursor < self._starts[i]:
+				gaps.append(cursor)
+				gaps.append(self._starts[i])
+			cursor = max(cursor, self._ends[i])
+			i += 1
+		if cursor < end_at:
+			gaps.append(cursor)
+			gaps.append(end_at)
+		return gaps
+
+	def free_slots(self, windows: Sequence[Tuple[int, int]]) -> array:
+		"""
+		Find free slots inside each preferred window as flat (start, end) pairs
+		"""
+		free_slots = array("q")
+		for start_at, end_at in windows:
+			self.free_gaps(start_at, end_at, free_slots)
+		return free_slots
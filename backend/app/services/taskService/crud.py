@@ -1,8 +1,19 @@
 from datetime import time, datetime
+from typing import List
+from zoneinfo import ZoneInfo
 from beanie import PydanticObjectId
 
+from app.db.slowQueryLog import run_aggregation
+from app.exceptions.taskExceptions import (
+  TASK_AUTO_SCHEDULE_DETAIL,
+  InvalidCursorError,
+  TaskAutoScheduleError,
+)
 from app.models.taskModel import Task
-from app.schemas.taskSchema import TaskCreate, TaskUpdate, TaskFilter
+from app.schemas.taskSchema import CalendarFilter, TaskCreate, TaskUpdate, TaskFilter
+from app.services.taskService.availabilityCache import AvailabilityCache
+from app.utils.datetime import get_week_bounds, tz
+from app.utils.pagination import build_cursor_query, decode_cursor, encode_cursor
 
 
 async def get_task_by_id(id: str):
@@ -13,153 +24,226 @@ async def get_task_by_id(id: str):
 
 
 async def get_tasks(filters: TaskFilter):
-  pipeline = []
-
+  """
+  Return a page of tasks and the cursor of the next page (None for the last page)
+  """
+  query = {}
   if filters.search:
-    pipeline.append({"$match": {"$text": {"$search": filters.search}}})
-
-  if filters.start_of_week and filters.end_of_week:
-    pipeline = [
-      {"$unwind": "$time_allocations"},
-      {
-        "$addFields": {
-          "task_start_at": {
-            "$dateToString": {
-              "format": "%Y-%m-%d",
-              "date": "$time_allocations.start_at",
-            }
-          }
-        }
-      },
-      {
-        "$match": {
-          "task_start_at": {"$gte": filters.start_of_week, "$lte": filters.end_of_week}
-        }
-      },
-      {
-        "$group": {
-          "_id": "$_id",
-          "scheduling_hour_id": {"$first": "$scheduling_hour_id"},
-          "smart_scheduling": {"$first": "$smart_scheduling"},
-          "name": {"$first": "$name"},
-          "priority": {"$first": "$priority"},
-          "status": {"$first": "$status"},
-          "tags": {"$first": "$tags"},
-          "duration": {"$first": "$duration"},
-          "split": {"$first": "$split"},
-          "start_date": {"$first": "$start_date"},
-          "due_date": {"$first": "$due_date"},
-          "created_at": {"$first": "$created_at"},
-          "updated_at": {"$first": "$updated_at"},
-          "description": {"$first": "$description"},
-          "time_allocations": {"$push": "$time_allocations"},
-        }
-      },
-      {"$project": {"task_start_at": 0}},
+    query["$text"] = {"$search": filters.search}
+
+  sort_field = (
+    "used_due_date"
+    if filters.sort_by == "due_date"
+    else "used_start_date"
+    if filters.sort_by == "start_date"
+    else filters.sort_by
+  )
+
+  sort_order = 1 if filters.sort_order == "asc" else -1
+
+  if filters.status is not None:
+    query["status"] = filters.status
+  if filters.priority is not None:
+    query["priority"] = filters.priority
+  if filters.tags:
+    query["$or"] = [
+      {"tags": {"$elemMatch": {"name": {"$regex": tag, "$options": "i"}}}}
+      for tag in filters.tags.split(",")
     ]
-
-  else:
-    query = {}
-
-    sort_field = (
-      "used_due_date"
-      if filters.sort_by == "due_date"
-      else "used_start_date"
-      if filters.sort_by == "start_date"
-      else filters.sort_by
-    )
-
-    sort_order = 1 if filters.sort_order == "asc" else -1
-
-    if filters.status is not None:
-      query["status"] = filters.status
-    if filters.priority is not None:
-      query["priority"] = filters.priority
-    if filters.tags:
-      query["$or"] = [
-        {"tags": {"$elemMatch": {"name": {"$regex": tag, "$options": "i"}}}}
-        for tag in filters.tags.split(",")
-      ]
-    if filters.from_date and filters.to_date and filters.range_type:
-      from_date = datetime.combine(filters.from_date, time(0, 0))
-      to_date = datetime.combine(filters.to_date, time(23, 59, 59))
-      if filters.range_type == "start_date":
-        query["used_start_date"] = {"$gte": from_date, "$lte": to_date}
-      else:
-        query["used_due_date"] = {"$gte": from_date, "$lte": to_date}
-
-    pipeline = [
-      {
-        "$addFields": {
-          "used_start_date": {
-            "$cond": {
-              "if": "$smart_scheduling",
-              "then": "$start_date",
-              "else": {
-                "$getField": {
-                  "field": "start_at",
-                  "input": {"$arrayElemAt": ["$time_allocations", 0]},
-                }
-              },
-            }
-          },
-          "used_due_date": {
-            "$cond": {
-              "if": "$smart_scheduling",
-              "then": "$due_date",
-              "else": {
-                "$getField": {
-                  "field": "end_at",
-                  "input": {"$arrayElemAt": ["$time_allocations", 0]},
-                }
-              },
-            }
-          },
-        }
-      },
-      {"$match": query},
-      {"$sort": {sort_field: sort_order}},
-    ]
-
-  # Pagination
-  skip = (filters.page - 1) * filters.limit
-  pipeline.extend([{"$skip": skip}, {"$limit": filters.limit}])
-
-  results = await Task.aggregate(pipeline).to_list()
+  if filters.from_date and filters.to_date and filters.range_type:
+    from_date = datetime.combine(filters.from_date, time(0, 0))
+    to_date = datetime.combine(filters.to_date, time(23, 59, 59))
+    if filters.range_type == "start_date":
+      query["used_start_date"] = {"$gte": from_date, "$lte": to_date}
+    else:
+      query["used_due_date"] = {"$gte": from_date, "$lte": to_date}
+
+  # Keyset pagination: continue right after the last task of the previous page
+  if filters.cursor:
+    decoded_cursor = decode_cursor(filters.cursor)
+    if not decoded_cursor:
+      raise InvalidCursorError()
+    cursor_query = build_cursor_query(sort_field, sort_order, *decoded_cursor)
+    query = {"$and": [query, cursor_query]} if query else cursor_query
+
+  pipeline = [
+    {"$match": query},
+    {"$sort": {sort_field: sort_order, "_id": sort_order}},
+  ]
+  if not filters.cursor:
+    pipeline.append({"$skip": (filters.page - 1) * filters.limit})
+  pipeline.append({"$limit": filters.limit})
+
+  results = await run_aggregation(Task, pipeline, "get_tasks")
 
   if results:
+    next_cursor = None
+    if len(results) == filters.limit:
+      last_task = results[-1]
+      next_cursor = encode_cursor(last_task.get(sort_field), last_task["_id"])
+
     tasks = []
     for task in results:
       task["id"] = task.pop("_id")
       tasks.append(Task(**task))
-    return tasks
-  return None
+    return tasks, next_cursor
+  return None, None
+
 
+async def get_calendar_tasks(filters: CalendarFilter, user_id: PydanticObjectId):
+  """
+  Return the user's tasks with only their time blocks starting in the week of the
+  target date (through the week of the end date if given), in the user's timezone
+  """
+  week_tz = ZoneInfo(filters.timezone) if filters.timezone else tz
+  week_start, week_end = get_week_bounds(filters.target_date, week_tz)
+  if filters.end_date:
+    _, week_end = get_week_bounds(filters.end_date, week_tz)
+
+  pipeline = [
+    # Uses the user_time_allocations index
+    {
+      "$match": {
+        "user_id": user_id,
+        "time_allocations": {
+          "$elemMatch": {"start_at": {"$gte": week_start, "$lt": week_end}}
+        },
+      }
+    },
+    # Keep the time blocks of the week only
+    {
+      "$set": {
+        "time_allocations": {
+          "$filter": {
+            "input": "$time_allocations",
+            "as": "time_block",
+            "cond": {
+              "$and": [
+                {"$gte": ["$$time_block.start_at", week_start]},
+                {"$lt": ["$$time_block.start_at", week_end]},
+              ]
+            },
+          }
+        }
+      }
+    },
+  ]
 
-async def create_task(task: TaskCreate):
+  results = await run_aggregation(Task, pipeline, "get_calendar_tasks")
+
+  tasks = []
+  for task in results:
+    task["id"] = task.pop("_id")
+    tasks.append(Task(**task))
+  return tasks
+
+
+async def create_task(task: TaskCreate, user_id: PydanticObjectId):
   from app.services.taskService.autoScheduler import find_optimal_time
 
   task_dict = task.model_dump()
+  task_dict["user_id"] = user_id
   if task.smart_scheduling:
-    time_allocations = await find_optimal_time(task)
+    time_allocations = await find_optimal_time(task, user_id=user_id)
     if time_allocations:
       task_dict["time_allocations"] = time_allocations
 
   new_task = Task(**task_dict)
   await new_task.insert()
   if new_task.id:
+    await AvailabilityCache.invalidate(user_id, task_dict["time_allocations"] or [])
     return new_task
   return None
 
 
-async def update_task(id: str, updated_data: TaskUpdate):
-  from app.services.taskService.autoScheduler import find_optimal_time
-  from app.services.taskService.rescheduler import reschedule_overdue_tasks
+async def create_tasks(tasks: List[TaskCreate], user_id: PydanticObjectId):
+  """
+  Create the tasks that could be scheduled and return them with the index and
+  error of each task that could not
+  """
+  from app.services.taskService.autoScheduler import (
+    create_shared_horizon,
+    find_optimal_time,
+  )
+
+  task_dicts = []
+  for task in tasks:
+    task_dict = task.model_dump()
+    task_dict["id"] = PydanticObjectId()  # Known before insertion for the calendar
+    task_dict["user_id"] = user_id
+    task_dicts.append(task_dict)
+
+  failed_tasks = []
+  smart_tasks = [
+    (index, task, task_dict)
+    for index, (task, task_dict) in enumerate(zip(tasks, task_dicts))
+    if task.smart_scheduling
+  ]
+  if smart_tasks:
+    # Schedule every task against one in-memory calendar of the user
+    horizon = create_shared_horizon(
+      user_id, [task.start_date for _, task, _ in smart_tasks]
+    )
+
+    # Manually scheduled tasks of the batch are busy time as well
+    for task, task_dict in zip(tasks, task_dicts):
+      if not task.smart_scheduling and task.time_allocations:
+        horizon.reserve(task_dict["time_allocations"], task_dict["id"])
+
+    # Urgent tasks pick their slots first, those without a due date last
+    smart_tasks.sort(
+      key=lambda item: (
+        -item[1].priority,
+        item[1].due_date is None,
+        item[1].due_date,
+      )
+    )
+    for index, task, task_dict in smart_tasks:
+      try:
+        time_allocations = await find_optimal_time(
+          task, user_id=user_id, horizon=horizon
+        )
+      except TaskAutoScheduleError:
+        # The other tasks of the batch are still created
+        failed_tasks.append({"index": index, "detail": TASK_AUTO_SCHEDULE_DETAIL})
+        continue
+      if time_allocations:
+        task_dict["time_allocations"] = time_allocations
+        horizon.reserve(time_allocations, task_dict["id"])
+
+  failed_indexes = {failed_task["index"] for failed_task in failed_tasks}
+  new_tasks = [
+    Task(**task_dict)
+    for index, task_dict in enumerate(task_dicts)
+    if index not in failed_indexes
+  ]
+  if new_tasks:
+    await Task.insert_many(new_tasks)
+    await AvailabilityCache.invalidate(
+      user_id,
+      [
+        time_block.model_dump()
+        for new_task in new_tasks
+        for time_block in new_task.time_allocations
+      ],
+    )
+  failed_tasks.sort(key=lambda failed_task: failed_task["index"])
+  return new_tasks, failed_tasks
+
+
+async def update_task(id: str, updated_data: TaskUpdate, user_id: PydanticObjectId):
+  from app.services.taskService.autoScheduler import (
+    ScheduleHorizon,
+    find_optimal_time,
+  )
+  from app.services.taskService.rescheduleWorker import RescheduleWorker
 
   # Get existing task
   existing_task = await get_task_by_id(id)
   if not existing_task:
     return None, None
+  # Keep the owner. Tasks stored without one are given to the editing user.
+  owner_id = existing_task.user_id or user_id
 
   # Check if updated fields related to the smart scheduling feature
   existing_data_dict = existing_task.model_dump()
@@ -182,41 +266,49 @@ async def update_task(id: str, updated_data: TaskUpdate):
   if (updated_fields and updated_data_dict["smart_scheduling"]) or (
     not existing_data_dict["smart_scheduling"] and updated_data_dict["smart_scheduling"]
   ):
-    time_allocations = await find_optimal_time(updated_data, PydanticObjectId(id))
+    # The task's current blocks are free again while it is rescheduled
+    horizon = ScheduleHorizon(
+      updated_data.start_date.date(), owner_id, PydanticObjectId(id)
+    )
+    horizon.release(PydanticObjectId(id), existing_data_dict["time_allocations"])
+    time_allocations = await find_optimal_time(
+      updated_data, PydanticObjectId(id), owner_id, horizon
+    )
     if time_allocations:
       updated_data_dict["time_allocations"] = time_allocations
 
   # Update task in MongoDB
   updated_data_dict["id"] = id  # Add id to updated data
+  updated_data_dict["user_id"] = owner_id
   updated_task = Task(**updated_data_dict)
   await updated_task.save()
+  await AvailabilityCache.invalidate(
+    updated_task.user_id,
+    existing_data_dict["time_allocations"]
+    + [time_block.model_dump() for time_block in updated_task.time_allocations],
+  )
 
-  # If there are overdue tasks, reschedule them
+  # If there are overdue tasks, reschedule them in the background
   if updated_task:
-    # Get overdue tasks rescheduled successfully
-    updated_overdue_tasks = await reschedule_overdue_tasks(updated_task.id)
-
-    if updated_overdue_tasks:  # Update data in Mongodb
-      for updated_overdue_task in updated_overdue_tasks:
-        await updated_overdue_task.save()
-
-    return updated_task, updated_overdue_tasks
+    reschedule_job_id = await RescheduleWorker.enqueue(
+      updated_task.user_id, updated_task.id
+    )
+    return updated_task, reschedule_job_id
   return None, None
 
 
 async def delete_task(id: str):
-  from app.services.taskService.rescheduler import reschedule_overdue_tasks
+  from app.services.taskService.rescheduleWorker import RescheduleWorker
 
   deleted_task = await Task.get(id)
   await deleted_task.delete()
+  await AvailabilityCache.invalidate(
+    deleted_task.user_id,
+    [time_block.model_dump() for time_block in deleted_task.time_allocations],
+  )
 
+  # Freed slots are handed to overdue tasks in the background
   if deleted_task:
-    # Get overdue tasks rescheduled successfully
-    updated_overdue_tasks = await reschedule_overdue_tasks()
-
-    if updated_overdue_tasks:  # Update data in Mongodb
-      for updated_overdue_task in updated_overdue_tasks:
-        await updated_overdue_task.save()
-
-    return deleted_task, updated_overdue_tasks
+    reschedule_job_id = await RescheduleWorker.enqueue(deleted_task.user_id)
+    return deleted_task, reschedule_job_id
   return None, None
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Dict, Optional
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+from cachetools import TTLCache
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+
+from app.config.scheduler import scheduler_settings
+from app.db.redis import RedisClient
+from app.services.taskService.rescheduler import reschedule_overdue_tasks
+from app.utils.datetime import get_utc_now
+
+RESCHEDULE_JOB_KEY_PREFIX = "reschedule_job:"
+
+
+class RescheduleWorker:
+  """
+  Background worker rescheduling overdue tasks outside of the request path.
+
+  Edits made by the same user while a job is still pending are coalesced into
+  that job, so a burst of updates/deletes costs a single reschedule pass. A job
+  only reaches the queue once its user's coalescing delay has passed, so the delay
+  never holds up the jobs of other users.
+
+  The queue lives in the process that accepted the edit, but every status change
+  is saved to Redis so any app worker can answer a status poll.
+  """
+
+  queue: asyncio.Queue | None = None
+  worker_task: asyncio.Task | None = None
+  jobs: TTLCache = TTLCache(
+    maxsize=scheduler_settings.RESCHEDULE_JOB_MAX_RETAINED,
+    ttl=scheduler_settings.RESCHEDULE_JOB_TTL_SECONDS,
+  )
+  pending_jobs: Dict[Optional[PydanticObjectId], str] = {}  # user_id -> job_id
+  delayed_jobs: Dict[str, asyncio.TimerHandle] = {}  # job_id -> queueing timer
+
+  @staticmethod
+  def start():
+    logging.info("Starting the reschedule worker...")
+    RescheduleWorker.queue = asyncio.Queue()
+    RescheduleWorker.worker_task = asyncio.create_task(RescheduleWorker.run())
+
+  @staticmethod
+  async def stop():
+    logging.info("Stopping the reschedule worker...")
+    for handle in RescheduleWorker.delayed_jobs.values():
+      handle.cancel()
+    RescheduleWorker.delayed_jobs.clear()
+    RescheduleWorker.worker_task.cancel()
+    try:
+      await RescheduleWorker.worker_task
+    except asyncio.CancelledError:
+      pass
+
+  @staticmethod
+  async def enqueue(
+    user_id: Optional[PydanticObjectId],
+    updated_task_id: Optional[PydanticObjectId] = None,
+  ) -> str:
+    """
+    Queue a reschedule pass for the user and return its job id
+    """
+    job_id = RescheduleWorker.pending_jobs.get(user_id)
+    if job_id and job_id in RescheduleWorker.jobs:  # Coalesce into the pending job
+      if updated_task_id:
+        RescheduleWorker.jobs[job_id]["excluded_task_ids"].append(updated_task_id)
+      return job_id
+
+    job_id = str(uuid.uuid4())
+    RescheduleWorker.jobs[job_id] = {
+      "id": job_id,
+      "user_id": user_id,
+      "status": "pending",
+      "excluded_task_ids": [updated_task_id] if updated_task_id else [],
+      "updated_overdue_tasks": [],
+      "created_at": get_utc_now(),
+      "finished_at": None,
+    }
+    RescheduleWorker.pending_jobs[user_id] = job_id
+    await RescheduleWorker.save_job(RescheduleWorker.jobs[job_id])
+    # Give a burst of edits the chance to join this job before it is queued
+    RescheduleWorker.delayed_jobs[job_id] = asyncio.get_running_loop().call_later(
+      scheduler_settings.RESCHEDULE_COALESCE_SECONDS,
+      RescheduleWorker.queue_delayed_job,
+      job_id,
+    )
+    return job_id
+
+  @staticmethod
+  def queue_delayed_job(job_id: str):
+    RescheduleWorker.delayed_jobs.pop(job_id, None)
+    RescheduleWorker.queue.put_nowait(job_id)
+
+  @staticmethod
+  def get_job_key(job_id: str) -> str:
+    return f"{RESCHEDULE_JOB_KEY_PREFIX}{job_id}"
+
+  @staticmethod
+  def get_job_status(job: dict) -> dict:
+    return jsonable_encoder(
+      {key: value for key, value in job.items() if key != "excluded_task_ids"},
+      custom_encoder={ObjectId: str},
+    )
+
+  @staticmethod
+  async def save_job(job: dict):
+    """
+    Save the public status of the job for the status polls of every app worker
+    """
+    status = RescheduleWorker.get_job_status(job)
+    try:
+      await RedisClient.get_client().set(
+        RescheduleWorker.get_job_key(job["id"]),
+        json.dumps(status),
+        ex=scheduler_settings.RESCHEDULE_JOB_TTL_SECONDS,
+      )
+    except RedisError:
+      logging.exception(f"Could not save the status of reschedule job {job['id']}.")
+
+  @staticmethod
+  async def get_job(job_id: str) -> Optional[dict]:
+    """
+    Return the JSON-ready status of the job, whichever app worker runs it
+    """
+    try:
+      status = await RedisClient.get_client().get(RescheduleWorker.get_job_key(job_id))
+      if status is not None:
+        return json.loads(status)
+    except RedisError:
+      logging.exception(f"Could not load the status of reschedule job {job_id}.")
+
+    # Fall back on the jobs of this process when the status could not be saved
+    job = RescheduleWorker.jobs.get(job_id)
+    if job is None:
+      return None
+    return RescheduleWorker.get_job_status(job)
+
+  @staticmethod
+  async def run():
+    while True:
+      job_id = await RescheduleWorker.queue.get()
+      job = RescheduleWorker.jobs.get(job_id)
+      if job is None:  # Expired before it could run
+        RescheduleWorker.queue.task_done()
+        continue
+
+      RescheduleWorker.pending_jobs.pop(job["user_id"], None)
+      job["status"] = "running"
+      await RescheduleWorker.save_job(job)
+      try:
+        job["updated_overdue_tasks"] = await reschedule_overdue_tasks(
+          job["user_id"], job["excluded_task_ids"]
+        )
+        job["status"] = "completed"
+      except Exception:
+        logging.exception(f"Reschedule job {job_id} failed.")
+        job["status"] = "failed"
+      job["finished_at"] = get_utc_now()
+      await RescheduleWorker.save_job(job)
+      RescheduleWorker.queue.task_done()
@@ -1,43 +1,145 @@
-from typing import Optional
+import logging
+from typing import List, Optional
 
 from beanie import PydanticObjectId
-from beanie.operators import NE, ElemMatch, Eq
+from beanie.operators import Eq, In, NotIn
+from pymongo import UpdateOne
 
+from app.exceptions.taskExceptions import TaskAutoScheduleError
 from app.models.taskModel import Task
-from app.services.taskService.autoScheduler import find_optimal_time
+from app.schemas.taskSchema import TimeBlock
+from app.services.taskService.availabilityCache import AvailabilityCache
+from app.services.taskService.autoScheduler import (
+	create_shared_horizon,
+	find_optimal_time,
+)
 from app.utils.datetime import get_utc_now
+from app.utils.instrumentation import traced
 
 
-async def fetch_overdue_tasks(updated_task_id: Optional[PydanticObjectId] = None):
+async def fetch_overdue_tasks(
+	user_id: Optional[PydanticObjectId],
+	excluded_task_ids: Optional[List[PydanticObjectId]] = None,
+):
 	"""
-	Fetch tasks that are not scheduled on time
+	Fetch tasks of a user that are not scheduled on time
 	"""
-	overdue_tasks = await Task.find(
-		NE(Task.id, updated_task_id),
-		ElemMatch(Task.time_allocations, Eq("is_scheduled_ontime", False)),
-	).to_list()
+	# Earlier due dates first, read in order from the user_overdue_due_date index
+	return (
+		await Task.find(
+			Eq(Task.user_id, user_id),
+			Eq(Task.is_overdue, True),
+			NotIn(Task.id, excluded_task_ids or []),
+		)
+		.sort(+Task.due_date)
+		.to_list()
+	)
+
 
-	sorted_overdue_tasks = []  # Recalculate the overdue task with earlier due date
-	if overdue_tasks:
-		sorted_overdue_tasks = sorted(overdue_tasks, key=lambda x: x.due_date)
-	return sorted_overdue_tasks
+async def drop_skipped_tasks(rescheduled_tasks: List[Task]) -> List[Task]:
+	"""
+	Keep the rescheduled tasks whose new time allocations were written
+	"""
+	stored_tasks = await Task.find(
+		In(Task.id, [rescheduled_task.id for rescheduled_task in rescheduled_tasks])
+	).to_list()
+	stored_time_allocations = {
+		stored_task.id: stored_task.time_allocations for stored_task in stored_tasks
+	}
+	written_tasks = [
+		rescheduled_task
+		for rescheduled_task in rescheduled_tasks
+		if stored_time_allocations.get(rescheduled_task.id)
+		== rescheduled_task.time_allocations
+	]
+	logging.info(
+		f"Skipped {len(rescheduled_tasks) - len(written_tasks)} overdue tasks edited "
+		f"while they were rescheduled."
+	)
+	return written_tasks
 
 
-async def reschedule_overdue_tasks(updated_task_id: Optional[PydanticObjectId] = None):
+@traced("scheduler_reschedule")
+async def reschedule_overdue_tasks(
+	user_id: Optional[PydanticObjectId],
+	excluded_task_ids: Optional[List[PydanticObjectId]] = None,
+):
 	"""
-	Reschedule overdue tasks when there are free slots after deleting/updating a task
+	Reschedule overdue tasks when there are free slots after deleting/updating tasks
 	"""
-	overdue_tasks = await fetch_overdue_tasks(updated_task_id)
+	overdue_tasks = await fetch_overdue_tasks(user_id, excluded_task_ids)
 	if not overdue_tasks:  # Check if there are overdue tasks
 		return []
 
+	# Load the user's calendar once and place every overdue task against it
+	horizon = create_shared_horizon(
+		user_id, [overdue_task.start_date for overdue_task in overdue_tasks]
+	)
+
 	updated_overdue_tasks = []
-	for overdue_task in overdue_tasks:
-		rescheduled_time_allocations = await find_optimal_time(
-			overdue_task, overdue_task.id
+	read_versions = {}  # Task id -> (updated_at, time_allocations) as read
+	changed_time_allocations = []  # Old and new blocks of the rescheduled tasks
+	for overdue_task in overdue_tasks:  # Earlier due dates are rescheduled first
+		old_time_allocations = [
+			time_block.model_dump() for time_block in overdue_task.time_allocations
+		]
+		horizon.release(overdue_task.id, old_time_allocations)
+		try:
+			rescheduled_time_allocations = await find_optimal_time(
+				overdue_task, overdue_task.id, user_id, horizon
+			)
+		except TaskAutoScheduleError:  # Keep the current time allocations
+			rescheduled_time_allocations = None
+
+		if rescheduled_time_allocations:
+			read_versions[overdue_task.id] = (
+				overdue_task.updated_at,
+				old_time_allocations,
+			)
+			overdue_task.time_allocations = [
+				TimeBlock(**time_block) for time_block in rescheduled_time_allocations
+			]
+			overdue_task.updated_at = get_utc_now()
+			overdue_task.update_derived_fields()
+			updated_overdue_tasks.append(overdue_task)
+			changed_time_allocations += old_time_allocations + rescheduled_time_allocations
+
+		# Later tasks must see the slots taken by this one
+		horizon.reserve(
+			[time_block.model_dump() for time_block in overdue_task.time_allocations],
+			overdue_task.id,
+		)
+
+	# Persist every rescheduled task in a single round trip. A task edited since it
+	# was read is left as is, the edit having queued a reschedule job of its own.
+	if updated_overdue_tasks:
+		result = await Task.get_motor_collection().bulk_write(
+			[
+				UpdateOne(
+					{
+						"_id": overdue_task.id,
+						"updated_at": read_versions[overdue_task.id][0],
+						"time_allocations": read_versions[overdue_task.id][1],
+					},
+					{
+						"$set": {
+							"time_allocations": [
+								time_block.model_dump()
+								for time_block in overdue_task.time_allocations
+							],
+							"updated_at": overdue_task.updated_at,
+							"used_start_date": overdue_task.used_start_date,
+							"used_due_date": overdue_task.used_due_date,
+							"is_overdue": overdue_task.is_overdue,
+						}
+					},
+				)
+				for overdue_task in updated_overdue_tasks
+			],
+			ordered=False,
 		)
-		overdue_task.time_allocations = rescheduled_time_allocations
-		overdue_task.updated_at = get_utc_now()
-		updated_overdue_tasks.append(overdue_task)
+		if result.matched_count < len(updated_overdue_tasks):
+			updated_overdue_tasks = await drop_skipped_tasks(updated_overdue_tasks)
+		await AvailabilityCache.invalidate(user_id, changed_time_allocations)
 
 	return updated_overdue_tasks
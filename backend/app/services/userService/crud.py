@@ -2,7 +2,9 @@ from typing import Optional
 from beanie.operators import Eq
 from pydantic import EmailStr
 
+from app.db.redis import publish_user_changed
 from app.models.userModel import User
+from app.utils.tokenCache import TokenCache
 
 
 async def get_user_by_id(id: str):
@@ -19,6 +21,15 @@ async def get_user_by_email(email: EmailStr):
   return None
 
 
+async def save_user(user: User):
+  """
+  Save a changed user and evict it from the token cache of every process
+  """
+  await user.save()
+  TokenCache.invalidate_user(str(user.id))
+  await publish_user_changed(str(user.id))
+
+
 async def create_user_with_password(name: str, email: EmailStr, hashed_password: str):
   new_user = User(name=name, email=email, hashed_password=hashed_password)
   await new_user.insert()
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import jwt
@@ -9,21 +11,57 @@ from app.config.security import security_settings
 from app.db.redis import token_in_blacklist
 from app.services.userService.crud import get_user_by_email
 
-pwd_context = CryptContext(schemes=["bcrypt"])
+pwd_context = CryptContext(
+  schemes=["bcrypt"], bcrypt__rounds=security_settings.BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so hashing runs in threads without blocking the event loop
+password_hash_executor = ThreadPoolExecutor(
+  max_workers=security_settings.PASSWORD_HASH_WORKERS,
+  thread_name_prefix="password-hash",
+)
+password_hash_semaphore = asyncio.Semaphore(security_settings.PASSWORD_HASH_WORKERS)
+password_hash_stats = {"waiting": 0, "in_progress": 0, "completed": 0}
 
 
-def get_password_hash(password: str) -> str:
+async def run_password_hashing(func, *args):
+  """
+  Run a password hashing function in the worker pool, at most
+  PASSWORD_HASH_WORKERS at a time
+  """
+  password_hash_stats["waiting"] += 1
+  async with password_hash_semaphore:
+    password_hash_stats["waiting"] -= 1
+    password_hash_stats["in_progress"] += 1
+    try:
+      loop = asyncio.get_running_loop()
+      return await loop.run_in_executor(password_hash_executor, func, *args)
+    finally:
+      password_hash_stats["in_progress"] -= 1
+      password_hash_stats["completed"] += 1
+
+
+def get_password_hash_stats() -> dict:
+  """
+  Return the queue depth and throughput of the password hashing pool.
+  """
+  return {**password_hash_stats, "workers": security_settings.PASSWORD_HASH_WORKERS}
+
+
+async def get_password_hash(password: str) -> str:
   """
   Hash a password using bcrypt.
   """
-  return pwd_context.hash(password)
+  return await run_password_hashing(pwd_context.hash, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
   """
   Verify a password against a hashed password.
   """
-  return pwd_context.verify(plain_password, hashed_password)
+  return await run_password_hashing(
+    pwd_context.verify, plain_password, hashed_password
+  )
 
 
 async def authenticate_user(email: str, password: str):
@@ -31,7 +69,7 @@ async def authenticate_user(email: str, password: str):
   user = await get_user_by_email(email)
   if user:
     # Verify the password
-    is_valid_password = verify_password(password, user.hashed_password)
+    is_valid_password = await verify_password(password, user.hashed_password)
     if is_valid_password:
       return user
   return None
@@ -57,24 +95,33 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
   return token
 
 
-async def verify_token(token: str):
+def decode_token(token: str):
   """
-  Verify a JWT token and return the payload if valid.
+  Check the signature and expiry of a JWT token and return its payload if valid.
+  The blacklist is not checked.
   """
   try:
-    payload = jwt.decode(
+    return jwt.decode(
       token,
       key=security_settings.JWT_SECRET_KEY,
       algorithms=[security_settings.JWT_ALGORITHM],
     )
+  except InvalidTokenError:
+    return None
 
+
+async def verify_token(token: str):
+  """
+  Verify a JWT token and return the payload if valid.
+  """
+  payload = decode_token(token)
+  if payload:
     jti = payload.get("jti")
     is_blacklisted = await token_in_blacklist(jti)
     if is_blacklisted:
       return None
     return payload
-  except InvalidTokenError:
-    return None
+  return None
 
 
 serializer = URLSafeTimedSerializer(
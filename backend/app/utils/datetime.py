@@ -1,4 +1,4 @@
-from datetime import date, datetime, time, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
 
 
 def get_timezone():
@@ -68,3 +68,44 @@ def get_week_range(target_date: date):
 	start_of_week = target_date - timedelta(days=target_date.weekday())  # Monday
 	end_of_week = start_of_week + timedelta(days=6)  # Sunday
 	return start_of_week, end_of_week
+
+
+def get_week_bounds(target_date: date, week_tz: tzinfo = tz):
+	"""
+	Return the UTC datetimes [start, end) of the week containing the target date in
+	the given timezone
+	"""
+	start_of_week, end_of_week = get_week_range(target_date)
+	week_start = datetime.combine(start_of_week, time.min, tzinfo=week_tz)
+	week_end = datetime.combine(end_of_week + timedelta(days=1), time.min, tzinfo=week_tz)
+	return week_start.astimezone(timezone.utc), week_end.astimezone(timezone.utc)
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MINUTE = timedelta(minutes=1)
+
+
+def to_epoch_minutes(dt: datetime, round_up: bool = False) -> int:
+	"""
+	Convert a datetime to whole minutes since the Unix epoch, naive datetimes are UTC
+	"""
+	if not dt.tzinfo:
+		dt = add_utc_timezone(dt)
+	minutes, remainder = divmod(dt - EPOCH, MINUTE)
+	if round_up and remainder:
+		minutes += 1
+	return minutes
+
+
+def from_epoch_minutes(minutes: int) -> datetime:
+	"""
+	Convert minutes since the Unix epoch to a UTC datetime
+	"""
+	return EPOCH + timedelta(minutes=minutes)
+
+
+def date_to_epoch_minutes(day: date) -> int:
+	"""
+	Minutes since the Unix epoch at midnight UTC of the given day
+	"""
+	return (day.toordinal() - EPOCH.toordinal()) * 24 * 60
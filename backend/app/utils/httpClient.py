@@ -0,0 +1,59 @@
+import asyncio
+import logging
+
+import httpx
+
+from app.config.http import http_settings
+
+
+class HTTPClient:
+  """
+  Pooled async HTTP client shared by every request, opened in the app lifespan
+  """
+
+  client: httpx.AsyncClient | None = None
+
+  @staticmethod
+  def connect():
+    logging.info("Starting the HTTP client...")
+    HTTPClient.client = httpx.AsyncClient(
+      timeout=httpx.Timeout(
+        http_settings.HTTP_TIMEOUT_SECONDS,
+        connect=http_settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+      ),
+      limits=httpx.Limits(
+        max_connections=http_settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=http_settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+      ),
+    )
+
+  @staticmethod
+  async def close():
+    logging.info("Closing the HTTP client...")
+    await HTTPClient.client.aclose()
+
+  @staticmethod
+  def get_client() -> httpx.AsyncClient:
+    return HTTPClient.client
+
+  @staticmethod
+  async def get(url: str, **kwargs) -> httpx.Response:
+    """
+    GET a URL, retrying with backoff on timeouts, connection errors and 5xx
+    responses. The last response or error is returned or raised.
+    """
+    for attempt in range(http_settings.HTTP_MAX_RETRIES + 1):
+      if attempt:
+        await asyncio.sleep(
+          http_settings.HTTP_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+        )
+      try:
+        response = await HTTPClient.client.get(url, **kwargs)
+      except httpx.TransportError as error:
+        if attempt == http_settings.HTTP_MAX_RETRIES:
+          raise
+        logging.warning(f"GET {url} failed ({error!r}), retrying...")
+        continue
+      if response.status_code < 500 or attempt == http_settings.HTTP_MAX_RETRIES:
+        return response
+      logging.warning(f"GET {url} answered {response.status_code}, retrying...")
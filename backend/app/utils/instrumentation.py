@@ -0,0 +1,291 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+import bson
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.monitoring import monitoring_settings
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Upper bounds in seconds of the latency histogram buckets
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Metric name -> (type, help)
+METRIC_DESCRIPTIONS = {
+  "http_requests_total": ("counter", "HTTP requests by route, method and status."),
+  "http_request_duration_seconds": ("histogram", "HTTP request latency."),
+  "mongo_commands_total": ("counter", "Mongo commands by command and outcome."),
+  "mongo_command_duration_seconds": ("histogram", "Mongo command round trip time."),
+  "mongo_bytes_total": ("counter", "Size of Mongo commands sent and replies received."),
+  "redis_commands_total": ("counter", "Redis commands and pipelines by command."),
+  "redis_command_duration_seconds": ("histogram", "Redis command round trip time."),
+  "span_duration_seconds": ("histogram", "Time spent in instrumented code spans."),
+}
+
+
+class Histogram:
+  __slots__ = ("counts", "sum")
+
+  def __init__(self):
+    self.counts = [0] * (len(DURATION_BUCKETS) + 1)  # The last one is +Inf
+    self.sum = 0.0
+
+
+def format_labels(labels: Labels) -> str:
+  if not labels:
+    return ""
+  pairs = []
+  for name, value in labels:
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    pairs.append(f'{name}="{value}"')
+  return "{" + ",".join(pairs) + "}"
+
+
+class Metrics:
+  """
+  Process-wide counters and histograms, rendered in the Prometheus text format.
+
+  Mongo commands are reported from Motor's executor threads, hence the lock.
+  """
+
+  lock = threading.Lock()
+  counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+  histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+  @staticmethod
+  def increment(name: str, labels: Labels, value: float = 1):
+    with Metrics.lock:
+      Metrics.counters[(name, labels)] += value
+
+  @staticmethod
+  def observe(name: str, labels: Labels, seconds: float):
+    bucket = bisect_left(DURATION_BUCKETS, seconds)
+    with Metrics.lock:
+      histogram = Metrics.histograms.get((name, labels))
+      if histogram is None:
+        histogram = Metrics.histograms[(name, labels)] = Histogram()
+      histogram.counts[bucket] += 1
+      histogram.sum += seconds
+
+  @staticmethod
+  def clear():
+    with Metrics.lock:
+      Metrics.counters.clear()
+      Metrics.histograms.clear()
+
+  @staticmethod
+  def render(gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+    """
+    Render every metric, plus the given gauges (name -> (help, value))
+    """
+    with Metrics.lock:
+      counters = list(Metrics.counters.items())
+      histograms = [
+        (key, list(histogram.counts), histogram.sum)
+        for key, histogram in Metrics.histograms.items()
+      ]
+
+    samples: Dict[str, List[str]] = defaultdict(list)
+    for (name, labels), value in counters:
+      samples[name].append(f"{name}{format_labels(labels)} {value:g}")
+    for (name, labels), counts, total in histograms:
+      cumulative = 0
+      for bound, count in zip((*DURATION_BUCKETS, "+Inf"), counts):
+        cumulative += count
+        bucket_labels = format_labels((*labels, ("le", str(bound))))
+        samples[name].append(f"{name}_bucket{bucket_labels} {cumulative}")
+      samples[name].append(f"{name}_sum{format_labels(labels)} {total:g}")
+      samples[name].append(f"{name}_count{format_labels(labels)} {cumulative}")
+
+    lines = []
+    for name, (metric_type, description) in METRIC_DESCRIPTIONS.items():
+      if name in samples:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+        lines += samples[name]
+    for name, (description, value) in (gauges or {}).items():
+      lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge"]
+      lines.append(f"{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+  """
+  Database work and span durations of the current request
+  """
+
+  __slots__ = (
+    "mongo_commands",
+    "mongo_seconds",
+    "mongo_bytes",
+    "redis_commands",
+    "redis_seconds",
+    "spans",
+  )
+
+  def __init__(self):
+    self.mongo_commands = 0
+    self.mongo_seconds = 0.0
+    self.mongo_bytes = 0
+    self.redis_commands = 0
+    self.redis_seconds = 0.0
+    self.spans: Dict[str, float] = {}
+
+  def get_server_timing(self, total_seconds: float) -> str:
+    entries = [
+      f'mongo;dur={self.mongo_seconds * 1000:.1f};'
+      f'desc="{self.mongo_commands} commands, {self.mongo_bytes} bytes"',
+      f'redis;dur={self.redis_seconds * 1000:.1f};'
+      f'desc="{self.redis_commands} commands"',
+    ]
+    entries += [
+      f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items()
+    ]
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+# Set by the instrumentation middleware for the duration of every HTTP request
+request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+  "request_metrics", default=None
+)
+
+
+def record_mongo_bytes(direction: str, size: int):
+  Metrics.increment("mongo_bytes_total", (("direction", direction),), size)
+  metrics = request_metrics.get()
+  if metrics is not None:
+    with Metrics.lock:
+      metrics.mongo_bytes += size
+
+
+def record_mongo_command(command: str, outcome: str, seconds: float):
+  labels = (("command", command), ("outcome", outcome))
+  Metrics.increment("mongo_commands_total", labels)
+  Metrics.observe("mongo_command_duration_seconds", (("command", command),), seconds)
+  metrics = request_metrics.get()
+  if metrics is not None:
+    with Metrics.lock:
+      metrics.mongo_commands += 1
+      metrics.mongo_seconds += seconds
+
+
+def record_redis_command(command: str, seconds: float):
+  Metrics.increment("redis_commands_total", (("command", command),))
+  Metrics.observe("redis_command_duration_seconds", (("command", command),), seconds)
+  metrics = request_metrics.get()
+  if metrics is not None:
+    metrics.redis_commands += 1
+    metrics.redis_seconds += seconds
+
+
+class MongoCommandListener(monitoring.CommandListener):
+  """
+  Reports every Mongo command to the metrics. Motor runs pymongo in threads with a
+  copy of the calling context, so commands are attributed to their request.
+  """
+
+  def started(self, event: monitoring.CommandStartedEvent):
+    if monitoring_settings.METRICS_COUNT_BYTES:
+      record_mongo_bytes("sent", len(bson.encode(event.command)))
+
+  def succeeded(self, event: monitoring.CommandSucceededEvent):
+    if monitoring_settings.METRICS_COUNT_BYTES:
+      record_mongo_bytes("received", len(bson.encode(event.reply)))
+    record_mongo_command(event.command_name, "success", event.duration_micros / 1e6)
+
+  def failed(self, event: monitoring.CommandFailedEvent):
+    record_mongo_command(event.command_name, "failure", event.duration_micros / 1e6)
+
+
+@contextmanager
+def span(name: str):
+  """
+  Time a block of code, process-wide and in the Server-Timing header of the request
+  """
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    elapsed = time.perf_counter() - start
+    Metrics.observe("span_duration_seconds", (("span", name),), elapsed)
+    metrics = request_metrics.get()
+    if metrics is not None:
+      metrics.spans[name] = metrics.spans.get(name, 0.0) + elapsed
+
+
+def traced(name: str):
+  """
+  Time every call of a coroutine function in a span
+  """
+
+  def decorator(func: Callable):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+      with span(name):
+        return await func(*args, **kwargs)
+
+    return wrapper
+
+  return decorator
+
+
+class InstrumentationMiddleware:
+  """
+  Collect the metrics of every HTTP request and report them in its Server-Timing
+  header. Requests are labelled by route template to keep the label set bounded.
+  """
+
+  def __init__(self, app: ASGIApp):
+    self.app = app
+    self.route_paths: Dict[Callable, str] = {}  # endpoint -> route template
+
+  def get_route_path(self, scope: Scope) -> str:
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+      return "unmatched"
+    if endpoint not in self.route_paths:
+      for route in scope["app"].routes:
+        if getattr(route, "endpoint", None) is endpoint:
+          self.route_paths[endpoint] = route.path
+          break
+    return self.route_paths.get(endpoint, "unmatched")
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    metrics = RequestMetrics()
+    token = request_metrics.set(metrics)
+    start = time.perf_counter()
+    status_code = 500
+
+    async def send_with_timing(message: Message):
+      nonlocal status_code
+      if message["type"] == "http.response.start":
+        status_code = message["status"]
+        if monitoring_settings.SERVER_TIMING_ENABLED:
+          headers = MutableHeaders(scope=message)
+          headers.append(
+            "Server-Timing", metrics.get_server_timing(time.perf_counter() - start)
+          )
+      await send(message)
+
+    try:
+      await self.app(scope, receive, send_with_timing)
+    finally:
+      request_metrics.reset(token)
+      labels = (("route", self.get_route_path(scope)), ("method", scope["method"]))
+      Metrics.observe(
+        "http_request_duration_seconds", labels, time.perf_counter() - start
+      )
+      Metrics.increment("http_requests_total", (*labels, ("status", str(status_code))))
@@ -0,0 +1,51 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from beanie import PydanticObjectId
+from bson.errors import InvalidId
+
+
+def encode_cursor(sort_value: Any, id: PydanticObjectId) -> str:
+  """
+  Encode the sort key and _id of the last returned document into an opaque cursor
+  """
+  if isinstance(sort_value, datetime):
+    sort_value = {"$date": sort_value.isoformat()}
+  data = json.dumps([sort_value, str(id)], separators=(",", ":"))
+  return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[Any, PydanticObjectId]]:
+  """
+  Decode a cursor created by encode_cursor, return None if it is malformed
+  """
+  try:
+    sort_value, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if isinstance(sort_value, dict):
+      sort_value = datetime.fromisoformat(sort_value["$date"])
+    return sort_value, PydanticObjectId(id)
+  except (ValueError, TypeError, KeyError, InvalidId):
+    return None
+
+
+def build_cursor_query(
+  sort_field: str, sort_order: int, sort_value: Any, id: PydanticObjectId
+):
+  """
+  Build a query matching the documents after the cursor in (sort_field, _id) order
+  """
+  operator = "$gt" if sort_order == 1 else "$lt"
+  same_key = {sort_field: sort_value, "_id": {operator: id}}
+
+  # Null sort keys come first in ascending order and last in descending order
+  if sort_value is None:
+    if sort_order == 1:
+      return {"$or": [same_key, {sort_field: {"$ne": None}}]}
+    return same_key
+
+  after_key = {sort_field: {operator: sort_value}}
+  if sort_order == -1:  # Null sort keys come after every value
+    return {"$or": [after_key, same_key, {sort_field: None}]}
+  return {"$or": [after_key, same_key]}
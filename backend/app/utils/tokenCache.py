@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import Optional
+
+from cachetools import TTLCache
+
+from app.config.security import security_settings
+from app.db.redis import listen_token_invalidations
+from app.models.userModel import User
+
+
+class TokenCache:
+  """
+  Short-lived cache of verified access tokens (by jti) and the users they belong to.
+
+  Only the fields requests rely on are cached (see project), never the password
+  hash. Entries are evicted as soon as any process blacklists the token or changes
+  the user.
+  """
+
+  cache: TTLCache = TTLCache(
+    maxsize=security_settings.TOKEN_CACHE_MAXSIZE,
+    ttl=security_settings.TOKEN_CACHE_TTL_SECONDS,
+  )
+  listener_task: asyncio.Task | None = None
+
+  @staticmethod
+  def project(user: User) -> User:
+    """
+    Keep the id, email and verification state of a user, routes needing more load
+    the user
+    """
+    return User.model_construct(
+      id=user.id, email=user.email, is_verified=user.is_verified
+    )
+
+  @staticmethod
+  def get(jti: str) -> Optional[User]:
+    user = TokenCache.cache.get(jti)
+    if user:
+      return user.model_copy()  # Callers must not mutate the cached user
+    return None
+
+  @staticmethod
+  def set(jti: str, user: User):
+    TokenCache.cache[jti] = TokenCache.project(user)
+
+  @staticmethod
+  def invalidate(jti: str):
+    TokenCache.cache.pop(jti, None)
+
+  @staticmethod
+  def invalidate_user(user_id: str):
+    for jti, user in list(TokenCache.cache.items()):
+      if str(user.id) == user_id:
+        TokenCache.cache.pop(jti, None)
+
+  @staticmethod
+  def clear():
+    TokenCache.cache.clear()
+
+  @staticmethod
+  def start():
+    logging.info("Starting the token cache invalidation listener...")
+    TokenCache.listener_task = asyncio.create_task(
+      listen_token_invalidations(
+        TokenCache.invalidate, TokenCache.invalidate_user, TokenCache.clear
+      )
+    )
+
+  @staticmethod
+  async def stop():
+    TokenCache.listener_task.cancel()
+    try:
+      await TokenCache.listener_task
+    except asyncio.CancelledError:
+      pass
+    TokenCache.clear()
@@ -0,0 +1,6 @@
+"""
+Scheduler benchmarks on synthetic calendars.
+
+Run from the backend folder with `python -m benchmarks --help`. The database
+benchmarks need the optional mongomock-motor and fakeredis packages.
+"""
@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.environment import load_placeholder_settings
+
+load_placeholder_settings()
+
+import numpy as np  # noqa: E402
+
+from app.utils.datetime import get_utc_now  # noqa: E402
+from benchmarks.databaseBenchmarks import (  # noqa: E402
+  database_available,
+  run_database_benchmarks,
+)
+from benchmarks.generator import BLOCK_LAYOUTS  # noqa: E402
+from benchmarks.pureFunctions import run_pure_benchmarks  # noqa: E402
+
+RESULTS_FOLDER = Path(__file__).resolve().parent / "results"
+# A Monday far enough ahead for every generated block to be in the future
+DEFAULT_START_DATE = datetime(2030, 1, 7, tzinfo=timezone.utc)
+COMPARED_METRICS = ["p50_ms", "p99_ms", "mongo_round_trips_per_task"]
+
+
+def get_commit():
+  try:
+    return subprocess.run(
+      ["git", "rev-parse", "--short", "HEAD"],
+      capture_output=True,
+      text=True,
+      check=True,
+    ).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return "unknown"
+
+
+def parse_args():
+  parser = argparse.ArgumentParser(
+    prog="python -m benchmarks", description="Benchmark the task scheduler."
+  )
+  parser.add_argument(
+    "--sizes",
+    type=int,
+    nargs="+",
+    default=[10, 100, 1000, 10000, 100000],
+    help="Numbers of scheduled blocks in the calendar",
+  )
+  parser.add_argument(
+    "--layouts", nargs="+", choices=list(BLOCK_LAYOUTS), default=list(BLOCK_LAYOUTS)
+  )
+  parser.add_argument("--repeats", type=int, default=20, help="Runs per pure function")
+  parser.add_argument(
+    "--requests", type=int, default=20, help="Tasks scheduled per calendar"
+  )
+  parser.add_argument(
+    "--db-repeats", type=int, default=3, help="Reschedule runs per calendar"
+  )
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--skip-db", action="store_true", help="Pure functions only")
+  parser.add_argument("--output", type=Path, help="Where to save the JSON results")
+  parser.add_argument("--compare", type=Path, help="Earlier results to compare with")
+  return parser.parse_args()
+
+
+def get_result_key(result: dict):
+  return (result["benchmark"], result["mode"], result["layout"], result["blocks"])
+
+
+def compare_results(baseline: dict, current: dict):
+  """
+  Print the ratio current / baseline of the compared metrics of matching benchmarks
+  """
+  baseline_results = {get_result_key(result): result for result in baseline["results"]}
+  print(f"\nCompared with {baseline['commit']} ({baseline['created_at']}):")
+  for result in current["results"]:
+    previous = baseline_results.get(get_result_key(result))
+    if previous is None:
+      continue
+    ratios = []
+    for metric in COMPARED_METRICS:
+      if previous.get(metric) and metric in result:
+        ratios.append(f"{metric} x{result[metric] / previous[metric]:.2f}")
+    label = " / ".join(str(part) for part in get_result_key(result))
+    print(f"  {label}: {', '.join(ratios)}")
+
+
+async def main():
+  args = parse_args()
+  results = run_pure_benchmarks(
+    args.sizes, args.layouts, DEFAULT_START_DATE, args.repeats, args.seed
+  )
+
+  if args.skip_db:
+    pass
+  elif database_available():
+    results += await run_database_benchmarks(
+      args.sizes,
+      args.layouts,
+      DEFAULT_START_DATE,
+      args.requests,
+      args.db_repeats,
+      args.seed,
+    )
+  else:
+    logging.warning("Install mongomock-motor and fakeredis for database benchmarks.")
+
+  commit = get_commit()
+  created_at = get_utc_now()
+  report = {
+    "commit": commit,
+    "created_at": created_at.isoformat(),
+    "python": platform.python_version(),
+    "numpy": np.__version__,
+    "config": {
+      "sizes": args.sizes,
+      "layouts": args.layouts,
+      "repeats": args.repeats,
+      "requests": args.requests,
+      "db_repeats": args.db_repeats,
+      "seed": args.seed,
+    },
+    "results": results,
+  }
+
+  output = args.output or RESULTS_FOLDER / (
+    f"{created_at.strftime('%Y%m%dT%H%M')}-{commit}.json"
+  )
+  output.parent.mkdir(parents=True, exist_ok=True)
+  output.write_text(json.dumps(report, indent=2))
+
+  for result in results:
+    print(
+      f"{result['benchmark']:<32} {result['mode']:<8} {result['layout']:<10} "
+      f"{result['blocks']:>7} blocks  p50 {result['p50_ms']:>10.3f} ms  "
+      f"p99 {result['p99_ms']:>10.3f} ms"
+    )
+  print(f"\nSaved to {output}")
+
+  if args.compare:
+    compare_results(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,211 @@
+import random
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from beanie import PydanticObjectId, init_beanie
+
+from app.db.redis import RedisClient
+from app.exceptions.taskExceptions import TaskAutoScheduleError
+from app.models.schedulingHourModel import SchedulingHour
+from app.models.taskModel import Task
+from app.models.userModel import User
+from app.schemas.taskSchema import TaskCreate
+from app.services.schedulingHourService.weeklySchedule import SchedulingHourCache
+from app.services.taskService.autoScheduler import find_optimal_time
+from app.services.taskService.rescheduler import reschedule_overdue_tasks
+from benchmarks.generator import (
+  generate_blocks,
+  generate_scheduling_hour,
+  generate_task_requests,
+  generate_tasks,
+  generate_users,
+)
+from benchmarks.metrics import (
+  RoundTripCounter,
+  summarize_latencies,
+  time_async_call,
+  trace_allocations,
+)
+
+INSERT_CHUNK_SIZE = 5000
+
+
+def database_available():
+  try:
+    import fakeredis  # noqa: F401
+    import mongomock_motor  # noqa: F401
+  except ImportError:
+    return False
+  return True
+
+
+async def connect_stand_ins():
+  """
+  Point Beanie at an in-memory Mongo and the Redis client at an in-memory Redis
+  """
+  import fakeredis
+  from mongomock_motor import AsyncMongoMockClient
+
+  client = AsyncMongoMockClient(tz_aware=True)
+  await init_beanie(
+    database=client["autotask_benchmarks"],
+    document_models=[SchedulingHour, Task, User],
+  )
+  RedisClient.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+async def reset_stand_ins():
+  await Task.delete_all()
+  await SchedulingHour.delete_all()
+  await RedisClient.get_client().flushall()
+  SchedulingHourCache.clear()
+
+
+async def load_calendar(scheduling_hour: SchedulingHour, tasks: List[Task]):
+  await reset_stand_ins()
+  await scheduling_hour.insert()
+  for i in range(0, len(tasks), INSERT_CHUNK_SIZE):
+    await Task.insert_many(
+      [task.model_copy(deep=True) for task in tasks[i : i + INSERT_CHUNK_SIZE]]
+    )
+
+
+def build_result(
+  name: str,
+  parameters: Dict,
+  samples: List[float],
+  round_trips: Tuple[int, int],
+  allocations: Dict,
+  scheduled_tasks: int,
+):
+  """
+  Latencies of every run, round trips summed over every run and allocations of a
+  single traced run, the last two divided by the number of scheduled tasks
+  """
+  runs = len(samples)
+  mongo_round_trips, redis_round_trips = round_trips
+  per_task = max(scheduled_tasks, 1)
+  return {
+    "benchmark": name,
+    "mode": "database",
+    **parameters,
+    **summarize_latencies(samples),
+    "scheduled_tasks_per_run": scheduled_tasks,
+    "mongo_round_trips_per_task": round(mongo_round_trips / runs / per_task, 2),
+    "redis_round_trips_per_task": round(redis_round_trips / runs / per_task, 2),
+    "allocated_blocks_per_task": round(allocations["allocated_blocks"] / per_task, 2),
+    "peak_kib": allocations["peak_kib"],
+  }
+
+
+async def schedule_task(request: TaskCreate, user_id: PydanticObjectId):
+  try:
+    return await find_optimal_time(request, user_id=user_id)
+  except TaskAutoScheduleError:  # A full calendar is a valid benchmark outcome
+    return None
+
+
+async def benchmark_find_optimal_time(
+  requests: List[TaskCreate],
+  user_id: PydanticObjectId,
+  counter: RoundTripCounter,
+  parameters: Dict,
+  cold: bool = False,
+):
+  samples = []
+  round_trips = [0, 0]
+  for request in requests:
+    if cold:  # Every call starts without cached schedules and summaries
+      SchedulingHourCache.clear()
+      await RedisClient.get_client().flushall()
+    counter.reset()
+    elapsed, _ = await time_async_call(schedule_task, request, user_id)
+    samples.append(elapsed)
+    round_trips[0] += counter.mongo
+    round_trips[1] += counter.redis
+
+  with trace_allocations() as allocations:
+    await schedule_task(requests[0], user_id)
+
+  name = "find_optimal_time (cold cache)" if cold else "find_optimal_time"
+  return build_result(name, parameters, samples, round_trips, allocations, 1)
+
+
+async def benchmark_reschedule(
+  scheduling_hour: SchedulingHour,
+  tasks: List[Task],
+  user_id: PydanticObjectId,
+  counter: RoundTripCounter,
+  parameters: Dict,
+  repeats: int,
+):
+  overdue_tasks = sum(
+    not all(block.is_scheduled_ontime for block in task.time_allocations)
+    for task in tasks
+  )
+  samples = []
+  round_trips = [0, 0]
+  for _ in range(repeats):
+    await load_calendar(scheduling_hour, tasks)  # Rescheduling changes the calendar
+    counter.reset()
+    elapsed, _ = await time_async_call(reschedule_overdue_tasks, user_id)
+    samples.append(elapsed)
+    round_trips[0] += counter.mongo
+    round_trips[1] += counter.redis
+
+  await load_calendar(scheduling_hour, tasks)
+  with trace_allocations() as allocations:
+    await reschedule_overdue_tasks(user_id)
+
+  return build_result(
+    "reschedule_overdue_tasks",
+    parameters,
+    samples,
+    round_trips,
+    allocations,
+    overdue_tasks,
+  )
+
+
+async def run_database_benchmarks(
+  sizes: List[int],
+  layouts: List[str],
+  start_date: datetime,
+  requests: int,
+  repeats: int,
+  seed: int,
+):
+  """
+  Time the scheduler end to end against in-memory Mongo and Redis stand-ins
+  """
+  await connect_stand_ins()
+  counter = RoundTripCounter().install()
+  results = []
+  try:
+    for layout in layouts:
+      for size in sizes:
+        rng = random.Random(seed)
+        user = generate_users(1)[0]
+        scheduling_hour = generate_scheduling_hour("office")
+        blocks = generate_blocks(scheduling_hour, size, start_date, layout, rng)
+        tasks = generate_tasks(user.id, scheduling_hour, blocks, rng=rng)
+        task_requests = generate_task_requests(
+          scheduling_hour, requests, start_date, rng=rng
+        )
+        parameters = {"layout": layout, "blocks": size, "tasks": len(tasks)}
+
+        await load_calendar(scheduling_hour, tasks)
+        for cold in (True, False):
+          results.append(
+            await benchmark_find_optimal_time(
+              task_requests, user.id, counter, parameters, cold
+            )
+          )
+        results.append(
+          await benchmark_reschedule(
+            scheduling_hour, tasks, user.id, counter, parameters, repeats
+          )
+        )
+  finally:
+    counter.uninstall()
+  return results
@@ -0,0 +1,172 @@
+import random
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional
+
+from beanie import PydanticObjectId
+
+from app.models.schedulingHourModel import DayOfWeek, SchedulingHour, TimeFrame
+from app.models.taskModel import Task
+from app.models.userModel import User
+from app.schemas.taskSchema import Duration, Split, TaskCreate, TimeBlock
+from app.services.schedulingHourService.weeklySchedule import WeeklySchedule
+from app.utils.datetime import from_epoch_minutes, get_utc_now, to_epoch_minutes
+
+WEEKDAYS = range(5)
+EVERY_DAY = range(7)
+
+# Template name -> (day indices, UTC time frames)
+SCHEDULING_HOUR_TEMPLATES = {
+  "office": (WEEKDAYS, [("09:00", "17:00")]),
+  "split_shift": (WEEKDAYS, [("08:00", "12:00"), ("13:00", "18:00")]),
+  "evenings": (EVERY_DAY, [("18:00", "23:00")]),
+  "night_shift": (EVERY_DAY, [("22:00", "06:00")]),  # Wraps past midnight
+}
+
+# Layout name -> (block length range, gap length range) in minutes
+BLOCK_LAYOUTS = {
+  "dense": ((30, 120), (0, 15)),
+  "fragmented": ((15, 60), (10, 90)),
+}
+
+
+def build_time_frame(start: str, end: str):
+  day = date(2000, 1, 1)  # Time frames are stored on a fixed date in UTC
+  return TimeFrame(
+    start_at=datetime.combine(day, time.fromisoformat(start), tzinfo=timezone.utc),
+    end_at=datetime.combine(day, time.fromisoformat(end), tzinfo=timezone.utc),
+  )
+
+
+def generate_scheduling_hour(template: str = "office"):
+  day_indices, time_frames = SCHEDULING_HOUR_TEMPLATES[template]
+  # Built without validation so that the pure benchmarks do not need Beanie set up
+  return SchedulingHour.model_construct(
+    id=PydanticObjectId(),
+    name=f"{template} (benchmark)",
+    days_of_week=[
+      DayOfWeek(
+        day_index=day_index,
+        time_frames=[build_time_frame(start, end) for start, end in time_frames],
+      )
+      for day_index in day_indices
+    ],
+    created_at=get_utc_now(),
+  )
+
+
+def generate_users(count: int):
+  return [
+    User(id=PydanticObjectId(), name=f"User {i}", email=f"user{i}@example.com")
+    for i in range(count)
+  ]
+
+
+def generate_blocks(
+  scheduling_hour: SchedulingHour,
+  count: int,
+  start_date: datetime,
+  layout: str = "dense",
+  rng: Optional[random.Random] = None,
+):
+  """
+  Generate count scheduled blocks inside the preferred time frames from start_date,
+  back to back for a dense calendar or with larger gaps for a fragmented one
+  """
+  rng = rng or random.Random()
+  (min_length, max_length), (min_gap, max_gap) = BLOCK_LAYOUTS[layout]
+  schedule = WeeklySchedule.compile(scheduling_hour)
+  start_minute = to_epoch_minutes(start_date, round_up=True)
+
+  blocks = []
+  day = start_date.date()
+  while len(blocks) < count:
+    for window_start, window_end in schedule.get_preferred_windows(day, start_minute):
+      cursor = window_start + rng.randint(min_gap, max_gap)
+      while len(blocks) < count:
+        end = cursor + rng.randint(min_length, max_length)
+        if end > window_end:
+          break
+        blocks.append(
+          {"start_at": from_epoch_minutes(cursor), "end_at": from_epoch_minutes(end)}
+        )
+        cursor = end + rng.randint(min_gap, max_gap)
+    day += timedelta(days=1)
+  return blocks
+
+
+def generate_tasks(
+  user_id: PydanticObjectId,
+  scheduling_hour: SchedulingHour,
+  blocks: List[Dict[str, datetime]],
+  max_blocks_per_task: int = 3,
+  overdue_ratio: float = 0.05,
+  rng: Optional[random.Random] = None,
+):
+  """
+  Group consecutive blocks into smart tasks, a share of which missed their due date
+  """
+  rng = rng or random.Random()
+  tasks = []
+  i = 0
+  while i < len(blocks):
+    task_blocks = blocks[i : i + rng.randint(1, max_blocks_per_task)]
+    i += len(task_blocks)
+
+    minutes = sum(
+      (block["end_at"] - block["start_at"]) // timedelta(minutes=1)
+      for block in task_blocks
+    )
+    is_overdue = rng.random() < overdue_ratio
+    due_date = task_blocks[-1]["end_at"] + timedelta(hours=rng.randint(1, 72))
+    if is_overdue:
+      due_date = task_blocks[-1]["end_at"] - timedelta(minutes=1)
+
+    tasks.append(
+      Task(
+        id=PydanticObjectId(),
+        user_id=user_id,
+        scheduling_hour_id=scheduling_hour.id,
+        smart_scheduling=True,
+        name=f"Task {len(tasks)}",
+        duration=Duration(hours=minutes // 60, minutes=minutes % 60),
+        start_date=task_blocks[0]["start_at"],
+        due_date=due_date,
+        time_allocations=[
+          TimeBlock(**block, is_scheduled_ontime=block["end_at"] <= due_date)
+          for block in task_blocks
+        ],
+        created_at=get_utc_now(),
+      )
+    )
+  return tasks
+
+
+def generate_task_requests(
+  scheduling_hour: SchedulingHour,
+  count: int,
+  start_date: datetime,
+  split_ratio: float = 0.3,
+  rng: Optional[random.Random] = None,
+):
+  """
+  Generate smart tasks to be scheduled, a share of them allowed to split
+  """
+  rng = rng or random.Random()
+  requests = []
+  for i in range(count):
+    minutes = rng.randrange(30, 241, 15)
+    split = None
+    if rng.random() < split_ratio:
+      split = Split(min_duration=Duration(hours=0, minutes=30))
+    requests.append(
+      TaskCreate(
+        scheduling_hour_id=scheduling_hour.id,
+        smart_scheduling=True,
+        name=f"Request {i}",
+        duration=Duration(hours=minutes // 60, minutes=minutes % 60),
+        split=split,
+        start_date=start_date,
+        due_date=start_date + timedelta(days=rng.randint(3, 21)),
+      )
+    )
+  return requests
@@ -0,0 +1,125 @@
+import inspect
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Awaitable, Callable, Dict, List
+
+ROUND_TRIP_METHODS = [
+  "aggregate",
+  "bulk_write",
+  "count_documents",
+  "delete_many",
+  "delete_one",
+  "find",
+  "find_one",
+  "insert_many",
+  "insert_one",
+  "replace_one",
+  "update_many",
+  "update_one",
+]
+
+
+def summarize_latencies(samples: List[float]) -> Dict[str, float]:
+  """
+  p50/p99/mean of latency samples given in seconds, reported in milliseconds
+  """
+  if len(samples) == 1:
+    p50 = p99 = samples[0]
+  else:
+    percentiles = statistics.quantiles(samples, n=100, method="inclusive")
+    p50, p99 = percentiles[49], percentiles[98]
+  return {
+    "runs": len(samples),
+    "p50_ms": round(p50 * 1000, 4),
+    "p99_ms": round(p99 * 1000, 4),
+    "mean_ms": round(statistics.fmean(samples) * 1000, 4),
+  }
+
+
+def time_call(func: Callable, *args, **kwargs):
+  start = time.perf_counter()
+  result = func(*args, **kwargs)
+  return time.perf_counter() - start, result
+
+
+async def time_async_call(func: Callable[..., Awaitable], *args, **kwargs):
+  start = time.perf_counter()
+  result = await func(*args, **kwargs)
+  return time.perf_counter() - start, result
+
+
+@contextmanager
+def trace_allocations():
+  """
+  Count the memory blocks allocated inside the block and the peak traced size.
+
+  Tracing slows the code down, so it runs separately from the timed runs.
+  """
+  stats = {}
+  tracemalloc.start()
+  before = tracemalloc.take_snapshot()
+  try:
+    yield stats
+  finally:
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    differences = after.compare_to(before, "lineno")
+    stats["allocated_blocks"] = sum(max(diff.count_diff, 0) for diff in differences)
+    stats["peak_kib"] = round(peak / 1024, 2)
+
+
+class RoundTripCounter:
+  """
+  Counts the calls reaching the in-memory Mongo collections and Redis.
+
+  Every collection method call of the stand-in stands for one round trip to a real
+  server, and so do single Redis commands and executed pipelines.
+  """
+
+  def __init__(self):
+    self.mongo = 0
+    self.redis = 0
+    self._patches = []
+
+  def reset(self):
+    self.mongo = 0
+    self.redis = 0
+
+  def _patch(self, owner, name: str, counter: str):
+    original = getattr(owner, name)
+
+    if inspect.iscoroutinefunction(original):
+
+      @wraps(original)
+      async def counted(*args, **kwargs):
+        setattr(self, counter, getattr(self, counter) + 1)
+        return await original(*args, **kwargs)
+
+    else:
+
+      @wraps(original)
+      def counted(*args, **kwargs):
+        setattr(self, counter, getattr(self, counter) + 1)
+        return original(*args, **kwargs)
+
+    setattr(owner, name, counted)
+    self._patches.append((owner, name, original))
+
+  def install(self):
+    from mongomock.collection import Collection
+    from redis.asyncio.client import Pipeline, Redis
+
+    for name in ROUND_TRIP_METHODS:
+      self._patch(Collection, name, "mongo")
+    self._patch(Redis, "execute_command", "redis")
+    self._patch(Pipeline, "execute", "redis")
+    return self
+
+  def uninstall(self):
+    for owner, name, original in reversed(self._patches):
+      setattr(owner, name, original)
+    self._patches = []
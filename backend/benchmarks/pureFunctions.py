@@ -0,0 +1,95 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+from app.services.schedulingHourService.weeklySchedule import WeeklySchedule
+from app.services.taskService.autoScheduler import find_free_slots
+from app.services.taskService.freeSlotEngine import (
+  compute_free_slots,
+  find_split_slots,
+  weekly_windows,
+)
+from app.utils.datetime import to_epoch_minutes
+from benchmarks.generator import generate_blocks, generate_scheduling_hour
+from benchmarks.metrics import summarize_latencies, time_call, trace_allocations
+
+
+def measure(name: str, func, args: tuple, repeats: int, parameters: Dict) -> Dict:
+  samples = [time_call(func, *args)[0] for _ in range(repeats)]
+  with trace_allocations() as allocations:
+    func(*args)
+  return {
+    "benchmark": name,
+    "mode": "pure",
+    **parameters,
+    **summarize_latencies(samples),
+    **allocations,
+  }
+
+
+def run_pure_benchmarks(
+  sizes: List[int],
+  layouts: List[str],
+  start_date: datetime,
+  repeats: int,
+  seed: int,
+):
+  """
+  Time the scheduling functions on in-memory calendars, without any database
+  """
+  results = []
+  scheduling_hour = generate_scheduling_hour("office")
+  schedule = WeeklySchedule.compile(scheduling_hour)
+
+  for layout in layouts:
+    for size in sizes:
+      rng = random.Random(seed)
+      blocks = generate_blocks(scheduling_hour, size, start_date, layout, rng)
+      first_day = start_date.date()
+      last_day = blocks[-1]["end_at"].date()
+      parameters = {
+        "layout": layout,
+        "blocks": size,
+        "days": (last_day - first_day).days + 1,
+      }
+
+      # Reference implementation on datetimes
+      datetimes = []
+      day = first_day
+      while day <= last_day:
+        datetimes += schedule.get_preferred_datetimes(day, start_date)
+        day += timedelta(days=1)
+      results.append(
+        measure(
+          "find_free_slots", find_free_slots, (blocks, datetimes), repeats, parameters
+        )
+      )
+
+      # Vectorized engine on epoch minutes
+      window_starts, window_ends = weekly_windows(
+        schedule.intervals, first_day, last_day, to_epoch_minutes(start_date)
+      )
+      busy_starts = np.array(
+        [to_epoch_minutes(block["start_at"]) for block in blocks], dtype=np.int64
+      )
+      busy_ends = np.array(
+        [to_epoch_minutes(block["end_at"]) for block in blocks], dtype=np.int64
+      )
+      engine_args = (window_starts, window_ends, busy_starts, busy_ends)
+      results.append(
+        measure(
+          "compute_free_slots", compute_free_slots, engine_args, repeats, parameters
+        )
+      )
+
+      # Split an 8 hour task with 30 minute parts, due halfway through the calendar
+      slot_starts, slot_ends = compute_free_slots(*engine_args)
+      due_minute = (int(window_starts[0]) + int(window_ends[-1])) // 2
+      split_args = (30, 8 * 60, due_minute, slot_starts, slot_ends)
+      results.append(
+        measure("find_split_slots", find_split_slots, split_args, repeats, parameters)
+      )
+
+  return results
@@ -0,0 +1,75 @@
+import pytest
+
+from benchmarks.environment import load_placeholder_settings
+
+load_placeholder_settings()
+
+
+@pytest.fixture
+def anyio_backend():
+  return "asyncio"
+
+
+@pytest.fixture
+async def database():
+  """
+  Point Beanie at an empty in-memory Mongo
+  """
+  from beanie import init_beanie
+  from mongomock_motor import AsyncMongoMockClient
+
+  from app.models.schedulingHourModel import SchedulingHour
+  from app.models.taskModel import Task
+  from app.models.userModel import User
+
+  client = AsyncMongoMockClient(tz_aware=True)
+  database = client["autotask_tests"]
+  await init_beanie(
+    database=database,
+    document_models=[SchedulingHour, Task, User],
+    skip_indexes=True,
+  )
+  yield database
+  client.close()
+
+
+@pytest.fixture
+async def redis_client():
+  """
+  Point the Redis client at an empty in-memory Redis
+  """
+  import fakeredis
+
+  from app.db.redis import RedisClient
+
+  RedisClient.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+  yield RedisClient.client
+  await RedisClient.client.flushall()
+  RedisClient.client = None
+
+
+@pytest.fixture
+async def office_hours(database):
+  """
+  A scheduling hour from 9:00 to 17:00 UTC on weekdays
+  """
+  from datetime import datetime, timezone
+
+  from app.models.schedulingHourModel import DayOfWeek, SchedulingHour, TimeFrame
+
+  return await SchedulingHour(
+    name="Office hours",
+    days_of_week=[
+      DayOfWeek(
+        day_index=day_index,
+        time_frames=[
+          TimeFrame(
+            start_at=datetime(2026, 3, 2, 9, tzinfo=timezone.utc),
+            end_at=datetime(2026, 3, 2, 17, tzinfo=timezone.utc),
+          )
+        ],
+      )
+      for day_index in range(5)
+    ],
+    created_at=datetime(2026, 3, 2, tzinfo=timezone.utc),
+  ).insert()
@@ -0,0 +1,67 @@
+import uuid
+
+import pytest
+from starlette.requests import Request
+
+from app.db.redis import LocalBlacklist, blacklist_tokens
+from app.dependencies.auth import get_current_user
+from app.exceptions.authExceptions import AccessTokenExpiredError
+from app.models.userModel import User
+from app.services.authService.logout import logout_user_account
+from app.utils.auth import create_access_token
+from app.utils.tokenCache import TokenCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def clear_token_state():
+  TokenCache.clear()
+  LocalBlacklist.expiries.clear()
+  yield
+  TokenCache.clear()
+  LocalBlacklist.expiries.clear()
+
+
+@pytest.fixture
+async def user(database):
+  return await User(
+    name="Someone",
+    email="someone@example.com",
+    hashed_password="hash",
+    is_verified=True,
+  ).insert()
+
+
+def create_token(user: User) -> str:
+  return create_access_token(
+    {"sub": str(user.id), "email": user.email, "jti": str(uuid.uuid4())}
+  )
+
+
+def make_request(token: str) -> Request:
+  return Request(
+    {"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]}
+  )
+
+
+async def test_logged_out_tokens_are_refused(user, redis_client):
+  access_token, refresh_token = create_token(user), create_token(user)
+  assert (await get_current_user(make_request(access_token))).id == user.id
+
+  await logout_user_account(access_token, refresh_token)
+
+  with pytest.raises(AccessTokenExpiredError):
+    await get_current_user(make_request(access_token))
+
+
+async def test_cached_tokens_blacklisted_elsewhere_are_refused(user, redis_client):
+  access_token, refresh_token = create_token(user), create_token(user)
+  await get_current_user(make_request(access_token))
+
+  # Blacklisted without evicting the token from the cache of this process, as
+  # when the eviction message of another process has not arrived yet
+  await blacklist_tokens(access_token, refresh_token)
+
+  with pytest.raises(AccessTokenExpiredError):
+    await get_current_user(make_request(access_token))
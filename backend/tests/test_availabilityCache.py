@@ -0,0 +1,57 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.services.schedulingHourService.weeklySchedule import WeeklySchedule
+from app.services.taskService.availabilityCache import AvailabilityCache
+
+pytestmark = pytest.mark.anyio
+
+DAY = date(2026, 3, 2)
+SCHEDULE = WeeklySchedule([(9 * 60, 17 * 60)], id="schedule")
+BLOCK = {
+  "start_at": datetime(2026, 3, 2, 10, tzinfo=timezone.utc),
+  "end_at": datetime(2026, 3, 2, 11, tzinfo=timezone.utc),
+}
+
+
+async def test_summaries_are_stored_for_the_current_generation(redis_client):
+  user_id = PydanticObjectId()
+  generation = await AvailabilityCache.get_generation(user_id)
+
+  await AvailabilityCache.set(user_id, SCHEDULE, {DAY: (420, 300)}, generation)
+
+  assert await AvailabilityCache.get(user_id, SCHEDULE, [DAY]) == {DAY: (420, 300)}
+
+
+async def test_summaries_read_before_an_invalidation_are_discarded(redis_client):
+  user_id = PydanticObjectId()
+  await AvailabilityCache.set(
+    user_id,
+    SCHEDULE,
+    {DAY: (480, 480)},
+    await AvailabilityCache.get_generation(user_id),
+  )
+
+  # Blocks are fetched, then a task is saved and invalidates the day
+  generation = await AvailabilityCache.get_generation(user_id)
+  await AvailabilityCache.invalidate(user_id, [BLOCK])
+  await AvailabilityCache.set(user_id, SCHEDULE, {DAY: (480, 480)}, generation)
+
+  assert await AvailabilityCache.get(user_id, SCHEDULE, [DAY]) == {}
+
+  # A fetch started after the invalidation stores its summaries again
+  generation = await AvailabilityCache.get_generation(user_id)
+  await AvailabilityCache.set(user_id, SCHEDULE, {DAY: (420, 300)}, generation)
+  assert await AvailabilityCache.get(user_id, SCHEDULE, [DAY]) == {DAY: (420, 300)}
+
+
+async def test_invalidations_of_other_users_keep_the_summaries(redis_client):
+  user_id = PydanticObjectId()
+  generation = await AvailabilityCache.get_generation(user_id)
+  await AvailabilityCache.invalidate(PydanticObjectId(), [BLOCK])
+
+  await AvailabilityCache.set(user_id, SCHEDULE, {DAY: (420, 300)}, generation)
+
+  assert await AvailabilityCache.get(user_id, SCHEDULE, [DAY]) == {DAY: (420, 300)}
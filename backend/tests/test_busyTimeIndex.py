@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+
+from beanie import PydanticObjectId
+
+from app.services.taskService.busyTimeIndex import BusyTimeIndex
+from app.utils.datetime import to_epoch_minutes
+
+
+def get_intervals(index: BusyTimeIndex):
+  starts, ends = index.to_numpy()
+  return list(zip(starts.tolist(), ends.tolist()))
+
+
+def test_touching_and_overlapping_blocks_are_merged():
+  index = BusyTimeIndex()
+  index.insert(10, 20)
+  index.insert(20, 30)  # Touches the first block
+  index.insert(50, 60)
+  index.insert(25, 55)  # Bridges both intervals
+
+  assert get_intervals(index) == [(10, 60)]
+
+
+def test_empty_blocks_are_ignored():
+  index = BusyTimeIndex()
+  index.insert(10, 10)
+  index.insert(20, 15)
+
+  assert len(index) == 0
+
+
+def test_partial_minutes_count_as_busy():
+  start_at = datetime(2026, 3, 2, 9, 0, 30, tzinfo=timezone.utc)
+  end_at = datetime(2026, 3, 2, 9, 10, 30, tzinfo=timezone.utc)
+  index = BusyTimeIndex([{"start_at": start_at, "end_at": end_at}])
+
+  assert get_intervals(index) == [
+    (to_epoch_minutes(start_at), to_epoch_minutes(end_at) + 1)
+  ]
+
+
+def test_removing_a_task_splits_the_interval_it_bridged():
+  index = BusyTimeIndex()
+  bridge_task_id = PydanticObjectId()
+  index.insert(10, 20)
+  index.insert(30, 40)
+  index.insert(15, 35, bridge_task_id)
+  assert get_intervals(index) == [(10, 40)]
+
+  index.remove(bridge_task_id)
+
+  assert get_intervals(index) == [(10, 20), (30, 40)]
+  index.remove(bridge_task_id)  # Unknown tasks are a no-op
+  assert get_intervals(index) == [(10, 20), (30, 40)]
+
+
+def test_free_gaps_are_clipped_to_the_window():
+  index = BusyTimeIndex()
+  index.insert(10, 20)
+  index.insert(30, 40)
+
+  assert index.free_gaps(15, 35).tolist() == [20, 30]
+  assert index.free_gaps(0, 50).tolist() == [0, 10, 20, 30, 40, 50]
+  assert index.free_slots([(0, 10), (12, 18)]).tolist() == [0, 10]
+
+
+def test_only_the_intervals_overlapping_the_range_are_exported():
+  index = BusyTimeIndex()
+  for start_at in range(0, 100, 20):
+    index.insert(start_at, start_at + 10)
+
+  starts, ends = index.to_numpy(25, 65)
+
+  assert starts.tolist() == [20, 40, 60]
+  assert ends.tolist() == [30, 50, 70]
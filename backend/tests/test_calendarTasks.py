@@ -0,0 +1,107 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from beanie import PydanticObjectId
+from pydantic import ValidationError
+
+from app.models.taskModel import Task
+from app.schemas.taskSchema import CalendarFilter, TimeBlock
+from app.services.taskService.crud import get_calendar_tasks
+from app.utils.datetime import get_utc_now
+
+pytestmark = pytest.mark.anyio
+
+# The week of 2026-03-04 in New York runs from Monday 2026-03-02 00:00 EST to
+# Monday 2026-03-09 00:00 EDT, the clocks move forward on Sunday 2026-03-08
+WEEK_START = datetime(2026, 3, 2, 5, tzinfo=timezone.utc)
+WEEK_END = datetime(2026, 3, 9, 4, tzinfo=timezone.utc)
+NEW_YORK_WEEK = CalendarFilter(
+  target_date=date(2026, 3, 4), timezone="America/New_York"
+)
+
+
+def make_block(start_at: datetime) -> TimeBlock:
+  return TimeBlock(start_at=start_at, end_at=start_at + timedelta(minutes=30))
+
+
+async def insert_task(
+  name: str, user_id: PydanticObjectId, starts: List[datetime]
+) -> Task:
+  task = Task(
+    user_id=user_id,
+    smart_scheduling=False,
+    name=name,
+    time_allocations=[make_block(start_at) for start_at in starts],
+    created_at=get_utc_now(),
+  )
+  await task.insert()
+  return task
+
+
+async def test_calendar_returns_only_the_users_tasks(database):
+  user_id = PydanticObjectId()
+  await insert_task("Mine", user_id, [WEEK_START])
+  await insert_task("Someone else's", PydanticObjectId(), [WEEK_START])
+  await insert_task("Next week", user_id, [WEEK_END + timedelta(days=1)])
+
+  tasks = await get_calendar_tasks(NEW_YORK_WEEK, user_id)
+
+  assert [task.name for task in tasks] == ["Mine"]
+
+
+async def test_calendar_keeps_only_the_blocks_of_the_week(database):
+  user_id = PydanticObjectId()
+  await insert_task(
+    "Split",
+    user_id,
+    [
+      WEEK_START - timedelta(days=1),
+      WEEK_START + timedelta(days=2),
+      WEEK_END + timedelta(days=1),
+    ],
+  )
+
+  [task] = await get_calendar_tasks(NEW_YORK_WEEK, user_id)
+
+  assert [block.start_at for block in task.time_allocations] == [
+    WEEK_START + timedelta(days=2)
+  ]
+
+
+async def test_calendar_week_edges_follow_the_timezone(database):
+  user_id = PydanticObjectId()
+  await insert_task(
+    "Edges",
+    user_id,
+    [
+      WEEK_START - timedelta(minutes=30),  # Sunday 23:30 EST, the previous week
+      WEEK_START,  # Monday 00:00 EST
+      WEEK_END - timedelta(minutes=30),  # Sunday 23:30 EDT, Monday in UTC
+      WEEK_END,  # Monday 00:00 EDT, the next week
+    ],
+  )
+
+  [task] = await get_calendar_tasks(NEW_YORK_WEEK, user_id)
+
+  assert [block.start_at for block in task.time_allocations] == [
+    WEEK_START,
+    WEEK_END - timedelta(minutes=30),
+  ]
+
+
+async def test_calendar_end_date_extends_to_the_end_of_its_week(database):
+  user_id = PydanticObjectId()
+  await insert_task("Month", user_id, [WEEK_START, WEEK_END + timedelta(days=10)])
+  filters = CalendarFilter(
+    target_date=date(2026, 3, 4), end_date=date(2026, 3, 16), timezone="UTC"
+  )
+
+  [task] = await get_calendar_tasks(filters, user_id)
+
+  assert len(task.time_allocations) == 2
+
+
+def test_calendar_rejects_an_end_date_before_the_target_date():
+  with pytest.raises(ValidationError):
+    CalendarFilter(target_date=date(2026, 3, 4), end_date=date(2026, 3, 3))
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.exceptions.taskExceptions import TASK_AUTO_SCHEDULE_DETAIL
+from app.models.taskModel import Task
+from app.schemas.taskSchema import Duration, TaskCreate
+from app.services.taskService.autoScheduler import create_shared_horizon
+from app.services.taskService.crud import create_tasks
+from app.types.taskTypes import Priority
+
+pytestmark = pytest.mark.anyio
+
+START_DATE = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+
+def make_smart_task(
+  name: str, start_date: Optional[datetime], due_date: Optional[datetime]
+) -> TaskCreate:
+  return TaskCreate(
+    smart_scheduling=True,
+    name=name,
+    priority=Priority.HIGH,
+    start_date=start_date,
+    due_date=due_date,
+    time_allocations=[],
+  )
+
+
+async def test_tasks_without_dates_are_created_in_bulk(database, redis_client):
+  tasks = [
+    make_smart_task("No dates", None, None),
+    make_smart_task("Due date", START_DATE, datetime(2026, 3, 6, tzinfo=timezone.utc)),
+    make_smart_task("No due date", START_DATE, None),
+  ]
+
+  new_tasks, failed_tasks = await create_tasks(tasks, PydanticObjectId())
+
+  assert [task.name for task in new_tasks] == ["No dates", "Due date", "No due date"]
+  assert failed_tasks == []
+
+
+async def test_tasks_that_cannot_be_scheduled_are_reported(
+  office_hours, redis_client
+):
+  user_id = PydanticObjectId()
+  tasks = [
+    make_smart_task(name, START_DATE, START_DATE + timedelta(days=4))
+    for name in ("First", "Too long", "Last")
+  ]
+  for task, hours in zip(tasks, (1, 9, 2)):  # Longer than a working day
+    task.scheduling_hour_id = office_hours.id
+    task.duration = Duration(hours=hours, minutes=0)
+
+  new_tasks, failed_tasks = await create_tasks(tasks, user_id)
+
+  assert [task.name for task in new_tasks] == ["First", "Last"]
+  assert all(task.time_allocations for task in new_tasks)
+  assert failed_tasks == [{"index": 1, "detail": TASK_AUTO_SCHEDULE_DETAIL}]
+  assert await Task.find(Task.user_id == user_id).count() == 2
+
+
+def test_shared_horizon_starts_at_the_earliest_start_date():
+  horizon = create_shared_horizon(
+    PydanticObjectId(), [None, datetime(2026, 3, 4, tzinfo=timezone.utc), START_DATE]
+  )
+  assert horizon.start == START_DATE.date()
@@ -0,0 +1,80 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.services.taskService.autoScheduler import to_time_allocations
+from app.services.taskService.freeSlotEngine import (
+  find_fitting_slot,
+  find_split_slots,
+)
+from app.utils.datetime import (
+  date_to_epoch_minutes,
+  from_epoch_minutes,
+  to_epoch_minutes,
+)
+
+MONDAY_9AM = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+
+
+def test_epoch_minutes_round_trip():
+  minutes = to_epoch_minutes(MONDAY_9AM)
+
+  assert minutes == int(MONDAY_9AM.timestamp()) // 60
+  assert from_epoch_minutes(minutes) == MONDAY_9AM
+  assert from_epoch_minutes(minutes).tzinfo == timezone.utc
+
+
+def test_partial_minutes_round_down_unless_asked():
+  dt = MONDAY_9AM + timedelta(seconds=1)
+
+  assert to_epoch_minutes(dt) == to_epoch_minutes(MONDAY_9AM)
+  assert to_epoch_minutes(dt, round_up=True) == to_epoch_minutes(MONDAY_9AM) + 1
+  assert to_epoch_minutes(MONDAY_9AM, round_up=True) == to_epoch_minutes(MONDAY_9AM)
+
+
+def test_naive_and_other_timezones_are_read_as_instants():
+  assert to_epoch_minutes(MONDAY_9AM.replace(tzinfo=None)) == to_epoch_minutes(
+    MONDAY_9AM
+  )
+  assert to_epoch_minutes(
+    MONDAY_9AM.astimezone(ZoneInfo("Asia/Tokyo"))
+  ) == to_epoch_minutes(MONDAY_9AM)
+  assert to_epoch_minutes(datetime(1969, 12, 31, 23, 59, tzinfo=timezone.utc)) == -1
+
+
+def test_days_start_at_utc_midnight():
+  assert date_to_epoch_minutes(date(1970, 1, 2)) == 24 * 60
+  assert date_to_epoch_minutes(MONDAY_9AM.date()) == to_epoch_minutes(
+    MONDAY_9AM
+  ) - 9 * 60
+
+
+def test_fitting_slot_is_the_first_long_enough():
+  starts, ends = np.array([0, 100, 300]), np.array([30, 200, 500])
+
+  assert find_fitting_slot(60, starts, ends) == (100, 160)
+  assert find_fitting_slot(300, starts, ends) is None
+
+
+def test_split_slots_cover_the_duration_and_flag_late_blocks():
+  starts, ends = np.array([0, 100, 300]), np.array([20, 160, 500])
+
+  remaining, blocks = find_split_slots(30, 100, 200, starts, ends)
+
+  # The 20-minute slot is too short, and only part of the last slot is needed
+  assert remaining == 0
+  assert blocks == [(100, 160, True), (300, 340, False)]
+  assert find_split_slots(30, 500, 200, starts, ends)[0] == 240
+
+
+def test_blocks_are_converted_back_to_utc_datetimes():
+  start = to_epoch_minutes(MONDAY_9AM)
+
+  assert to_time_allocations([(start, start + 90, False)]) == [
+    {
+      "start_at": MONDAY_9AM,
+      "end_at": MONDAY_9AM + timedelta(minutes=90),
+      "is_scheduled_ontime": False,
+    }
+  ]
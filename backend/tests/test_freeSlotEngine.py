@@ -0,0 +1,159 @@
+import random
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+from beanie import PydanticObjectId
+
+from app.services.taskService.autoScheduler import find_free_slots
+from app.services.taskService.busyTimeIndex import BusyTimeIndex
+from app.services.taskService.freeSlotEngine import (
+  compute_free_slots,
+  merge_intervals,
+  summarize_windows,
+)
+from app.utils.datetime import from_epoch_minutes, to_epoch_minutes
+
+Intervals = List[Tuple[int, int]]
+
+HORIZON_MINUTES = 3 * 24 * 60
+ORIGIN = 29_000_000  # Epoch minutes of a day in 2025, so datetimes stay realistic
+
+
+def random_windows(rng: random.Random) -> Intervals:
+  """
+  Sorted, disjoint preferred windows, like those of a weekly schedule
+  """
+  bounds = sorted(rng.sample(range(HORIZON_MINUTES), 2 * rng.randint(0, 12)))
+  return [
+    (ORIGIN + bounds[i], ORIGIN + bounds[i + 1]) for i in range(0, len(bounds), 2)
+  ]
+
+
+def random_blocks(rng: random.Random) -> Intervals:
+  """
+  Possibly overlapping scheduled blocks
+  """
+  blocks = []
+  for _ in range(rng.randint(0, 40)):
+    start_at = rng.randrange(-120, HORIZON_MINUTES)
+    blocks.append((ORIGIN + start_at, ORIGIN + start_at + rng.randint(1, 300)))
+  return blocks
+
+
+def reference_free_slots(windows: Intervals, blocks: Intervals) -> Intervals:
+  """
+  Free slots found minute by minute on a mask of the horizon
+  """
+  busy = np.zeros(HORIZON_MINUTES + 600, dtype=bool)
+  for start_at, end_at in blocks:
+    busy[max(start_at - ORIGIN, 0) : max(end_at - ORIGIN, 0)] = True
+
+  free_slots = []
+  for start_at, end_at in windows:
+    slot_start = None
+    for minute in range(start_at, end_at + 1):
+      is_free = minute < end_at and not busy[minute - ORIGIN]
+      if is_free and slot_start is None:
+        slot_start = minute
+      elif not is_free and slot_start is not None:
+        free_slots.append((slot_start, minute))
+        slot_start = None
+  return free_slots
+
+
+def to_arrays(intervals: Intervals):
+  return (
+    np.array([start_at for start_at, _ in intervals], dtype=np.int64),
+    np.array([end_at for _, end_at in intervals], dtype=np.int64),
+  )
+
+
+def to_intervals(starts, ends) -> Intervals:
+  return list(zip(np.asarray(starts).tolist(), np.asarray(ends).tolist()))
+
+
+SEEDS = range(200)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_vectorized_engine_matches_the_minute_mask(seed):
+  rng = random.Random(seed)
+  windows, blocks = random_windows(rng), random_blocks(rng)
+
+  free_slots = compute_free_slots(*to_arrays(windows), *to_arrays(blocks))
+
+  assert to_intervals(*free_slots) == reference_free_slots(windows, blocks)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_busy_time_index_matches_the_minute_mask(seed):
+  rng = random.Random(seed)
+  windows, blocks = random_windows(rng), random_blocks(rng)
+  index = BusyTimeIndex()
+  task_ids = [PydanticObjectId() for _ in range(4)]
+  owners = [rng.choice(task_ids) for _ in blocks]
+  for (start_at, end_at), task_id in zip(blocks, owners):
+    index.insert(start_at, end_at, task_id)
+
+  # Removing a task's blocks must leave the same index as never adding them
+  removed_task_id = rng.choice(task_ids)
+  index.remove(removed_task_id)
+  blocks = [
+    block for block, task_id in zip(blocks, owners) if task_id != removed_task_id
+  ]
+  expected = reference_free_slots(windows, blocks)
+
+  free_slots = index.free_slots(windows)
+  assert list(zip(free_slots[::2], free_slots[1::2])) == expected
+  assert to_intervals(*index.to_numpy()) == to_intervals(
+    *merge_intervals(*to_arrays(blocks))
+  )
+
+  # The busy intervals overlapping the windows are enough to find their free slots
+  if windows:
+    busy_starts, busy_ends = index.to_numpy(windows[0][0], windows[-1][1])
+    free_slots = compute_free_slots(*to_arrays(windows), busy_starts, busy_ends)
+    assert to_intervals(*free_slots) == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS[:50])
+def test_find_free_slots_matches_the_minute_mask(seed):
+  rng = random.Random(seed)
+  windows, blocks = random_windows(rng), random_blocks(rng)
+
+  free_slots = find_free_slots(
+    [
+      {"start_at": from_epoch_minutes(start_at), "end_at": from_epoch_minutes(end_at)}
+      for start_at, end_at in blocks
+    ],
+    [
+      {"start_at": from_epoch_minutes(start_at), "end_at": from_epoch_minutes(end_at)}
+      for start_at, end_at in windows
+    ],
+  )
+
+  assert [
+    (to_epoch_minutes(slot["start_at"]), to_epoch_minutes(slot["end_at"]))
+    for slot in free_slots
+  ] == reference_free_slots(windows, blocks)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_window_summaries_match_the_minute_mask(seed):
+  rng = random.Random(seed)
+  windows, blocks = random_windows(rng), random_blocks(rng)
+  free_slots = reference_free_slots(windows, blocks)
+
+  free_minutes, largest_gaps = summarize_windows(
+    *to_arrays(windows), *to_arrays(blocks)
+  )
+
+  for i, (start_at, end_at) in enumerate(windows):
+    lengths = [
+      slot_end - slot_start
+      for slot_start, slot_end in free_slots
+      if start_at <= slot_start and slot_end <= end_at
+    ]
+    assert free_minutes[i] == sum(lengths)
+    assert largest_gaps[i] == max(lengths, default=0)
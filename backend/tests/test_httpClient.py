@@ -0,0 +1,94 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.config.http import http_settings
+from app.utils.httpClient import HTTPClient
+
+pytestmark = pytest.mark.anyio
+
+TIMEOUT_SECONDS = 0.2
+
+
+class StubHandler(BaseHTTPRequestHandler):
+  """
+  /slow answers after the client timeout, /flaky answers 503 to every other
+  request, /missing answers 404 and /port answers with the port the request came
+  from
+  """
+
+  protocol_version = "HTTP/1.1"  # Keep connections alive
+  requests = []
+
+  def do_GET(self):
+    StubHandler.requests.append(self.path)
+    status, body = 200, b"ok"
+    if self.path == "/slow":
+      time.sleep(TIMEOUT_SECONDS * 2)
+    elif self.path == "/flaky" and StubHandler.requests.count("/flaky") % 2:
+      status = 503
+    elif self.path == "/missing":
+      status = 404
+    elif self.path == "/port":
+      body = str(self.client_address[1]).encode()
+
+    self.send_response(status)
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    pass
+
+
+@pytest.fixture
+def stub_server():
+  StubHandler.requests = []
+  server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+  server.daemon_threads = True
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  yield f"http://127.0.0.1:{server.server_address[1]}"
+  server.shutdown()
+  server.server_close()
+
+
+@pytest.fixture
+async def http_client(monkeypatch):
+  monkeypatch.setattr(http_settings, "HTTP_TIMEOUT_SECONDS", TIMEOUT_SECONDS)
+  monkeypatch.setattr(http_settings, "HTTP_MAX_RETRIES", 2)
+  monkeypatch.setattr(http_settings, "HTTP_RETRY_BACKOFF_SECONDS", 0.01)
+  HTTPClient.connect()
+  yield HTTPClient.get_client()
+  await HTTPClient.close()
+
+
+async def test_slow_responses_time_out_after_the_retries(stub_server, http_client):
+  start = time.perf_counter()
+  with pytest.raises(httpx.ReadTimeout):
+    await HTTPClient.get(f"{stub_server}/slow")
+
+  assert StubHandler.requests == ["/slow"] * 3
+  assert time.perf_counter() - start < TIMEOUT_SECONDS * 3 + 1
+
+
+async def test_server_errors_are_retried(stub_server, http_client):
+  response = await HTTPClient.get(f"{stub_server}/flaky")
+
+  assert response.status_code == 200
+  assert StubHandler.requests == ["/flaky", "/flaky"]
+
+
+async def test_client_errors_are_not_retried(stub_server, http_client):
+  response = await HTTPClient.get(f"{stub_server}/missing")
+
+  assert response.status_code == 404
+  assert StubHandler.requests == ["/missing"]
+
+
+async def test_connections_are_reused(stub_server, http_client):
+  ports = {(await HTTPClient.get(f"{stub_server}/port")).text for _ in range(5)}
+
+  assert len(ports) == 1
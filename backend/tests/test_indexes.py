@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.db.indexes import (
+  DOCUMENT_MODELS,
+  ensure_indexes,
+  get_declared_indexes,
+  get_index_report,
+  print_index_report,
+)
+from app.models.taskModel import Task
+
+pytestmark = pytest.mark.anyio
+
+STARTED_AT = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def index_usages(database, monkeypatch):
+  """
+  Serve $indexStats, which the in-memory Mongo lacks, from a dict of usage counts
+  by (collection, index)
+  """
+  usages = {}
+  collection_class = type(database["any"])
+  aggregate = collection_class.aggregate
+
+  def fake_aggregate(self, pipeline, *args, **kwargs):
+    if pipeline != [{"$indexStats": {}}]:
+      return aggregate(self, pipeline, *args, **kwargs)
+
+    async def index_stats():
+      for (collection_name, name), ops in usages.items():
+        if collection_name == self.name:
+          yield {"name": name, "accesses": {"ops": ops, "since": STARTED_AT}}
+
+    return index_stats()
+
+  monkeypatch.setattr(collection_class, "aggregate", fake_aggregate)
+  return usages
+
+
+def get_row(report, collection_name: str, index_name: str):
+  [row] = [
+    row
+    for row in report
+    if (row["collection"], row["index"]) == (collection_name, index_name)
+  ]
+  return row
+
+
+async def test_ensure_indexes_creates_every_declared_index(database, index_usages):
+  await ensure_indexes(database)
+  await ensure_indexes(database)  # Existing indexes are left alone
+
+  report = await get_index_report(database)
+
+  for document_model in DOCUMENT_MODELS:
+    for name in get_declared_indexes(document_model):
+      assert get_row(report, document_model.Settings.name, name)["status"] == "ok"
+
+
+async def test_report_flags_missing_undeclared_and_unused_indexes(
+  database, index_usages, capsys
+):
+  collection = database[Task.Settings.name]
+  await ensure_indexes(database)
+  declared_names = list(get_declared_indexes(Task))
+  await collection.drop_index(declared_names[0])
+  await collection.create_index("legacy_field", name="legacy_field_1")
+  index_usages[(Task.Settings.name, declared_names[1])] = 42
+  index_usages[(Task.Settings.name, "legacy_field_1")] = 0
+
+  report = await get_index_report(database)
+
+  missing = get_row(report, Task.Settings.name, declared_names[0])
+  assert (missing["status"], missing["ops"]) == ("missing", None)
+  used = get_row(report, Task.Settings.name, declared_names[1])
+  assert (used["status"], used["ops"], used["since"]) == ("ok", 42, STARTED_AT)
+  unused = get_row(report, Task.Settings.name, "legacy_field_1")
+  assert (unused["status"], unused["ops"]) == ("undeclared", 0)
+
+  print_index_report(report)
+  assert "1 missing, 1 undeclared, 1 unused indexes." in capsys.readouterr().out
@@ -0,0 +1,127 @@
+import asyncio
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.config.email import email_settings
+from app.services.mailService.mailDispatcher import MailDispatcher
+from app.services.mailService.sendEmail import (
+  send_email_verification_link,
+  send_password_reset_link,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingHandler:
+  def __init__(self):
+    self.envelopes = []
+    self.sessions = set()
+
+  async def handle_DATA(self, server, session, envelope):
+    self.envelopes.append(envelope)
+    self.sessions.add(id(session))
+    return "250 Message accepted for delivery"
+
+
+def get_free_port() -> int:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+  """
+  Local SMTP stand-in the dispatcher sends to
+  """
+  handler = RecordingHandler()
+  controller = Controller(handler, hostname="127.0.0.1", port=get_free_port())
+  controller.start()
+  monkeypatch.setattr(email_settings, "MAIL_SERVER", "127.0.0.1")
+  monkeypatch.setattr(email_settings, "MAIL_PORT", controller.port)
+  monkeypatch.setattr(email_settings, "MAIL_STARTTLS", False)
+  monkeypatch.setattr(email_settings, "MAIL_SSL_TLS", False)
+  monkeypatch.setattr(email_settings, "USE_CREDENTIALS", False)
+  monkeypatch.setattr(email_settings, "MAIL_POOL_SIZE", 1)
+  monkeypatch.setattr(email_settings, "MAIL_RETRY_BASE_DELAY", 0.01)
+  yield handler
+  controller.stop()
+
+
+@pytest.fixture
+async def dispatcher(smtp_server):
+  MailDispatcher.start()
+  yield MailDispatcher
+  await MailDispatcher.stop()
+
+
+async def wait_for_queue():
+  await asyncio.wait_for(MailDispatcher.queue.join(), timeout=5)
+
+
+async def test_emails_are_rendered_and_sent_over_one_connection(
+  smtp_server, dispatcher
+):
+  for i in range(5):
+    await send_email_verification_link(f"user{i}@example.com", f"https://verify/{i}")
+  await send_password_reset_link("user0@example.com", "https://reset/0")
+  await wait_for_queue()
+
+  assert [envelope.rcpt_tos for envelope in smtp_server.envelopes] == [
+    [f"user{i}@example.com"] for i in range(5)
+  ] + [["user0@example.com"]]
+  assert b"https://verify/3" in smtp_server.envelopes[3].content
+  assert b"https://reset/0" in smtp_server.envelopes[5].content
+  assert len(smtp_server.sessions) == 1
+
+
+async def test_unexpected_errors_do_not_stop_the_worker(
+  smtp_server, dispatcher, monkeypatch
+):
+  send_with_retry = MailDispatcher.send_with_retry
+  calls = []
+
+  async def failing_first_send(smtp, message):
+    calls.append(message["To"])
+    if len(calls) == 1:
+      raise ValueError("Unexpected")
+    await send_with_retry(smtp, message)
+
+  monkeypatch.setattr(MailDispatcher, "send_with_retry", failing_first_send)
+  await send_email_verification_link("first@example.com", "https://verify/1")
+  await send_email_verification_link("second@example.com", "https://verify/2")
+  await wait_for_queue()
+
+  assert calls == ["first@example.com", "second@example.com"]
+  assert [envelope.rcpt_tos for envelope in smtp_server.envelopes] == [
+    ["second@example.com"]
+  ]
+
+
+async def test_connection_errors_are_retried(smtp_server, dispatcher, monkeypatch):
+  create_connection = MailDispatcher.create_connection
+  connection_attempts = []
+
+  def flaky_connection():
+    smtp = create_connection()
+    connect = smtp.connect
+
+    async def connect_once_refused(*args, **kwargs):
+      connection_attempts.append(1)
+      if len(connection_attempts) == 1:
+        raise ConnectionRefusedError()
+      return await connect(*args, **kwargs)
+
+    smtp.connect = connect_once_refused
+    return smtp
+
+  await MailDispatcher.stop()
+  monkeypatch.setattr(MailDispatcher, "create_connection", flaky_connection)
+  MailDispatcher.start()
+  await send_email_verification_link("user@example.com", "https://verify/1")
+  await wait_for_queue()
+
+  assert len(connection_attempts) == 2
+  assert len(smtp_server.envelopes) == 1
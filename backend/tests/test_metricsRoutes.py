@@ -0,0 +1,99 @@
+import fakeredis
+import httpx
+import pytest
+from fakeredis.aioredis import FakeAsyncRedisConnection
+
+from app.config.monitoring import monitoring_settings
+from app.db.redis import CountingConnectionPool, InstrumentedRedis, RedisClient
+from app.main import app
+from app.utils.instrumentation import Metrics
+
+pytestmark = pytest.mark.anyio
+
+METRICS_TOKEN = "scraper-token"
+
+
+@pytest.fixture(autouse=True)
+def metrics_token(monkeypatch):
+  monkeypatch.setattr(monitoring_settings, "METRICS_TOKEN", METRICS_TOKEN)
+
+
+@pytest.fixture
+async def connected_pool():
+  """
+  Point the Redis client at a connection pool like the app's, over an in-memory
+  server
+  """
+  Metrics.clear()
+  RedisClient.pool = CountingConnectionPool(
+    connection_class=FakeAsyncRedisConnection,
+    server=fakeredis.FakeServer(),
+    decode_responses=True,
+    max_connections=4,
+  )
+  RedisClient.client = InstrumentedRedis(connection_pool=RedisClient.pool)
+  await RedisClient.client.ping()
+  yield RedisClient.pool
+  await RedisClient.client.aclose()
+  await RedisClient.pool.disconnect()
+  RedisClient.pool = RedisClient.client = None
+
+
+async def get_metrics(token: str | None = METRICS_TOKEN) -> httpx.Response:
+  headers = {"Authorization": f"Bearer {token}"} if token else {}
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(
+    transport=transport, base_url="http://localhost"
+  ) as client:
+    return await client.get("/metrics", headers=headers)
+
+
+def get_gauge(body: str, name: str) -> float:
+  for line in body.splitlines():
+    if line.startswith(f"{name} "):
+      return float(line.split()[1])
+  raise AssertionError(f"{name} is missing from the metrics")
+
+
+async def test_metrics_report_the_connected_pool(connected_pool):
+  response = await get_metrics()
+
+  assert response.status_code == 200
+  assert get_gauge(response.text, "redis_pool_max_connections") == 4
+  assert get_gauge(response.text, "redis_pool_created_connections") == 1
+  assert get_gauge(response.text, "redis_pool_idle_connections") == 1
+  assert get_gauge(response.text, "redis_pool_in_use_connections") == 0
+  assert 'redis_commands_total{command="PING"} 1' in response.text
+
+
+async def test_pool_stats_count_checked_out_connections(connected_pool):
+  first = await connected_pool.get_connection("PING")
+  second = await connected_pool.get_connection("PING")
+  assert RedisClient.get_pool_stats() == {
+    "max_connections": 4,
+    "created_connections": 2,
+    "in_use_connections": 2,
+    "idle_connections": 0,
+    "utilization": 0.5,
+  }
+
+  await connected_pool.release(first)
+  await connected_pool.release(second)
+  stats = RedisClient.get_pool_stats()
+  assert (stats["in_use_connections"], stats["idle_connections"]) == (0, 2)
+
+
+@pytest.mark.parametrize("token", [None, "wrong-token"])
+async def test_metrics_require_the_token(connected_pool, token):
+  response = await get_metrics(token)
+
+  assert response.status_code == 401
+  assert "redis_pool" not in response.text
+
+
+async def test_metrics_are_refused_without_a_configured_token(
+  connected_pool, monkeypatch
+):
+  monkeypatch.setattr(monitoring_settings, "METRICS_TOKEN", None)
+
+  assert (await get_metrics()).status_code == 401
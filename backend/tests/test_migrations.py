@@ -0,0 +1,90 @@
+import pytest
+
+from app.config.database import db_settings
+from app.db import migrations
+from app.db.migrations import (
+  MIGRATIONS_COLLECTION,
+  backfill_task_user_ids,
+  run_migrations,
+)
+from app.models.taskModel import Task
+from app.models.userModel import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_completed_migrations_are_not_run_again(database, monkeypatch):
+  calls = []
+
+  async def first_migration():
+    calls.append("first")
+
+  async def second_migration():
+    calls.append("second")
+
+  monkeypatch.setattr(migrations, "MIGRATIONS", [first_migration])
+  await run_migrations()
+  monkeypatch.setattr(migrations, "MIGRATIONS", [first_migration, second_migration])
+  await run_migrations()
+  await run_migrations()
+
+  assert calls == ["first", "second"]
+  completed = await database[MIGRATIONS_COLLECTION].distinct("_id")
+  assert sorted(completed) == ["first_migration", "second_migration"]
+
+
+async def test_failed_migration_is_retried(database, monkeypatch):
+  attempts = []
+
+  async def failing_migration():
+    attempts.append(1)
+    if len(attempts) == 1:
+      raise RuntimeError("Interrupted")
+
+  monkeypatch.setattr(migrations, "MIGRATIONS", [failing_migration])
+  with pytest.raises(RuntimeError):
+    await run_migrations()
+  await run_migrations()
+
+  assert len(attempts) == 2
+  assert await database[MIGRATIONS_COLLECTION].count_documents({}) == 1
+
+
+async def insert_ownerless_tasks():
+  await Task.get_motor_collection().insert_many(
+    [{"title": "Legacy"}, {"title": "Also legacy", "user_id": None}]
+  )
+
+
+async def get_task_owners():
+  return await Task.get_motor_collection().distinct("user_id")
+
+
+async def test_ownerless_tasks_go_to_the_only_user(database):
+  user = await User(email="only@example.com").insert()
+  await insert_ownerless_tasks()
+
+  await backfill_task_user_ids()
+
+  assert await get_task_owners() == [user.id]
+
+
+async def test_ownerless_tasks_block_startup_without_owner(database):
+  await User(email="first@example.com").insert()
+  await User(email="second@example.com").insert()
+  await insert_ownerless_tasks()
+
+  with pytest.raises(Exception, match="LEGACY_TASKS_OWNER_EMAIL"):
+    await backfill_task_user_ids()
+  assert await get_task_owners() == [None]
+
+
+async def test_ownerless_tasks_go_to_the_configured_owner(database, monkeypatch):
+  await User(email="first@example.com").insert()
+  second_user = await User(email="second@example.com").insert()
+  await insert_ownerless_tasks()
+  monkeypatch.setattr(db_settings, "LEGACY_TASKS_OWNER_EMAIL", "second@example.com")
+
+  await backfill_task_user_ids()
+
+  assert await get_task_owners() == [second_user.id]
@@ -0,0 +1,107 @@
+import base64
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from beanie import PydanticObjectId
+
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.models.taskModel import Task
+from app.models.userModel import User
+from app.schemas.taskSchema import TaskFilter
+from app.services.taskService.crud import get_tasks
+from app.types.taskTypes import Priority
+from app.utils.pagination import decode_cursor, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+  "sort_value", [NOW, 3, "name", None], ids=["date", "int", "str", "null"]
+)
+def test_cursors_round_trip(sort_value):
+  id = PydanticObjectId()
+
+  assert decode_cursor(encode_cursor(sort_value, id)) == (sort_value, id)
+
+
+@pytest.mark.parametrize(
+  "cursor",
+  [
+    "not base64!",
+    base64.urlsafe_b64encode(b"{}").decode(),
+    base64.urlsafe_b64encode(b'[1,"not an id"]').decode(),
+    base64.urlsafe_b64encode(b'[{"$date":"yesterday"},"0"]').decode(),
+  ],
+)
+def test_malformed_cursors_are_rejected(cursor):
+  assert decode_cursor(cursor) is None
+
+
+async def insert_tasks():
+  # Every other task has no due date, and some share the same one
+  tasks = [
+    Task(
+      id=PydanticObjectId(),
+      smart_scheduling=False,
+      name=f"Task {i}",
+      priority=Priority(i % 3),
+      due_date=NOW + timedelta(days=i // 4) if i % 2 else None,
+      time_allocations=[],
+      created_at=NOW,
+    )
+    for i in range(11)
+  ]
+  await Task.insert_many(tasks)
+  return tasks
+
+
+async def read_all_pages(**filters):
+  ids, cursor = [], None
+  for _ in range(10):  # A cursor going backwards would never reach the end
+    page, cursor = await get_tasks(TaskFilter(limit=3, cursor=cursor, **filters))
+    ids += [task.id for task in page or []]
+    if not cursor:
+      return ids
+  raise AssertionError("The pages never ended")
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+@pytest.mark.parametrize("sort_by", ["due_date", "priority"])
+async def test_pages_follow_the_sort_order_with_null_keys(
+  database, sort_by, sort_order
+):
+  tasks = await insert_tasks()
+  sort_field = "used_due_date" if sort_by == "due_date" else sort_by
+
+  # Null keys sort first in ascending order, ties are broken by _id
+  def sort_key(task):
+    value = getattr(task, sort_field)
+    return (value is not None, value if value is not None else 0, task.id)
+
+  expected_ids = [
+    task.id for task in sorted(tasks, key=sort_key, reverse=sort_order == "desc")
+  ]
+
+  ids = await read_all_pages(sort_by=sort_by, sort_order=sort_order)
+
+  assert ids == expected_ids
+
+
+async def test_invalid_cursors_are_a_bad_request():
+  app.dependency_overrides[get_current_user] = lambda: User.model_construct(
+    id=PydanticObjectId(), email="someone@example.com", is_verified=True
+  )
+  try:
+    async with httpx.AsyncClient(
+      transport=httpx.ASGITransport(app=app), base_url="http://localhost"
+    ) as client:
+      response = await client.get("/api/v1/tasks", params={"cursor": "garbage"})
+  finally:
+    app.dependency_overrides.clear()
+
+  assert response.status_code == 400
+  assert response.json() == {"detail": "Invalid cursor."}
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from app.config.security import security_settings
+from app.utils import auth
+from app.utils.auth import (
+  get_password_hash,
+  get_password_hash_stats,
+  run_password_hashing,
+  verify_password,
+)
+
+pytestmark = pytest.mark.anyio
+
+WORKERS = security_settings.PASSWORD_HASH_WORKERS
+
+
+@pytest.fixture(autouse=True)
+def fast_bcrypt(monkeypatch):
+  monkeypatch.setattr(
+    auth, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+  )
+
+
+async def test_hashed_passwords_verify():
+  hashed_password = await get_password_hash("correct horse")
+
+  assert await verify_password("correct horse", hashed_password)
+  assert not await verify_password("wrong horse", hashed_password)
+
+
+async def test_hashing_runs_at_most_the_configured_workers_at_once():
+  lock = threading.Lock()
+  running = {"now": 0, "max": 0}
+  max_waiting = 0
+
+  def slow_hash(password):
+    with lock:
+      running["now"] += 1
+      running["max"] = max(running["max"], running["now"])
+    time.sleep(0.02)
+    with lock:
+      running["now"] -= 1
+    return password
+
+  completed = get_password_hash_stats()["completed"]
+  calls = asyncio.gather(
+    *(run_password_hashing(slow_hash, str(i)) for i in range(WORKERS * 3))
+  )
+  while not calls.done():
+    max_waiting = max(max_waiting, get_password_hash_stats()["waiting"])
+    await asyncio.sleep(0.005)
+
+  assert await calls == [str(i) for i in range(WORKERS * 3)]
+  assert running["max"] == WORKERS
+  assert max_waiting > 0  # The extra calls queued instead of starting threads
+  stats = get_password_hash_stats()
+  assert (stats["waiting"], stats["in_progress"]) == (0, 0)
+  assert stats["completed"] == completed + WORKERS * 3
+  assert stats["workers"] == WORKERS
+
+
+async def test_failed_hashing_frees_its_worker():
+  def broken_hash(password):
+    raise ValueError("Unsupported password")
+
+  with pytest.raises(ValueError):
+    await run_password_hashing(broken_hash, "password")
+
+  assert get_password_hash_stats()["in_progress"] == 0
@@ -0,0 +1,46 @@
+import pytest
+
+from app.db.redis import (
+  BLACKLIST_KEY_PREFIX,
+  LocalBlacklist,
+  prefix_legacy_blacklist_keys,
+  token_in_blacklist,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def reset_local_blacklist():
+  LocalBlacklist.expiries.clear()
+  LocalBlacklist.synced = False
+  yield
+  LocalBlacklist.expiries.clear()
+  LocalBlacklist.synced = False
+
+
+async def test_sync_only_loads_prefixed_keys(redis_client):
+  await redis_client.set(BLACKLIST_KEY_PREFIX + "revoked", "", ex=60)
+  await redis_client.set("availability:user:2026-03-02", "{}")
+  await redis_client.set("unrelated", "value")
+
+  await LocalBlacklist.sync()
+
+  assert list(LocalBlacklist.expiries) == ["revoked"]
+
+
+async def test_legacy_blacklist_keys_are_prefixed_once(redis_client):
+  await redis_client.set("legacy", "", ex=60)
+  await redis_client.set("unrelated", "value")
+  await redis_client.rpush("queue", "item")
+
+  await prefix_legacy_blacklist_keys()
+
+  assert await token_in_blacklist("legacy")
+  assert 0 < await redis_client.ttl(BLACKLIST_KEY_PREFIX + "legacy") <= 60
+  assert await redis_client.get("unrelated") == "value"
+  assert await redis_client.lrange("queue", 0, -1) == ["item"]
+
+  await redis_client.set("written later", "")
+  await prefix_legacy_blacklist_keys()
+  assert await redis_client.exists("written later")
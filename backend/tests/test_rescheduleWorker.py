@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.config.scheduler import scheduler_settings
+from app.services.taskService import rescheduleWorker
+from app.services.taskService.rescheduleWorker import RescheduleWorker
+
+pytestmark = pytest.mark.anyio
+
+COALESCE_SECONDS = 0.2
+
+
+@pytest.fixture
+async def worker(monkeypatch, redis_client):
+  runs = []
+
+  async def fake_reschedule_overdue_tasks(user_id, excluded_task_ids):
+    runs.append((user_id, list(excluded_task_ids)))
+    return []
+
+  monkeypatch.setattr(
+    rescheduleWorker, "reschedule_overdue_tasks", fake_reschedule_overdue_tasks
+  )
+  monkeypatch.setattr(
+    scheduler_settings, "RESCHEDULE_COALESCE_SECONDS", COALESCE_SECONDS
+  )
+  RescheduleWorker.jobs.clear()
+  RescheduleWorker.pending_jobs.clear()
+  RescheduleWorker.start()
+  yield runs
+  await RescheduleWorker.stop()
+
+
+async def wait_for_jobs(job_ids, timeout=5):
+  deadline = time.perf_counter() + timeout
+  while any(RescheduleWorker.jobs[id]["status"] != "completed" for id in job_ids):
+    assert time.perf_counter() < deadline, "Reschedule jobs did not complete"
+    await asyncio.sleep(0.01)
+
+
+async def test_edits_of_a_user_are_coalesced(worker):
+  user_id = PydanticObjectId()
+  first_task_id, second_task_id = PydanticObjectId(), PydanticObjectId()
+
+  job_id = await RescheduleWorker.enqueue(user_id, first_task_id)
+  assert await RescheduleWorker.enqueue(user_id, second_task_id) == job_id
+  await wait_for_jobs([job_id])
+
+  assert worker == [(user_id, [first_task_id, second_task_id])]
+
+
+async def test_coalescing_delay_does_not_hold_up_other_users(worker):
+  start = time.perf_counter()
+  job_ids = [await RescheduleWorker.enqueue(PydanticObjectId()) for _ in range(20)]
+  await wait_for_jobs(job_ids)
+
+  assert len(worker) == 20
+  # Run one after the other, the delays would add up to 4 seconds
+  assert time.perf_counter() - start < COALESCE_SECONDS * 5
+
+
+async def test_job_status_is_shared_through_redis(worker):
+  user_id = PydanticObjectId()
+  job_id = await RescheduleWorker.enqueue(user_id)
+  await wait_for_jobs([job_id])
+
+  # Another app worker has none of the jobs of this process in memory
+  RescheduleWorker.jobs.clear()
+  job = await RescheduleWorker.get_job(job_id)
+
+  assert job["status"] == "completed"
+  assert job["user_id"] == str(user_id)
+  assert "excluded_task_ids" not in job
+  assert await RescheduleWorker.get_job("unknown") is None
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.taskModel import Task
+from app.schemas.taskSchema import Duration, TimeBlock
+from app.services.taskService import rescheduler
+from app.services.taskService.rescheduler import reschedule_overdue_tasks
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+
+
+class StubHorizon:
+  def release(self, task_id, time_allocations):
+    pass
+
+  def reserve(self, time_allocations, task_id):
+    pass
+
+
+def make_time_block(start_at: datetime, is_scheduled_ontime: bool = True):
+  return TimeBlock(
+    start_at=start_at,
+    end_at=start_at + timedelta(hours=1),
+    is_scheduled_ontime=is_scheduled_ontime,
+  )
+
+
+async def insert_overdue_task(user_id, name: str) -> Task:
+  return await Task(
+    user_id=user_id,
+    smart_scheduling=True,
+    name=name,
+    start_date=NOW,
+    due_date=NOW + timedelta(days=1),
+    time_allocations=[make_time_block(NOW + timedelta(days=2), False)],
+    created_at=NOW,
+    updated_at=NOW,
+  ).insert()
+
+
+async def test_tasks_edited_during_the_reschedule_are_not_overwritten(
+  database, redis_client, monkeypatch
+):
+  user_id = PydanticObjectId()
+  edited_task = await insert_overdue_task(user_id, "Edited meanwhile")
+  untouched_task = await insert_overdue_task(user_id, "Untouched")
+  edited_time_block = make_time_block(NOW + timedelta(hours=5), True)
+  rescheduled_time_block = make_time_block(NOW + timedelta(hours=2))
+
+  async def fake_find_optimal_time(task, task_id, user_id, horizon):
+    if task_id == edited_task.id:  # The user edits the task in the meantime
+      await Task.get_motor_collection().update_one(
+        {"_id": task_id},
+        {"$set": {"time_allocations": [edited_time_block.model_dump()]}},
+      )
+    return [rescheduled_time_block.model_dump()]
+
+  monkeypatch.setattr(rescheduler, "find_optimal_time", fake_find_optimal_time)
+  monkeypatch.setattr(
+    rescheduler, "create_shared_horizon", lambda user_id, dates: StubHorizon()
+  )
+
+  updated_tasks = await reschedule_overdue_tasks(user_id)
+
+  assert [task.id for task in updated_tasks] == [untouched_task.id]
+  assert (await Task.get(untouched_task.id)).time_allocations == [
+    rescheduled_time_block
+  ]
+  assert (await Task.get(edited_task.id)).time_allocations == [edited_time_block]
+
+
+async def insert_late_task(
+  user_id, name: str, office_hours, due_hours: int = 3, hours: int = 1
+) -> Task:
+  return await Task(
+    user_id=user_id,
+    scheduling_hour_id=office_hours.id,
+    smart_scheduling=True,
+    name=name,
+    duration=Duration(hours=hours, minutes=0),
+    start_date=NOW,
+    due_date=NOW + timedelta(hours=due_hours),
+    time_allocations=[make_time_block(NOW + timedelta(days=2), False)],
+    created_at=NOW,
+    updated_at=NOW,
+  ).insert()
+
+
+async def test_overdue_tasks_share_one_calendar(office_hours, redis_client):
+  user_id = PydanticObjectId()
+  later_task = await insert_late_task(user_id, "Due later", office_hours, 3)
+  earlier_task = await insert_late_task(user_id, "Due earlier", office_hours, 2)
+
+  updated_tasks = await reschedule_overdue_tasks(user_id)
+
+  # Earlier due dates pick first, and the later task sees the slot it took
+  assert [task.id for task in updated_tasks] == [earlier_task.id, later_task.id]
+  assert (await Task.get(earlier_task.id)).time_allocations == [make_time_block(NOW)]
+  stored_later_task = await Task.get(later_task.id)
+  assert stored_later_task.time_allocations == [
+    make_time_block(NOW + timedelta(hours=1))
+  ]
+  assert not stored_later_task.is_overdue
+
+
+async def test_only_the_users_overdue_tasks_are_rescheduled(
+  office_hours, redis_client
+):
+  user_id = PydanticObjectId()
+  excluded_task = await insert_late_task(user_id, "Just edited", office_hours)
+  other_users_task = await insert_late_task(
+    PydanticObjectId(), "Someone else's", office_hours
+  )
+  late_task = await insert_late_task(user_id, "Late", office_hours)
+
+  updated_tasks = await reschedule_overdue_tasks(user_id, [excluded_task.id])
+
+  assert [task.id for task in updated_tasks] == [late_task.id]
+  for task in (excluded_task, other_users_task):
+    assert (await Task.get(task.id)).time_allocations == task.time_allocations
+
+
+async def test_unschedulable_tasks_keep_their_blocks(office_hours, redis_client):
+  user_id = PydanticObjectId()
+  # Longer than any time frame of the scheduling hour
+  too_long_task = await insert_late_task(user_id, "Too long", office_hours, hours=9)
+
+  assert await reschedule_overdue_tasks(user_id) == []
+  stored_task = await Task.get(too_long_task.id)
+  assert stored_task.time_allocations == too_long_task.time_allocations
+  assert stored_task.is_overdue
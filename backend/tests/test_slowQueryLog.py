@@ -0,0 +1,166 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.config.monitoring import monitoring_settings
+from app.db import slowQueryLog
+from app.db.slowQueryLog import (
+  SlowQueryLog,
+  get_pipeline_shape,
+  run_aggregation,
+  summarize_explain,
+)
+from app.models.taskModel import Task
+
+pytestmark = pytest.mark.anyio
+
+COLLSCAN_EXPLAIN = {
+  "stages": [
+    {
+      "$cursor": {
+        "queryPlanner": {
+          "winningPlan": {
+            "queryPlan": {"stage": "FETCH", "inputStage": {"stage": "COLLSCAN"}}
+          }
+        },
+        "executionStats": {
+          "totalDocsExamined": 1000,
+          "totalKeysExamined": 0,
+          "nReturned": 10,
+          "executionTimeMillis": 120,
+        },
+      }
+    }
+  ]
+}
+
+
+class FakeDatabase:
+  def __init__(self):
+    self.commands = []
+
+  async def command(self, command):
+    self.commands.append(command)
+    return COLLSCAN_EXPLAIN
+
+
+class FakeCollection:
+  name = "task_collection"
+
+  def __init__(self):
+    self.database = FakeDatabase()
+
+
+def make_pipeline(user_id, limit: int):
+  return [
+    {
+      "$match": {
+        "user_id": user_id,
+        "$or": [{"status": 0}, {"status": 1}],
+        "used_due_date": {"$gte": datetime(2026, 3, 2, tzinfo=timezone.utc)},
+      }
+    },
+    {"$set": {"start": "$time_allocations.start_at"}},
+    {"$limit": limit},
+  ]
+
+
+@pytest.fixture(autouse=True)
+def clear_slow_query_log(monkeypatch):
+  monkeypatch.setattr(monitoring_settings, "SLOW_QUERY_THRESHOLD_MS", 100)
+  SlowQueryLog.clear()
+  yield
+  SlowQueryLog.clear()
+
+
+def test_shapes_keep_operators_and_field_paths_only():
+  assert get_pipeline_shape(make_pipeline(PydanticObjectId(), 10)) == [
+    {
+      "$match": {
+        "user_id": "?",
+        "$or": [{"status": "?"}],
+        "used_due_date": {"$gte": "?"},
+      }
+    },
+    {"$set": {"start": "$time_allocations.start_at"}},
+    {"$limit": "?"},
+  ]
+
+
+def test_pipelines_differing_in_literals_share_a_shape():
+  collection = FakeCollection()
+  for name, limit, elapsed_ms in [
+    ("get_tasks", 10, 20),
+    ("get_tasks", 50, 40),
+    ("get_other", 10, 5),
+  ]:
+    pipeline = make_pipeline(PydanticObjectId(), limit)
+    SlowQueryLog.record(name, collection, pipeline, elapsed_ms)
+
+  stats = SlowQueryLog.get_stats()
+
+  assert [(entry["name"], entry["count"]) for entry in stats] == [
+    ("get_tasks", 2),
+    ("get_other", 1),
+  ]
+  assert stats[0]["mean_ms"] == 30
+  assert stats[0]["max_ms"] == 40
+  assert stats[0]["slow_count"] == 0
+
+
+async def test_slow_pipelines_are_explained_when_sampled(monkeypatch):
+  collection = FakeCollection()
+  pipeline = make_pipeline(PydanticObjectId(), 10)
+  monkeypatch.setattr(monitoring_settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.5)
+
+  monkeypatch.setattr(slowQueryLog.random, "random", lambda: 0.7)
+  SlowQueryLog.record("get_tasks", collection, pipeline, 150)
+  assert not SlowQueryLog.explain_tasks
+
+  monkeypatch.setattr(slowQueryLog.random, "random", lambda: 0.3)
+  SlowQueryLog.record("get_tasks", collection, pipeline, 150)
+  await asyncio.gather(*SlowQueryLog.explain_tasks)
+
+  [entry] = SlowQueryLog.get_stats()
+  assert entry["slow_count"] == 2
+  assert entry["last_slow_at"] is not None
+  assert len(collection.database.commands) == 1
+  assert collection.database.commands[0]["explain"]["pipeline"] == pipeline
+  assert entry["explain"]["collscan"]
+  assert entry["explain"]["docs_examined"] == 1000
+
+
+def test_explains_are_summarized():
+  summary = summarize_explain(COLLSCAN_EXPLAIN)
+
+  assert summary["plan_stages"] == ["FETCH", "COLLSCAN"]
+  assert summary["indexes"] == []
+  assert (summary["returned"], summary["execution_ms"]) == (10, 120)
+
+  index_scan = summarize_explain(
+    {
+      "queryPlanner": {
+        "winningPlan": {
+          "stage": "FETCH",
+          "inputStage": {"stage": "IXSCAN", "indexName": "user_time_allocations"},
+        }
+      }
+    }
+  )
+  assert index_scan["indexes"] == ["user_time_allocations"]
+  assert not index_scan["collscan"]
+
+
+async def test_aggregations_are_recorded_only_when_enabled(database, monkeypatch):
+  pipeline = [{"$match": {"user_id": PydanticObjectId()}}]
+
+  monkeypatch.setattr(monitoring_settings, "SLOW_QUERY_LOG_ENABLED", False)
+  await run_aggregation(Task, pipeline, "get_tasks")
+  assert SlowQueryLog.get_stats() == []
+
+  monkeypatch.setattr(monitoring_settings, "SLOW_QUERY_LOG_ENABLED", True)
+  assert await run_aggregation(Task, pipeline, "get_tasks") == []
+  [entry] = SlowQueryLog.get_stats()
+  assert (entry["name"], entry["collection"]) == ("get_tasks", "task_collection")
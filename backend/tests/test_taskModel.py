@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.taskModel import Task
+from app.schemas.taskSchema import TaskUpdate, TimeBlock
+from app.services.taskService.crud import update_task
+from app.services.taskService.rescheduleWorker import RescheduleWorker
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+FIRST_BLOCK = TimeBlock(start_at=NOW, end_at=NOW + timedelta(hours=1))
+LATE_BLOCK = TimeBlock(
+  start_at=NOW + timedelta(days=2),
+  end_at=NOW + timedelta(days=2, hours=1),
+  is_scheduled_ontime=False,
+)
+
+
+def make_task(**fields) -> Task:
+  return Task(
+    **{
+      "smart_scheduling": False,
+      "name": "Task",
+      "time_allocations": [],
+      "created_at": NOW,
+      **fields,
+    }
+  )
+
+
+async def test_smart_tasks_use_their_scheduling_range(database):
+  task = make_task(
+    smart_scheduling=True,
+    start_date=NOW,
+    due_date=NOW + timedelta(days=1),
+    time_allocations=[FIRST_BLOCK],
+  )
+
+  assert (task.used_start_date, task.used_due_date) == (NOW, NOW + timedelta(days=1))
+
+
+async def test_manual_tasks_use_their_first_block(database):
+  task = make_task(time_allocations=[FIRST_BLOCK, LATE_BLOCK])
+
+  assert (task.used_start_date, task.used_due_date) == (
+    FIRST_BLOCK.start_at,
+    FIRST_BLOCK.end_at,
+  )
+  assert task.is_overdue
+
+
+async def test_manual_tasks_without_blocks_have_no_dates(database):
+  task = make_task(start_date=NOW, due_date=NOW + timedelta(days=1))
+
+  assert (task.used_start_date, task.used_due_date) == (None, None)
+  assert not task.is_overdue
+
+
+async def test_derived_fields_follow_new_time_allocations(database):
+  task = make_task(time_allocations=[LATE_BLOCK])
+
+  task.time_allocations = [FIRST_BLOCK]
+  task.update_derived_fields()
+
+  assert task.used_start_date == FIRST_BLOCK.start_at
+  assert not task.is_overdue
+
+
+async def test_updates_store_the_new_derived_fields(
+  database, redis_client, monkeypatch
+):
+  async def fake_enqueue(user_id, updated_task_id=None):
+    return "job"
+
+  monkeypatch.setattr(RescheduleWorker, "enqueue", fake_enqueue)
+  task = await make_task(
+    user_id=PydanticObjectId(), time_allocations=[LATE_BLOCK]
+  ).insert()
+
+  await update_task(
+    str(task.id),
+    TaskUpdate(
+      name="Task",
+      status=task.status,
+      priority=task.priority,
+      time_allocations=[FIRST_BLOCK],
+      created_at=NOW,
+    ),
+    task.user_id,
+  )
+
+  stored_task = await Task.get_motor_collection().find_one({"_id": task.id})
+  assert stored_task["used_start_date"] == FIRST_BLOCK.start_at
+  assert stored_task["used_due_date"] == FIRST_BLOCK.end_at
+  assert stored_task["is_overdue"] is False
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.db.redis import publish_user_changed
+from app.models.userModel import User
+from app.routes.userRoutes import get_user
+from app.services.userService.crud import save_user
+from app.utils.tokenCache import TokenCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+  TokenCache.clear()
+  yield
+  TokenCache.clear()
+
+
+async def insert_user(email: str) -> User:
+  return await User(
+    name="Someone", email=email, hashed_password="hash", is_verified=True
+  ).insert()
+
+
+async def test_cached_users_are_projections(database):
+  user = await insert_user("someone@example.com")
+  TokenCache.set("jti", user)
+
+  cached_user = TokenCache.get("jti")
+  assert (cached_user.id, cached_user.email, cached_user.is_verified) == (
+    user.id,
+    user.email,
+    True,
+  )
+  assert cached_user.hashed_password is None
+  assert cached_user.name == ""
+
+  # The profile route loads the whole user
+  assert (await get_user(cached_user)).name == "Someone"
+
+
+async def test_saved_users_are_evicted(database, redis_client):
+  user = await insert_user("someone@example.com")
+  other_user = await insert_user("other@example.com")
+  TokenCache.set("first session", user)
+  TokenCache.set("second session", user)
+  TokenCache.set("other session", other_user)
+
+  user.is_verified = False
+  await save_user(user)
+
+  assert TokenCache.get("first session") is None
+  assert TokenCache.get("second session") is None
+  assert TokenCache.get("other session") is not None
+
+
+async def test_users_changed_by_other_processes_are_evicted(database, redis_client):
+  user = await insert_user("someone@example.com")
+  TokenCache.start()
+  try:
+    await asyncio.sleep(0.1)  # Let the listener subscribe, which clears the cache
+    TokenCache.set("jti", user)
+    TokenCache.set("other session", await insert_user("other@example.com"))
+    await publish_user_changed(str(user.id))
+    for _ in range(100):
+      if TokenCache.get("jti") is None:
+        break
+      await asyncio.sleep(0.01)
+    assert TokenCache.get("jti") is None
+    assert TokenCache.get("other session") is not None
+  finally:
+    await TokenCache.stop()
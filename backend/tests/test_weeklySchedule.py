@@ -0,0 +1,121 @@
+from datetime import date, datetime, time, timezone
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.schedulingHourModel import DayOfWeek, SchedulingHour, TimeFrame
+from app.schemas import schedulingHourSchema
+from app.schemas.schedulingHourSchema import SchedulingHourUpdate
+from app.services.schedulingHourService.crud import (
+  delete_scheduling_hour,
+  update_scheduling_hour,
+)
+from app.services.schedulingHourService.weeklySchedule import (
+  MINUTES_PER_DAY,
+  MINUTES_PER_WEEK,
+  SchedulingHourCache,
+  WeeklySchedule,
+)
+from app.utils.datetime import date_to_epoch_minutes
+
+pytestmark = pytest.mark.anyio
+
+MONDAY = date(2026, 3, 2)
+
+
+@pytest.fixture(autouse=True)
+def clear_schedule_cache():
+  SchedulingHourCache.clear()
+  yield
+  SchedulingHourCache.clear()
+
+
+def make_day(day_index: int, start_hour: int, end_hour: int) -> DayOfWeek:
+  return DayOfWeek(
+    day_index=day_index,
+    time_frames=[
+      TimeFrame(
+        start_at=datetime(2026, 3, 2, start_hour, tzinfo=timezone.utc),
+        end_at=datetime(2026, 3, 2, end_hour, tzinfo=timezone.utc),
+      )
+    ],
+  )
+
+
+def compile_days(*days: DayOfWeek) -> WeeklySchedule:
+  return WeeklySchedule.compile(
+    SchedulingHour.model_construct(
+      id=PydanticObjectId(), name="Test", days_of_week=list(days)
+    )
+  )
+
+
+def test_frames_ending_before_they_start_wrap_into_the_next_day():
+  schedule = compile_days(make_day(0, 22, 2))
+
+  assert schedule.intervals == ((22 * 60, MINUTES_PER_DAY + 2 * 60),)
+  assert schedule.max_frame_minutes == 4 * 60
+
+
+def test_sunday_frames_wrapping_past_the_week_stop_at_the_first_frame():
+  schedule = compile_days(make_day(0, 1, 3), make_day(6, 22, 2))
+
+  # Sunday 22:00 to Monday 02:00 is cut short by the Monday 01:00 frame
+  assert schedule.intervals == (
+    (60, 3 * 60),
+    (6 * MINUTES_PER_DAY + 22 * 60, MINUTES_PER_WEEK + 60),
+  )
+
+
+def test_preferred_windows_are_clipped_to_the_start():
+  schedule = compile_days(make_day(0, 9, 12), make_day(0, 13, 17))
+  midnight = date_to_epoch_minutes(MONDAY)
+
+  assert schedule.get_preferred_windows(MONDAY, midnight + 10 * 60) == [
+    (midnight + 10 * 60, midnight + 12 * 60),
+    (midnight + 13 * 60, midnight + 17 * 60),
+  ]
+  assert schedule.get_preferred_windows(MONDAY, midnight + 17 * 60) == []
+
+
+async def test_schedules_are_compiled_once(office_hours, monkeypatch):
+  loads = []
+  get_scheduling_hour = SchedulingHour.get
+
+  async def counting_get(id):
+    loads.append(id)
+    return await get_scheduling_hour(id)
+
+  monkeypatch.setattr(SchedulingHour, "get", counting_get)
+
+  first = await SchedulingHourCache.get(office_hours.id)
+  second = await SchedulingHourCache.get(office_hours.id)
+
+  assert first is second
+  assert loads == [office_hours.id]
+  assert await SchedulingHourCache.get(None) is None
+
+
+async def test_updated_and_deleted_scheduling_hours_are_evicted(office_hours):
+  old_schedule = await SchedulingHourCache.get(office_hours.id)
+
+  await update_scheduling_hour(
+    str(office_hours.id),
+    SchedulingHourUpdate(
+      days_of_week=[
+        schedulingHourSchema.DayOfWeek(
+          day_index=0,
+          time_frames=[
+            schedulingHourSchema.TimeFrame(start_at=time(8), end_at=time(12))
+          ],
+        )
+      ]
+    ),
+  )
+  new_schedule = await SchedulingHourCache.get(office_hours.id)
+
+  assert new_schedule.max_frame_minutes == 4 * 60
+  assert new_schedule.key != old_schedule.key
+
+  await delete_scheduling_hour(str(office_hours.id))
+  assert await SchedulingHourCache.get(office_hours.id) is None
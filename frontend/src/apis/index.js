@@ -30,11 +30,12 @@ export const deleteSchedulingHourAPI = async (id) => {
 
 
 // For Task
-export const fetchAllTasksAPI = async (start_of_week, end_of_week) => {
-  const response = await api.get("/tasks", {
+export const fetchAllTasksAPI = async (target_date, end_date) => {
+  const response = await api.get("/tasks/calendar", {
     params: {
-      start_of_week,
-      end_of_week
+      target_date,
+      end_date,
+      timezone: Intl.DateTimeFormat().resolvedOptions().timeZone
     },
     headers: { "Content-Type": "application/json" }
   })
@@ -56,6 +57,11 @@ export const deleteTaskAPI = async (id) => {
   return response.data
 }
 
+export const fetchRescheduleJobAPI = async (jobId) => {
+  const response = await api.get(`/tasks/reschedule-jobs/${jobId}`)
+  return response.data
+}
+
 // For User
 export const fetchUserAPI = async () => {
   const response = await api.get("/users/me")
@@ -3,6 +3,7 @@ import {
   createNewTaskAPI, 
   updateTaskAPI, 
   deleteTaskAPI,
+  fetchRescheduleJobAPI,
   createNewSchedulingHourAPI,
   updateSchedulingHourAPI,
   deleteSchedulingHourAPI,
@@ -16,6 +17,40 @@ import {
 } from "~/apis"
 import { usePlannerContext } from "~/hooks/useContext"
 
+const RESCHEDULE_JOB_POLL_INTERVAL_MS = 500
+const RESCHEDULE_JOB_MAX_POLLS = 20
+
+// Overdue tasks are rescheduled in the background after a task is updated or deleted
+const fetchRescheduledTasks = async (jobId) => {
+  for (let poll = 0; poll < RESCHEDULE_JOB_MAX_POLLS; poll++) {
+    await new Promise((resolve) => setTimeout(resolve, RESCHEDULE_JOB_POLL_INTERVAL_MS))
+    const job = await fetchRescheduleJobAPI(jobId)
+    if (job.status === "completed") return job.updated_overdue_tasks
+    if (job.status === "failed") return []
+  }
+  return null // Still running, the outcome is unknown
+}
+
+const applyRescheduledTasks = (queryClient, queryKey, jobId) => {
+  if (!jobId) return
+
+  fetchRescheduledTasks(jobId)
+    .then((rescheduledTasks) => {
+      if (rescheduledTasks === null) {
+        queryClient.invalidateQueries({ queryKey: ["tasks"] })
+        return
+      }
+      if (!rescheduledTasks.length) return
+      const rescheduledTasksById = new Map(rescheduledTasks.map((task) => [task._id, task]))
+      queryClient.setQueryData(queryKey, (oldData) => {
+        if (!oldData) return oldData
+        return oldData.map((task) => rescheduledTasksById.get(task._id) || task)
+      })
+    })
+    // The job is unknown (expired or never saved) or could not be polled
+    .catch(() => queryClient.invalidateQueries({ queryKey: ["tasks"] }))
+}
+
 export const useCreateNewSchedulingHour = () => {
   const queryClient = useQueryClient()
 
@@ -134,8 +169,9 @@ export const useUpdateTask = () => {
   } = useMutation({
     mutationFn: ({ id, updatedTaskData }) => updateTaskAPI(id, updatedTaskData),
     onSuccess: (data, variables) => {
+      const queryKey = ["tasks", { startOfWeek, endOfWeek }]
       queryClient.setQueryData(
-        ["tasks", { startOfWeek, endOfWeek }],
+        queryKey,
         (oldData) => {
           if (!oldData) return oldData
           return oldData.map((task) =>
@@ -143,6 +179,7 @@ export const useUpdateTask = () => {
           )
         }
       )
+      applyRescheduledTasks(queryClient, queryKey, data.reschedule_job_id)
     }
   })
 
@@ -166,24 +203,15 @@ export const useDeleteTask = () => {
   } = useMutation({
     mutationFn: ({ id }) => deleteTaskAPI(id),
     onSuccess: (data, variables) => {
+      const queryKey = ["tasks", { startOfWeek, endOfWeek }]
       queryClient.setQueryData(
-        ["tasks", { startOfWeek, endOfWeek }],
+        queryKey,
         (oldData) => {
-          let updatedTasks = oldData.filter((task) => task._id !== variables.id)
-
-          if (data.updated_overdue_tasks) {
-            const updatedOverdueTaskIds = 
-              data.updated_overdue_tasks.map(updated_overdue_task => updated_overdue_task._id)
-            updatedTasks = updatedTasks.map((task) =>
-              updatedOverdueTaskIds.includes(task._id) ? 
-                data.updated_overdue_tasks.find(updated_overdue_task => updated_overdue_task._id === task._id) : 
-                task
-            )
-          }
-
-          return updatedTasks
+          if (!oldData) return oldData
+          return oldData.filter((task) => task._id !== variables.id)
         }
       )
+      applyRescheduledTasks(queryClient, queryKey, data.reschedule_job_id)
     }
   })
 
@@ -1,6 +1,7 @@
 import dayjs from "dayjs"
 import {
   differenceInDays,
+  subDays,
   startOfWeek as getStartOfWeek,
   endOfWeek as getEndOfWeek
 } from "date-fns"
@@ -508,19 +509,20 @@ export default function Calendar({ calendarRef, anchorEl, popperRef }) {
           )
 
           if (differenceInDays(args.end, args.start) === 1) {
-            const startOfWeek = getStartOfWeek(args.start, { weekStartsOn: 1 })
-              .toISOString()
-              .split("T")[0]
-            const endOfWeek = getEndOfWeek(args.start, { weekStartsOn: 1 })
-              .toISOString()
-              .split("T")[0]
+            const startOfWeek = getStartOfWeek(args.start, {
+              weekStartsOn: 1
+            }).toLocaleDateString("en-CA")
+            const endOfWeek = getEndOfWeek(args.start, {
+              weekStartsOn: 1
+            }).toLocaleDateString("en-CA")
             setStartOfWeek((prev) =>
               prev !== startOfWeek ? startOfWeek : prev
             )
             setEndOfWeek((prev) => (prev !== endOfWeek ? endOfWeek : prev))
           } else {
-            const startOfWeek = args.start.toISOString().split("T")[0]
-            const endOfWeek = args.end.toISOString().split("T")[0]
+            // Local dates, the calendar endpoint resolves them in the browser timezone
+            const startOfWeek = args.start.toLocaleDateString("en-CA")
+            const endOfWeek = subDays(args.end, 1).toLocaleDateString("en-CA")
             setStartOfWeek((prev) =>
               prev !== startOfWeek ? startOfWeek : prev
             )